@@ -0,0 +1,125 @@
+"""
+Frequency analysis.
+FrequencyAnalyzer folds UTF-8 text, chunk by chunk, into two histograms: a
+bincount of its bytes and a bincount of its letter trigrams (A-Z,
+case-folded, other characters skipped, windows running on across chunk
+boundaries). Character counts and byte entropy come from the first;
+monogram and bigram counts are sums over the second, and the index of
+coincidence, letter entropy and chi-squared against English come from
+those. Every statistic therefore costs one scan of the text, and memory
+stays at 256 + 26**3 counters whatever the input size.
+"""
+
+import math
+import string
+from collections import Counter
+from typing import Iterable, Union
+
+from crypto_core import _np, STREAM_CHUNK_SIZE
+from cryptanalysis import chi_squared, index_of_coincidence
+
+ALPHABET = string.ascii_uppercase
+TRIGRAMS = 26 ** 3
+_UPPER = bytes.maketrans(string.ascii_lowercase.encode(), ALPHABET.encode())
+_NON_LETTERS = bytes(byte for byte in range(256) if not chr(byte).isascii() or not chr(byte).isalpha())
+_CONTINUATION = range(0x80, 0xC0)  # UTF-8 bytes that do not start a character
+
+def _entropy(counts) -> float:
+    """Shannon entropy in bits per symbol"""
+    total = sum(counts)
+    return -sum(count / total * math.log2(count / total) for count in counts if count) if total else 0.0
+
+def _ngram(index: int, n: int) -> str:
+    letters = ""
+    for _ in range(n):
+        index, value = divmod(index, 26)
+        letters = ALPHABET[value] + letters
+    return letters
+
+def _top(counts, n: int, limit: int) -> list:
+    """[ngram, count, frequency] for the most frequent n-grams, ties in alphabetical order"""
+    total = int(sum(counts))
+    if _np is not None:
+        order = _np.argsort(-counts, kind="stable")[:limit].tolist()
+    else:
+        order = sorted(range(len(counts)), key=lambda i: -counts[i])[:limit]
+    return [[_ngram(i, n), int(counts[i]), int(counts[i]) / total] for i in order if counts[i]]
+
+class FrequencyAnalyzer:
+    """Streaming letter and byte statistics: feed UTF-8 chunks with update(), read them with result()"""
+
+    def __init__(self):
+        if _np is not None:
+            self.bytes = _np.zeros(256, dtype=_np.int64)
+            self.trigrams = _np.zeros(TRIGRAMS, dtype=_np.int64)
+        else:
+            self.bytes = [0] * 256
+            self.trigrams = [0] * TRIGRAMS
+        self.letters = 0
+        self.tail = []  # values of the last two letters; the next chunk's first windows start with them
+
+    def update(self, chunk: Union[str, bytes]) -> "FrequencyAnalyzer":
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8", "surrogatepass")
+        letters = chunk.translate(_UPPER, _NON_LETTERS)
+        self.letters += len(letters)
+        if _np is not None:
+            self.bytes += _np.bincount(_np.frombuffer(chunk, dtype=_np.uint8), minlength=256)
+            values = _np.frombuffer(letters, dtype=_np.uint8).astype(_np.int64) - 65
+            values = _np.concatenate((_np.asarray(self.tail, dtype=_np.int64), values))
+            if len(values) > 2:
+                self.trigrams += _np.bincount(values[:-2] * 676 + values[1:-1] * 26 + values[2:], minlength=TRIGRAMS)
+            self.tail = values[-2:].tolist()
+        else:
+            for byte, count in Counter(chunk).items():
+                self.bytes[byte] += count
+            values = self.tail + [byte - 65 for byte in letters]
+            for a, b, c in zip(values, values[1:], values[2:]):
+                self.trigrams[a * 676 + b * 26 + c] += 1
+            self.tail = values[-2:]
+        return self
+
+    def counts(self):
+        """(monogram, bigram, trigram) counts; the trailing bigram and letter are not in any trigram window"""
+        if _np is not None:
+            bigrams = self.trigrams.reshape(676, 26).sum(axis=1)
+        else:
+            bigrams = [sum(self.trigrams[i * 26:i * 26 + 26]) for i in range(676)]
+        if len(self.tail) == 2:
+            bigrams[self.tail[0] * 26 + self.tail[1]] += 1
+        if _np is not None:
+            monograms = bigrams.reshape(26, 26).sum(axis=1)
+        else:
+            monograms = [sum(bigrams[i * 26:i * 26 + 26]) for i in range(26)]
+        if self.tail:
+            monograms[self.tail[-1]] += 1
+        return monograms, bigrams, self.trigrams
+
+    def result(self, top: int = 20) -> dict:
+        """Letter frequencies (all monograms, the `top` bigrams and trigrams) and summary statistics"""
+        monograms, bigrams, trigrams = self.counts()
+        monogram_list = [int(count) for count in monograms]
+        byte_list = [int(count) for count in self.bytes]
+        chi2 = chi_squared(monogram_list)
+        return {
+            "bytes": sum(byte_list),
+            "characters": sum(byte_list) - sum(byte_list[byte] for byte in _CONTINUATION),
+            "letters": self.letters,
+            "monograms": [[letter, count, count / self.letters if self.letters else 0.0]
+                          for letter, count in zip(ALPHABET, monogram_list)],
+            "bigrams": _top(bigrams, 2, top),
+            "trigrams": _top(trigrams, 3, top),
+            "index_of_coincidence": index_of_coincidence([monogram_list]),
+            "entropy": _entropy(monogram_list),
+            "byte_entropy": _entropy(byte_list),
+            "chi_squared": None if math.isinf(chi2) else chi2,
+        }
+
+def analyze(text: Union[str, bytes, Iterable[Union[str, bytes]]], top: int = 20) -> dict:
+    """FrequencyAnalyzer.result() of a string, UTF-8 bytes, or an iterable of either in chunks"""
+    analyzer = FrequencyAnalyzer()
+    chunks = (text[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(text), STREAM_CHUNK_SIZE)) \
+        if isinstance(text, (str, bytes)) else text
+    for chunk in chunks:
+        analyzer.update(chunk)
+    return analyzer.result(top)
@@ -4,19 +4,35 @@ Flask application with authentication, cipher management, and admin panel
 
 import os
 import json
+import hashlib
 import secrets
 import uuid
+import click
+import time
 from types import SimpleNamespace
 from datetime import datetime, timedelta
 from functools import wraps
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, flash, stream_with_context, g
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from sqlalchemy import text
+from werkzeug.utils import secure_filename
 from authlib.integrations.flask_client import OAuth
 
 from config import config
-from models import db, User, CipherDefinition, CustomCipher, ActivityLog, AdminLog, CookiePreference
+from models import db, User, CipherDefinition, CustomCipher, ActivityLog, AdminLog, CookiePreference, AppMeta
+from log_pipeline import activity_log_writer
+from presence import presence_tracker
+from identity import identity_cache
+from seeding import seed_defaults
+from catalog import catalog, catalog_stats
+from pagination import InvalidCursor, seek
+from search import cipher_search
+from rollups import usage_rollups, parse_window, first_hour
+from retention import log_retention, POLICIES as RETENTION_POLICIES
+from query_audit import audit as audit_queries
 import crypto_core as cc
+import analysis
+import cryptanalysis
 
 def create_app(config_name="development"):
     """Application factory"""
@@ -31,6 +47,13 @@ def create_app(config_name="development"):
     
     # Initialize extensions
     db.init_app(app)
+    activity_log_writer.init_app(app)
+    presence_tracker.init_app(app)
+    identity_cache.init_app(app)
+    cipher_search.init_app(app, families=catalog.families)
+    catalog_stats.init_app(app)
+    usage_rollups.init_app(app, writer=activity_log_writer)
+    log_retention.init_app(app)
     login_manager = LoginManager()
     login_manager.init_app(app)
     login_manager.login_view = "login"
@@ -39,6 +62,17 @@ def create_app(config_name="development"):
     if app.debug:
         os.environ.setdefault("AUTHLIB_INSECURE_TRANSPORT", "1")
 
+    scrypt_profile = cc.ScryptProfile(
+        n=app.config["AES_SCRYPT_N"], r=app.config["AES_SCRYPT_R"], p=app.config["AES_SCRYPT_P"]
+    ).validate()
+    cc.AES_KEY_CACHE.configure(maxsize=app.config["AES_KEY_CACHE_SIZE"], ttl=app.config["AES_KEY_CACHE_TTL"])
+    cc.CPU_EXECUTOR.configure(
+        max_workers=app.config["CPU_POOL_WORKERS"],
+        max_pending=app.config["CPU_POOL_MAX_PENDING"],
+        timeout=app.config["CPU_POOL_TIMEOUT"],
+        offload_min_length=app.config["CPU_OFFLOAD_MIN_LENGTH"],
+    )
+
     oauth = OAuth(app)
     if app.config.get("OAUTH_GITHUB_CLIENT_ID") and app.config.get("OAUTH_GITHUB_CLIENT_SECRET"):
         oauth.register(
@@ -53,26 +87,20 @@ def create_app(config_name="development"):
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return identity_cache.get(int(user_id))
 
     @app.context_processor
     def inject_cookie_prefs():
         if current_user.is_authenticated:
-            pref = CookiePreference.query.filter_by(user_id=current_user.id).order_by(
-                CookiePreference.updated_at.desc()
-            ).first()
-            if pref:
-                return {
-                    "cookie_pref_payload": {
-                        "choice": pref.choice,
-                        "essential": bool(pref.essential),
-                        "functional": bool(pref.functional),
-                        "analytics": bool(pref.analytics),
-                        "marketing": bool(pref.marketing),
-                    }
-                }
+            identity = identity_cache.get(current_user.id)
+            if identity is not None:
+                return {"cookie_pref_payload": identity.cookie_pref_payload}
         return {"cookie_pref_payload": None}
 
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
     @app.before_request
     def track_presence():
         if current_user.is_authenticated:
@@ -101,7 +129,7 @@ def create_app(config_name="development"):
     def log_activity(action, cipher_name, input_length=0, success=True, error_msg="", meta=None):
         """Log user activity"""
         if current_user.is_authenticated:
-            log = ActivityLog(
+            activity_log_writer.submit(
                 user_id=current_user.id,
                 action=action,
                 cipher_name=cipher_name,
@@ -110,10 +138,9 @@ def create_app(config_name="development"):
                 error_message=error_msg[:200],
                 ip_address=_get_client_ip(),
                 user_agent=_get_user_agent(),
-                meta=json.dumps(meta)[:2000] if meta else ""
+                meta=json.dumps(meta)[:2000] if meta else "",
+                latency_ms=(time.perf_counter() - g.request_started) * 1000 if "request_started" in g else None,
             )
-            db.session.add(log)
-            db.session.commit()
     
     def log_admin_action(action, target, details=""):
         """Log admin activity"""
@@ -135,16 +162,15 @@ def create_app(config_name="development"):
             user.oauth_provider = user.oauth_provider or provider
         db.session.add(user)
         db.session.commit()
+        identity_cache.invalidate(user.id)
 
     def _update_last_seen(user):
-        now = datetime.utcnow()
-        if user.last_seen_at and (now - user.last_seen_at).total_seconds() < 60:
-            return
-        user.last_seen_at = now
-        user.last_seen_ip = _get_client_ip()
-        user.last_seen_user_agent = _get_user_agent()
-        db.session.add(user)
-        db.session.commit()
+        presence_tracker.touch(
+            user.id,
+            ip=_get_client_ip(),
+            user_agent=_get_user_agent(),
+            persisted_at=user.last_seen_at,
+        )
 
     def _unique_username(base_name):
         base = "".join(ch for ch in base_name if ch.isalnum() or ch in ("_", "-")).strip("-_")
@@ -262,150 +288,133 @@ def create_app(config_name="development"):
         except Exception:
             db.session.rollback()
 
-    def _seed_defaults():
-        """Seed default ciphers and admin account."""
-        existing = {c.slug: c for c in CipherDefinition.query.all()}
-
-        def add_cipher(slug, name, desc, category="classic", supported=True):
-            if slug in existing:
-                cipher = existing[slug]
-                cipher.name = name
-                cipher.description = desc
-                cipher.category = cipher.category or category
-                cipher.supported = supported
-                return
-            cipher = CipherDefinition(
-                slug=slug,
-                name=name,
-                description=desc,
-                category=category,
-                supported=supported,
-            )
-            db.session.add(cipher)
-            existing[slug] = cipher
-
-        # Seed all built-in ciphers
-        for slug, info in cc.CLASSIC_CIPHERS.items():
-            add_cipher(
-                slug=slug,
-                name=info.get("name", slug.replace("-", " ").title()),
-                desc=info.get("description", "Cipher entry."),
-                category="classic",
-                supported=True,
-            )
-
-        # Generate dynamic variants (1000+)
-        for shift in range(0, 26):
-            add_cipher(
-                slug=f"caesar-{shift}",
-                name=f"Caesar Shift {shift}",
-                desc=f"Fixed Caesar shift of {shift}.",
-                category="variant",
-                supported=True,
-            )
-        for shift in range(1, 26):
-            add_cipher(
-                slug=f"rot-{shift}",
-                name=f"ROT-{shift}",
-                desc=f"ROT variant with shift {shift}.",
-                category="variant",
-                supported=True,
-            )
-        for shift in range(1, 26):
-            add_cipher(
-                slug=f"shift-{shift}",
-                name=f"Shift {shift}",
-                desc=f"Simple shift variant with fixed offset {shift}.",
-                category="variant",
-                supported=True,
-            )
-        for rails in range(2, 13):
-            add_cipher(
-                slug=f"rail-fence-{rails}",
-                name=f"Rail Fence ({rails} rails)",
-                desc=f"Rail fence with {rails} rails.",
-                category="variant",
-                supported=True,
-            )
-        for key in range(1, 256):
-            add_cipher(
-                slug=f"xor-{key}",
-                name=f"XOR {key}",
-                desc=f"Fixed XOR key {key}.",
-                category="variant",
-                supported=True,
-            )
-        for shift in range(0, 26):
-            add_cipher(
-                slug=f"atbash-shift-{shift}",
-                name=f"Atbash + Shift {shift}",
-                desc=f"Atbash followed by shift {shift}.",
-                category="variant",
-                supported=True,
-            )
-
-        # Remove affine variants - only keep the base affine cipher
-        for slug, cipher in list(existing.items()):
-            if slug.startswith("affine-a") and "-b" in slug:
-                db.session.delete(cipher)
-                existing.pop(slug, None)
-
-        def base26_key(index, length=3):
-            alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-            chars = []
-            for _ in range(length):
-                index, rem = divmod(index, 26)
-                chars.append(alphabet[rem])
-            return "".join(reversed(chars))
-
-        for i in range(300):
-            key = base26_key(i, length=3)
-            add_cipher(
-                slug=f"vigenere-key-{key.lower()}",
-                name=f"Vigenere Key {key}",
-                desc=f"Vigenere with fixed key {key}.",
-                category="variant",
-                supported=True,
-            )
-
-        for i in range(200):
-            key = base26_key(i, length=4)
-            add_cipher(
-                slug=f"beaufort-key-{key.lower()}",
-                name=f"Beaufort Key {key}",
-                desc=f"Beaufort with fixed key {key}.",
-                category="variant",
-                supported=True,
-            )
-
-        # Create default admin user
-        admin_password = os.environ.get("ADMIN_PASSWORD", "admin123")
-        admin = User.query.filter_by(username="The X King").first()
-        legacy_admin = User.query.filter_by(username="admin").first()
-        if legacy_admin and not admin:
-            legacy_admin.username = "The X King"
-            legacy_admin.email = "thexking@cipher-labs.vercel.app"
-            admin = legacy_admin
-        elif not admin:
-            admin = User(username="The X King", email="thexking@cipher-labs.vercel.app")
-            db.session.add(admin)
-
-        if admin:
-            admin.set_password(admin_password)
-            admin.is_admin = True
-            admin.admin_level = "high"
-            admin.email = admin.email or "thexking@cipher-labs.vercel.app"
-
-        if legacy_admin and admin and legacy_admin.id != admin.id:
-            legacy_admin.is_admin = False
-            legacy_admin.admin_level = "standard"
-
+    # Single-column indexes superseded by a composite index with the same leading column
+    superseded_indexes = ("ix_cookie_preferences_anon_id",)
+
+    def _index_fingerprint():
+        digest = hashlib.sha256()
+        for table in db.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                digest.update(f"{table.name}.{index.name}({','.join(c.name for c in index.columns)})\n".encode())
+        digest.update(",".join(superseded_indexes).encode())
+        return digest.hexdigest()
+
+    def _ensure_indexes():
+        """
+        Create indexes added to the models after their tables already existed.
+        The set of model indexes is fingerprinted in app_meta, so startup only
+        inspects the schema when the models changed.
+        """
+        fingerprint = _index_fingerprint()
+        stored = db.session.execute(
+            db.select(AppMeta.value).where(AppMeta.key == "index_fingerprint")
+        ).scalar()
+        if stored == fingerprint:
+            return
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+        for name in superseded_indexes:
+            db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        db.session.merge(AppMeta(key="index_fingerprint", value=fingerprint))
         db.session.commit()
-    # Create tables and seed defaults
+
+    # Create tables and seed defaults (skipped when the stored catalog fingerprint matches)
     with app.app_context():
         db.create_all()
         _ensure_sqlite_schema()
-        _seed_defaults()
+        _ensure_indexes()
+        if app.config["SEED_ON_STARTUP"]:
+            seed_defaults(app)
+        cipher_search.setup_backend()
+        usage_rollups.mark_live()
+
+    @app.cli.command("seed")
+    @click.option("--force", is_flag=True, help="Reseed even if the catalog fingerprint matches.")
+    def seed_command(force):
+        """Seed the built-in cipher catalog and admin account"""
+        result = seed_defaults(app, force=force)
+        if result["seeded"]:
+            click.echo(f"Seeded catalog: {result['inserted']} inserted, {result['updated']} updated.")
+        else:
+            click.echo("Catalog already up to date.")
+        click.echo(f"Fingerprint: {result['fingerprint']}")
+
+    @app.cli.group("rollups")
+    def rollups_group():
+        """Hourly usage rollups"""
+
+    @rollups_group.command("backfill")
+    @click.option("--since", type=click.DateTime(), help="Start of the window (UTC); defaults to the oldest log.")
+    @click.option("--until", type=click.DateTime(), help="End of the window (UTC); defaults to the first rolled-up hour.")
+    def rollups_backfill_command(since, until):
+        """Rebuild usage rollups from activity_logs"""
+        result = usage_rollups.backfill(since=since, until=until)
+        click.echo(f"Rolled up {result['events']} events into {result['buckets']} buckets before {result['until']}.")
+
+    @app.cli.group("db")
+    def db_group():
+        """Database maintenance"""
+
+    @db_group.command("audit")
+    @click.option("--verbose", is_flag=True, help="Print the full plan of every query.")
+    def db_audit_command(verbose):
+        """EXPLAIN the hot route queries and fail on unexpected full table scans"""
+        results = audit_queries()
+        for result in results:
+            status = "ok  " if result["ok"] else "FAIL"
+            note = f" ({result['expected']})" if result["flagged"] and result["expected"] else ""
+            click.echo(f"{status} {result['route']}: {result['name']}{note}")
+            for step in result["plan"] if verbose or not result["ok"] else ():
+                click.echo(f"       {step}")
+        failed = sum(not result["ok"] for result in results)
+        click.echo(f"{len(results) - failed}/{len(results)} queries passed on {db.engine.dialect.name}.")
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.group("logs")
+    def logs_group():
+        """Activity and admin log retention"""
+
+    @logs_group.command("archive")
+    @click.option("--dry-run", is_flag=True, help="List the expired months without archiving them.")
+    def logs_archive_command(dry_run):
+        """Archive expired log months to compressed files and delete them"""
+        results = log_retention.run(dry_run=dry_run)
+        for result in results:
+            if dry_run:
+                click.echo(f"{result['table']} {result['month']}: expired")
+            else:
+                click.echo(f"{result['table']} {result['month']}: {result['archived']} archived, "
+                           f"{result['deleted']} deleted -> {result['path']}")
+        if not results:
+            click.echo("No expired log months.")
+
+    @logs_group.command("query")
+    @click.argument("table", type=click.Choice(sorted(RETENTION_POLICIES)))
+    @click.option("--since", type=click.DateTime())
+    @click.option("--until", type=click.DateTime())
+    @click.option("--user-id", type=int, help="Filter by user_id (activity) or admin_id (admin logs).")
+    @click.option("--limit", type=int, default=100, show_default=True)
+    def logs_query_command(table, since, until, user_id, limit):
+        """Print archived rows as JSON lines"""
+        filters = {}
+        if user_id is not None:
+            filters["user_id" if table == "activity_logs" else "admin_id"] = user_id
+        for row in log_retention.query_archive(table, since, until, limit=limit, **filters):
+            click.echo(json.dumps(row))
+
+    @app.cli.group("crack")
+    def crack_group():
+        """Cryptanalysis models"""
+
+    @crack_group.command("build-model")
+    @click.option("--corpus", type=click.File("r", encoding="utf-8"), help="English text; defaults to the stdlib docs.")
+    def crack_build_model_command(corpus):
+        """Rebuild the shipped quadgram table used by /api/crack"""
+        model = cryptanalysis.QuadgramModel.from_corpus(corpus.read() if corpus else cryptanalysis.stdlib_corpus())
+        model.save()
+        click.echo(f"Wrote {cryptanalysis.MODEL_PATH} (log10 floor {model.floor:.3f}).")
     
     # ============ PUBLIC ROUTES ============
     
@@ -418,33 +427,14 @@ def create_app(config_name="development"):
         page = max(int(request.args.get("page", 1)), 1)
         per_page = 24
 
-        query = CipherDefinition.query
-        if q:
-            like = f"%{q}%"
-            query = query.filter(
-                (CipherDefinition.name.ilike(like)) | (CipherDefinition.slug.ilike(like))
-            )
-        if show == "supported":
-            query = query.filter_by(supported=True)
-        if category and category != "all":
-            query = query.filter_by(category=category)
-
-        total = query.count()
+        filters = {"q": q, "category": category, "supported_only": show == "supported"}
+        total = catalog.count(**filters)
         pages = max((total + per_page - 1) // per_page, 1)
         page = min(page, pages)
 
-        ciphers = (
-            query.order_by(CipherDefinition.name)
-            .offset((page - 1) * per_page)
-            .limit(per_page)
-            .all()
-        )
-        supported_total = CipherDefinition.query.filter_by(supported=True).count()
-        categories = [
-            row[0]
-            for row in db.session.query(CipherDefinition.category).distinct().order_by(CipherDefinition.category).all()
-            if row[0]
-        ]
+        _, ciphers = catalog.page((page - 1) * per_page, per_page, **filters)
+        supported_total = catalog.count(supported_only=True)
+        categories = catalog.categories()
 
         return render_template(
             "index.html",
@@ -619,13 +609,8 @@ def create_app(config_name="development"):
     @login_required
     def dashboard():
         """User dashboard"""
-        cipher_defs = (
-            CipherDefinition.query.filter_by(supported=True)
-            .order_by(CipherDefinition.name)
-            .limit(12)
-            .all()
-        )
-        cipher_total = CipherDefinition.query.count()
+        _, cipher_defs = catalog.page(0, 12, supported_only=True)
+        cipher_total = catalog.count()
         custom_ciphers = CustomCipher.query.filter_by(user_id=current_user.id).all()
         supported_ciphers = CipherDefinition.query.filter_by(supported=True).order_by(CipherDefinition.name).all()
         recent_logs = ActivityLog.query.filter_by(user_id=current_user.id).order_by(
@@ -665,6 +650,12 @@ def create_app(config_name="development"):
             except json.JSONDecodeError:
                 flash("Parameters must be valid JSON.", "error")
                 return redirect(url_for("dashboard"))
+        if base_slug == "pipeline":
+            try:
+                cc.compile_pipeline(params.get("steps") if isinstance(params, dict) else None)
+            except ValueError as e:
+                flash(f"Invalid pipeline: {e}", "error")
+                return redirect(url_for("dashboard"))
 
         custom = CustomCipher(
             user_id=current_user.id,
@@ -701,7 +692,7 @@ def create_app(config_name="development"):
     @app.get("/cipher/<slug>")
     def cipher_page(slug):
         """Cipher detail page"""
-        cipher = CipherDefinition.query.filter_by(slug=slug).first()
+        cipher = catalog.get(slug)
         if not cipher:
             flash("Cipher not found.", "error")
             return redirect(url_for("index"))
@@ -719,6 +710,7 @@ def create_app(config_name="development"):
             "key2": "KEYTWO",
             "shift1": 3,
             "shift2": 5,
+            "steps": '[{"slug": "caesar", "params": {"shift": 3}}, {"slug": "rail-fence", "params": {"rails": 3}}]',
         }
         return render_template(
             "cipher.html",
@@ -746,6 +738,11 @@ def create_app(config_name="development"):
             default_params = json.loads(custom_cipher.parameters or "{}")
         except json.JSONDecodeError:
             default_params = {}
+        # Text inputs show structured params (pipeline steps) as the JSON they are sent back as
+        default_params = {
+            name: json.dumps(value) if isinstance(value, (list, dict)) else value
+            for name, value in default_params.items()
+        }
 
         cipher = SimpleNamespace(
             slug=f"custom:{custom_cipher.id}",
@@ -786,30 +783,34 @@ def create_app(config_name="development"):
                 custom_cipher = CustomCipher.query.filter_by(id=custom_id, user_id=current_user.id).first()
                 if not custom_cipher:
                     return jsonify({"ok": False, "error": "Custom cipher not found."}), 404
-                if not cc.cipher_exists(custom_cipher.cipher_type):
+                base_cipher = cc.resolve_cipher(custom_cipher.cipher_type)
+                if not base_cipher:
                     return jsonify({"ok": False, "error": "Base cipher unavailable."}), 400
                 base_params = json.loads(custom_cipher.parameters or "{}")
                 merged = {**base_params, **params}
-                result = cc.encrypt_with_cipher(custom_cipher.cipher_type, text, **merged)
+                result = cc.run_cipher("encrypt", base_cipher.slug, text, **merged)
                 log_activity("encrypt", custom_cipher.name, len(text), success=True, meta={"custom": custom_cipher.id})
                 return jsonify({"ok": True, "result": result})
 
-            if not cc.cipher_exists(slug):
+            cipher = cc.resolve_cipher(slug)
+            if not cipher:
                 cipher_def = CipherDefinition.query.filter_by(slug=slug).first()
                 if cipher_def and not cipher_def.supported:
                     return jsonify({"ok": False, "error": "Cipher is catalog-only and not yet supported."}), 400
                 if cipher_def and cipher_def.base_slug:
                     base_params = json.loads(cipher_def.default_params or "{}")
                     merged = {**base_params, **params}
-                    result = cc.encrypt_with_cipher(cipher_def.base_slug, text, **merged)
+                    result = cc.run_cipher("encrypt", cipher_def.base_slug, text, **merged)
                     log_activity("encrypt", slug, len(text), success=True, meta={"alias": cipher_def.base_slug})
                     return jsonify({"ok": True, "result": result})
                 return jsonify({"ok": False, "error": "Unknown cipher."}), 400
             
-            result = cc.encrypt_with_cipher(slug, text, **params)
+            result = cc.run_cipher("encrypt", slug, text, **params)
             log_activity("encrypt", slug, len(text), success=True)
             
             return jsonify({"ok": True, "result": result})
+        except cc.ExecutorBusy:
+            raise
         except Exception as e:
             error_msg = str(e)
             log_activity("encrypt", slug, len(text), success=False, error_msg=error_msg)
@@ -833,35 +834,249 @@ def create_app(config_name="development"):
                 custom_cipher = CustomCipher.query.filter_by(id=custom_id, user_id=current_user.id).first()
                 if not custom_cipher:
                     return jsonify({"ok": False, "error": "Custom cipher not found."}), 404
-                if not cc.cipher_exists(custom_cipher.cipher_type):
+                base_cipher = cc.resolve_cipher(custom_cipher.cipher_type)
+                if not base_cipher:
                     return jsonify({"ok": False, "error": "Base cipher unavailable."}), 400
                 base_params = json.loads(custom_cipher.parameters or "{}")
                 merged = {**base_params, **params}
-                result = cc.decrypt_with_cipher(custom_cipher.cipher_type, text, **merged)
+                result = cc.run_cipher("decrypt", base_cipher.slug, text, **merged)
                 log_activity("decrypt", custom_cipher.name, len(text), success=True, meta={"custom": custom_cipher.id})
                 return jsonify({"ok": True, "result": result})
 
-            if not cc.cipher_exists(slug):
+            cipher = cc.resolve_cipher(slug)
+            if not cipher:
                 cipher_def = CipherDefinition.query.filter_by(slug=slug).first()
                 if cipher_def and not cipher_def.supported:
                     return jsonify({"ok": False, "error": "Cipher is catalog-only and not yet supported."}), 400
                 if cipher_def and cipher_def.base_slug:
                     base_params = json.loads(cipher_def.default_params or "{}")
                     merged = {**base_params, **params}
-                    result = cc.decrypt_with_cipher(cipher_def.base_slug, text, **merged)
+                    result = cc.run_cipher("decrypt", cipher_def.base_slug, text, **merged)
                     log_activity("decrypt", slug, len(text), success=True, meta={"alias": cipher_def.base_slug})
                     return jsonify({"ok": True, "result": result})
                 return jsonify({"ok": False, "error": "Unknown cipher."}), 400
             
-            result = cc.decrypt_with_cipher(slug, text, **params)
+            result = cc.run_cipher("decrypt", slug, text, **params)
             log_activity("decrypt", slug, len(text), success=True)
             
             return jsonify({"ok": True, "result": result})
+        except cc.ExecutorBusy:
+            raise
         except Exception as e:
             error_msg = str(e)
             log_activity("decrypt", slug, len(text), success=False, error_msg=error_msg)
             return jsonify({"ok": False, "error": error_msg}), 400
     
+    @app.post("/api/encrypt/batch")
+    @login_required
+    def api_encrypt_batch():
+        """Encrypt many {slug, text, params} items in one request"""
+        data = request.get_json(force=True)
+        items = data.get("items") if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({"ok": False, "error": "Items must be a non-empty list."}), 400
+        max_items = app.config.get("BATCH_MAX_ITEMS", 1000)
+        if len(items) > max_items:
+            return jsonify({"ok": False, "error": f"Batch is limited to {max_items} items."}), 400
+        max_chars = app.config.get("BATCH_MAX_CHARS", 4 * 1024 * 1024)
+        if sum(len(item["text"]) for item in items if isinstance(item, dict) and isinstance(item.get("text"), str)) > max_chars:
+            return jsonify({"ok": False, "error": f"Batch text is limited to {max_chars} characters."}), 400
+
+        # Map custom and alias slugs onto their base cipher once per distinct slug
+        aliases = {}
+        for item in items:
+            slug = str(item.get("slug", "")).strip() if isinstance(item, dict) else ""
+            if slug in aliases or cc.cipher_exists(slug):
+                continue
+            aliases[slug] = None
+            if slug.startswith("custom:"):
+                custom_id = slug.split(":", 1)[1]
+                custom_cipher = (
+                    CustomCipher.query.filter_by(id=int(custom_id), user_id=current_user.id).first()
+                    if custom_id.isdigit() else None
+                )
+                if custom_cipher:
+                    aliases[slug] = (custom_cipher.cipher_type, json.loads(custom_cipher.parameters or "{}"))
+            else:
+                cipher_def = CipherDefinition.query.filter_by(slug=slug).first()
+                if cipher_def and cipher_def.supported and cipher_def.base_slug:
+                    aliases[slug] = (cipher_def.base_slug, json.loads(cipher_def.default_params or "{}"))
+
+        resolved = []
+        for item in items:
+            if not isinstance(item, dict):
+                resolved.append(item)
+                continue
+            alias = aliases.get(str(item.get("slug", "")).strip())
+            if alias:
+                base_slug, base_params = alias
+                params = item.get("params") or {}
+                if isinstance(params, dict):
+                    params = {**base_params, **params}
+                item = {"slug": base_slug, "text": item.get("text", ""), "params": params}
+            resolved.append(item)
+
+        results = cc.encrypt_many(resolved)
+        failed = sum(1 for result in results if not result["ok"])
+        per_cipher = {}
+        total_length = 0
+        for item in items:
+            if isinstance(item, dict):
+                slug = str(item.get("slug", "")).strip()
+                per_cipher[slug] = per_cipher.get(slug, 0) + 1
+                if isinstance(item.get("text"), str):
+                    total_length += len(item["text"])
+        top_ciphers = dict(sorted(per_cipher.items(), key=lambda kv: -kv[1])[:20])
+        log_activity(
+            "encrypt_batch",
+            "batch",
+            total_length,
+            success=failed == 0,
+            error_msg=f"{failed} of {len(items)} items failed" if failed else "",
+            meta={"items": len(items), "failed": failed, "ciphers": top_ciphers},
+        )
+        return jsonify({"ok": True, "results": results})
+
+    @app.post("/api/crack")
+    @login_required
+    def api_crack():
+        """Brute-force the small keyspaces and return the most English-like plaintexts"""
+        data = request.get_json(force=True)
+        text = data.get("text") if isinstance(data, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            return jsonify({"ok": False, "error": "Text is required."}), 400
+        max_length = app.config.get("CRACK_MAX_LENGTH", 1024 * 1024)
+        if len(text) > max_length:
+            return jsonify({"ok": False, "error": f"Text is limited to {max_length} characters."}), 400
+        keyspaces = data.get("keyspaces") or list(cryptanalysis.DEFAULT_KEYSPACES)
+        if not isinstance(keyspaces, list) or not all(isinstance(name, str) for name in keyspaces):
+            return jsonify({"ok": False, "error": "Keyspaces must be a list of names."}), 400
+        unknown = sorted(set(keyspaces) - set(cryptanalysis.KEYSPACES))
+        if unknown:
+            return jsonify({"ok": False, "error": f"Unknown keyspace: {', '.join(unknown)}"}), 400
+        try:
+            top_k = int(data.get("top_k", 5))
+        except (TypeError, ValueError):
+            return jsonify({"ok": False, "error": "top_k must be an integer."}), 400
+        top_k = min(max(top_k, 1), app.config.get("CRACK_MAX_TOP_K", 20))
+
+        started = time.perf_counter()
+        result = cryptanalysis.crack(
+            text,
+            keyspaces,
+            top_k=top_k,
+            sample_size=app.config.get("CRACK_SAMPLE_CHARS", 20000),
+            stop_score=app.config.get("CRACK_STOP_SCORE"),
+            substitution_budget=app.config.get("CRACK_SUBSTITUTION_BUDGET", 5.0),
+        )
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        best = result.candidates[0] if result.candidates else None
+        log_activity(
+            "crack",
+            best.slug if best else "crack",
+            len(text),
+            success=best is not None,
+            meta={"keyspaces": keyspaces, "tried": result.tried, "score": round(best.score, 4) if best else None},
+        )
+        return jsonify({
+            "ok": True,
+            "best": best.plaintext if best else "",
+            "candidates": [candidate.to_json() for candidate in result.candidates],
+            "tried": result.tried,
+            "total": result.total,
+            "stopped_early": result.stopped_early,
+            "elapsed_ms": elapsed_ms,
+        })
+
+    @app.post("/api/pipelines/compile")
+    @login_required
+    def api_pipeline_compile():
+        """Validate a cipher chain and show the passes it compiles to"""
+        data = request.get_json(force=True)
+        steps = data.get("steps") if isinstance(data, dict) else None
+        try:
+            pipeline = cc.compile_pipeline(steps)
+        except ValueError as e:
+            return jsonify({"ok": False, "error": str(e)}), 400
+        return jsonify({"ok": True, **pipeline.describe(), "reversible": pipeline.decrypt_pass is not None})
+
+    @app.post("/api/analyze")
+    @login_required
+    def api_analyze():
+        """Letter frequencies and statistics of a JSON {"text"} or of a raw text body of any size"""
+        if request.is_json:
+            data = request.get_json(force=True)
+            text = data.get("text") if isinstance(data, dict) else None
+            if not isinstance(text, str):
+                return jsonify({"ok": False, "error": "Text is required."}), 400
+            source, top = text, data.get("top", 20)
+        else:
+            source, top = cc.iter_byte_chunks(request.stream, cc.STREAM_CHUNK_SIZE), request.args.get("top", 20)
+        try:
+            top = int(top)
+        except (TypeError, ValueError):
+            return jsonify({"ok": False, "error": "top must be an integer."}), 400
+        top = min(max(top, 0), app.config.get("ANALYZE_MAX_TOP", 100))
+
+        started = time.perf_counter()
+        stats = analysis.analyze(source, top=top)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        log_activity("analyze", "analyze", stats["characters"], meta={"stream": not request.is_json})
+        return jsonify({"ok": True, **stats, "elapsed_ms": elapsed_ms})
+
+    def _stream_params(cipher):
+        """Read cipher params from the query string, typed per the cipher's param_types"""
+        params = {}
+        for name in cipher.params:
+            if name in request.args:
+                value = request.args[name]
+                params[name] = int(value) if cipher.param_types.get(name) == "number" else value
+        return params
+
+    def _stream_cipher(action):
+        """Run a streaming kernel over the raw request body and stream the result back"""
+        slug = request.args.get("slug", "").strip()
+        cipher = cc.resolve_cipher(slug)
+        kernel = getattr(cipher, f"stream_{action}") if cipher else None
+        if kernel is None:
+            return jsonify({"ok": False, "error": "Cipher does not support streaming."}), 400
+
+        consumed = [0]
+
+        def chunks():
+            for chunk in cc.iter_text_chunks(request.stream):
+                consumed[0] += len(chunk)
+                yield chunk
+
+        try:
+            output = kernel(chunks(), **_stream_params(cipher))
+        except (TypeError, ValueError) as e:
+            error_msg = str(e)
+            log_activity(action, slug, 0, success=False, error_msg=error_msg)
+            return jsonify({"ok": False, "error": error_msg}), 400
+
+        def generate():
+            try:
+                yield from output
+            except Exception as e:
+                log_activity(action, slug, consumed[0], success=False, error_msg=str(e), meta={"stream": True})
+                raise  # abort the response so a truncated stream is never mistaken for a complete one
+            log_activity(action, slug, consumed[0], success=True, meta={"stream": True})
+
+        return Response(stream_with_context(generate()), mimetype="text/plain")
+
+    @app.post("/api/stream/encrypt")
+    @login_required
+    def api_stream_encrypt():
+        """Encrypt a raw text body of any size; params come from the query string"""
+        return _stream_cipher("encrypt")
+
+    @app.post("/api/stream/decrypt")
+    @login_required
+    def api_stream_decrypt():
+        """Decrypt a raw text body of any size; params come from the query string"""
+        return _stream_cipher("decrypt")
+
     @app.post("/api/aes/encrypt")
     @login_required
     def api_aes_encrypt():
@@ -871,10 +1086,12 @@ def create_app(config_name="development"):
         password = data.get("password", "")
         
         try:
-            bundle = cc.aes_encrypt(text, password)
+            bundle = cc.aes_encrypt(text, password, profile=scrypt_profile)
             log_activity("encrypt", "aes-gcm", len(text), success=True)
             
             return jsonify({"ok": True, "bundle": bundle.__dict__})
+        except cc.ExecutorBusy:
+            raise
         except Exception as e:
             error_msg = str(e)
             log_activity("encrypt", "aes-gcm", len(text), success=False, error_msg=error_msg)
@@ -889,20 +1106,130 @@ def create_app(config_name="development"):
         bundle_data = data.get("bundle", {})
         
         try:
-            bundle = cc.AESBundle(
-                salt_b64=bundle_data.get("salt_b64", ""),
-                nonce_b64=bundle_data.get("nonce_b64", ""),
-                ciphertext_b64=bundle_data.get("ciphertext_b64", "")
-            )
+            bundle = cc.AESBundle.from_dict(bundle_data)
             result = cc.aes_decrypt(bundle, password)
             log_activity("decrypt", "aes-gcm", len(result), success=True)
             
             return jsonify({"ok": True, "result": result})
+        except cc.ExecutorBusy:
+            raise
         except Exception as e:
             error_msg = str(e)
             log_activity("decrypt", "aes-gcm", 0, success=False, error_msg=error_msg)
             return jsonify({"ok": False, "error": error_msg}), 400
     
+    @app.post("/api/aes/encrypt/batch")
+    @login_required
+    def api_aes_encrypt_batch():
+        """AES-GCM encrypt many texts under one derived key (shared salt, fresh nonces)"""
+        data = request.get_json(force=True)
+        texts = data.get("texts") if isinstance(data, dict) else None
+        password = data.get("password", "") if isinstance(data, dict) else ""
+        if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+            return jsonify({"ok": False, "error": "Texts must be a non-empty list of strings."}), 400
+        max_items = app.config.get("BATCH_MAX_ITEMS", 1000)
+        if len(texts) > max_items:
+            return jsonify({"ok": False, "error": f"Batch is limited to {max_items} items."}), 400
+
+        total_length = sum(len(t) for t in texts)
+        try:
+            bundles = cc.aes_encrypt_many(texts, password, profile=scrypt_profile)
+        except cc.ExecutorBusy:
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            log_activity("encrypt_batch", "aes-gcm", total_length, success=False, error_msg=error_msg)
+            return jsonify({"ok": False, "error": error_msg}), 400
+        log_activity("encrypt_batch", "aes-gcm", total_length, success=True, meta={"items": len(texts)})
+        return jsonify({"ok": True, "bundles": [bundle.__dict__ for bundle in bundles]})
+
+    @app.post("/api/aes/decrypt/batch")
+    @login_required
+    def api_aes_decrypt_batch():
+        """AES-GCM decrypt many bundles; bundles sharing a salt derive the key once"""
+        data = request.get_json(force=True)
+        bundles = data.get("bundles") if isinstance(data, dict) else None
+        password = data.get("password", "") if isinstance(data, dict) else ""
+        if not isinstance(bundles, list) or not bundles:
+            return jsonify({"ok": False, "error": "Bundles must be a non-empty list."}), 400
+        max_items = app.config.get("BATCH_MAX_ITEMS", 1000)
+        if len(bundles) > max_items:
+            return jsonify({"ok": False, "error": f"Batch is limited to {max_items} items."}), 400
+
+        results = []
+        total_length = 0
+        for bundle_data in bundles:
+            try:
+                result = cc.aes_decrypt(cc.AESBundle.from_dict(bundle_data), password)
+            except ValueError as e:
+                results.append({"ok": False, "error": str(e)})
+                continue
+            total_length += len(result)
+            results.append({"ok": True, "result": result})
+        failed = sum(1 for result in results if not result["ok"])
+        log_activity(
+            "decrypt_batch",
+            "aes-gcm",
+            total_length,
+            success=failed == 0,
+            error_msg=f"{failed} of {len(bundles)} items failed" if failed else "",
+            meta={"items": len(bundles), "failed": failed},
+        )
+        return jsonify({"ok": True, "results": results})
+
+    def _aes_stream_response(action):
+        """Stream the raw request body through the segmented AES-GCM format"""
+        password = request.headers.get("X-AES-Password", "")
+        consumed = [0]
+
+        def chunks():
+            for chunk in cc.iter_byte_chunks(request.stream):
+                consumed[0] += len(chunk)
+                yield chunk
+
+        try:
+            if action == "encrypt":
+                output = cc.aes_stream_encrypt(chunks(), password, profile=scrypt_profile)
+            else:
+                output = cc.aes_stream_decrypt(chunks(), password)
+            first = next(output, b"")  # a wrong password fails here, before any bytes are sent
+        except cc.ExecutorBusy:
+            raise
+        except ValueError as e:
+            error_msg = str(e)
+            log_activity(action, "aes-gcm-stream", consumed[0], success=False, error_msg=error_msg, meta={"stream": True})
+            return jsonify({"ok": False, "error": error_msg}), 400
+
+        def generate():
+            try:
+                yield first
+                yield from output
+            except ValueError as e:
+                log_activity(action, "aes-gcm-stream", consumed[0], success=False, error_msg=str(e), meta={"stream": True})
+                raise  # abort the response so a truncated stream is never mistaken for a complete one
+            log_activity(action, "aes-gcm-stream", consumed[0], success=True, meta={"stream": True})
+
+        filename = secure_filename(request.args.get("filename", "")) or "data"
+        if action == "encrypt":
+            filename += ".claes"
+        elif filename.endswith(".claes"):
+            filename = filename[:-len(".claes")] or "data"
+        response = Response(stream_with_context(generate()), mimetype="application/octet-stream")
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @app.post("/api/aes/stream/encrypt")
+    @login_required
+    def api_aes_stream_encrypt():
+        """AES-GCM encrypt a raw body of any size; the password goes in X-AES-Password"""
+        return _aes_stream_response("encrypt")
+
+    @app.post("/api/aes/stream/decrypt")
+    @login_required
+    def api_aes_stream_decrypt():
+        """AES-GCM decrypt a segmented stream produced by /api/aes/stream/encrypt"""
+        return _aes_stream_response("decrypt")
+
     @app.post("/api/cookie-consent")
     def api_cookie_consent():
         """Log cookie consent choice"""
@@ -944,6 +1271,8 @@ def create_app(config_name="development"):
         record.ip_address = _get_client_ip()
         record.user_agent = _get_user_agent()
         db.session.commit()
+        if record.user_id:
+            identity_cache.invalidate(record.user_id)
 
         if current_user.is_authenticated:
             log_activity("cookie_consent", "system", 0, success=True, meta=prefs)
@@ -985,77 +1314,240 @@ def create_app(config_name="development"):
     @admin_required
     def admin_dashboard():
         """Admin dashboard"""
+        # Users, activity, admin logs, cookie prefs and the catalog are loaded
+        # by the page itself from the /admin/api/* keyset endpoints below.
         user_q = request.args.get("user_q", "").strip()
         cipher_q = request.args.get("cipher_q", "").strip()
-        cipher_page = max(int(request.args.get("cipher_page", 1)), 1)
-        cipher_per_page = 12
-
-        user_query = User.query
-        if user_q:
-            like = f"%{user_q}%"
-            user_query = user_query.filter(
-                (User.username.ilike(like)) | (User.email.ilike(like))
-            )
-        all_users = user_query.order_by(User.created_at.desc()).all()
 
-        cipher_query = CipherDefinition.query
-        if cipher_q:
-            like = f"%{cipher_q}%"
-            cipher_query = cipher_query.filter(
-                (CipherDefinition.name.ilike(like)) | (CipherDefinition.slug.ilike(like))
-            )
-        total_ciphers = cipher_query.count()
-        cipher_pages = max((total_ciphers + cipher_per_page - 1) // cipher_per_page, 1)
-        cipher_page = min(cipher_page, cipher_pages)
-        cipher_defs = (
-            cipher_query.order_by(CipherDefinition.name)
-            .offset((cipher_page - 1) * cipher_per_page)
-            .limit(cipher_per_page)
-            .all()
-        )
-
-        admin_logs = AdminLog.query.order_by(AdminLog.timestamp.desc()).limit(50).all()
-        activity_stats = db.session.query(
-            ActivityLog.cipher_name,
-            db.func.count(ActivityLog.id).label("count")
-        ).group_by(ActivityLog.cipher_name).all()
-        recent_activity = db.session.query(ActivityLog, User).join(User, User.id == ActivityLog.user_id).order_by(
-            ActivityLog.timestamp.desc()
-        ).limit(50).all()
+        activity_stats = [(row["cipher_name"], row["uses"]) for row in usage_rollups.usage()]
         total_users = User.query.count()
-        supported_total = CipherDefinition.query.filter_by(supported=True).count()
-        catalog_total = CipherDefinition.query.filter_by(supported=False).count()
+        catalog_snapshot = catalog_stats.snapshot()
+        supported_total = catalog_snapshot.count(supported_only=True)
+        catalog_total = catalog_snapshot.unsupported
         admin_users = User.query.filter_by(is_admin=True).order_by(User.username).all()
         standard_admin_count = User.query.filter_by(is_admin=True, admin_level="standard").count()
-        cookie_prefs = CookiePreference.query.order_by(CookiePreference.updated_at.desc()).limit(100).all()
-        cookie_prefs_by_user = {}
-        for pref in cookie_prefs:
-            if pref.user_id and pref.user_id not in cookie_prefs_by_user:
-                cookie_prefs_by_user[pref.user_id] = pref
         online_since = datetime.utcnow() - timedelta(minutes=15)
-        live_users = User.query.filter(User.last_seen_at >= online_since).order_by(User.last_seen_at.desc()).all()
+        live_seen = presence_tracker.online(online_since)
+        live_by_id = {user.id: user for user in User.query.filter(User.id.in_([uid for uid, _ in live_seen]))} if live_seen else {}
+        live_users = [live_by_id[uid] for uid, _ in live_seen if uid in live_by_id]
 
         return render_template(
             "admin_dashboard.html",
-            all_users=all_users,
-            cipher_defs=cipher_defs,
-            admin_logs=admin_logs,
             activity_stats=activity_stats,
-            recent_activity=recent_activity,
             total_users=total_users,
             supported_total=supported_total,
             catalog_total=catalog_total,
-            cipher_page=cipher_page,
-            cipher_pages=cipher_pages,
             cipher_q=cipher_q,
             user_q=user_q,
             admin_users=admin_users,
             standard_admin_count=standard_admin_count,
             high_admin_key_set=bool(app.config.get("HIGH_ADMIN_KEY") and app.config.get("HIGH_ADMIN_KEY") != "dev-high-admin-key-change-me"),
-            cookie_prefs_by_user=cookie_prefs_by_user,
-            cookie_prefs=cookie_prefs,
             live_users=live_users,
         )
+
+    # ---- Admin panels: keyset-paginated JSON, fetched lazily by admin.js ----
+
+    def _iso(value):
+        return value.isoformat() if value else None
+
+    def _page_args():
+        limit = request.args.get("limit", type=int) or app.config["ADMIN_PAGE_SIZE"]
+        return request.args.get("cursor") or None, min(max(limit, 1), 200)
+
+    def _high_admin_only():
+        if current_user.admin_level != "high":
+            return jsonify({"ok": False, "error": "High admin access required."}), 403
+        return None
+
+    def _cookie_flags(pref):
+        return {"functional": bool(pref.functional), "analytics": bool(pref.analytics), "marketing": bool(pref.marketing)}
+
+    @app.errorhandler(InvalidCursor)
+    def bad_cursor(e):
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    @app.get("/admin/api/users")
+    @admin_required
+    def admin_api_users():
+        """Users, newest first"""
+        cursor, limit = _page_args()
+        q = request.args.get("q", "").strip()
+        query = User.query
+        if q:
+            like = f"%{q}%"
+            query = query.filter((User.username.ilike(like)) | (User.email.ilike(like)))
+        users, next_cursor = seek(
+            query, (User.created_at, User.id), lambda u: (u.created_at, u.id), cursor, limit
+        )
+        high = current_user.admin_level == "high"
+        prefs = {}
+        if high and users:
+            # Latest preference per user on this page only (served by ix_cookie_preferences_user_updated)
+            for pref in CookiePreference.query.filter(CookiePreference.user_id.in_([u.id for u in users])).order_by(
+                CookiePreference.updated_at.desc()
+            ):
+                prefs.setdefault(pref.user_id, pref)
+        items = []
+        for user in users:
+            item = {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "provider": user.oauth_provider or "password",
+                "is_admin": bool(user.is_admin),
+                "admin_level": user.admin_level or "standard",
+            }
+            if high:
+                item.update(
+                    last_login_at=_iso(user.last_login_at),
+                    last_seen_at=_iso(user.last_seen_at),
+                    last_login_ip=user.last_login_ip or "",
+                    cookies=_cookie_flags(prefs[user.id]) if user.id in prefs else None,
+                )
+            items.append(item)
+        return jsonify({"ok": True, "items": items, "next": next_cursor})
+
+    @app.get("/admin/api/activity")
+    @admin_required
+    def admin_api_activity():
+        """Activity log across all users, newest first"""
+        denied = _high_admin_only()
+        if denied:
+            return denied
+        cursor, limit = _page_args()
+        query = db.session.query(ActivityLog, User.username).join(User, User.id == ActivityLog.user_id)
+        rows, next_cursor = seek(
+            query, (ActivityLog.timestamp, ActivityLog.id), lambda row: (row[0].timestamp, row[0].id), cursor, limit
+        )
+        items = [
+            {
+                "id": log.id,
+                "username": username,
+                "action": log.action,
+                "cipher_name": log.cipher_name,
+                "ip_address": log.ip_address or "",
+                "timestamp": _iso(log.timestamp),
+            }
+            for log, username in rows
+        ]
+        return jsonify({"ok": True, "items": items, "next": next_cursor})
+
+    @app.get("/admin/api/admin-logs")
+    @admin_required
+    def admin_api_admin_logs():
+        """Admin actions, newest first"""
+        cursor, limit = _page_args()
+        logs, next_cursor = seek(
+            AdminLog.query, (AdminLog.timestamp, AdminLog.id), lambda log: (log.timestamp, log.id), cursor, limit
+        )
+        items = [
+            {
+                "id": log.id,
+                "action": log.action,
+                "target": log.target,
+                "details": log.details or "",
+                "timestamp": _iso(log.timestamp),
+            }
+            for log in logs
+        ]
+        return jsonify({"ok": True, "items": items, "next": next_cursor})
+
+    @app.get("/admin/api/cookie-prefs")
+    @admin_required
+    def admin_api_cookie_prefs():
+        """Cookie consent records, most recently updated first"""
+        denied = _high_admin_only()
+        if denied:
+            return denied
+        cursor, limit = _page_args()
+        prefs, next_cursor = seek(
+            CookiePreference.query,
+            (CookiePreference.updated_at, CookiePreference.id),
+            lambda pref: (pref.updated_at, pref.id),
+            cursor,
+            limit,
+        )
+        items = [
+            {
+                "id": pref.id,
+                "user_id": pref.user_id,
+                "anon_id": pref.anon_id or "",
+                "choice": pref.choice,
+                **_cookie_flags(pref),
+                "ip_address": pref.ip_address or "",
+                "updated_at": _iso(pref.updated_at),
+            }
+            for pref in prefs
+        ]
+        return jsonify({"ok": True, "items": items, "next": next_cursor})
+
+    @app.get("/admin/api/catalog")
+    @admin_required
+    def admin_api_catalog():
+        """Cipher catalog: persisted rows by name, then generated variants (ranked when searching)"""
+        cursor, limit = _page_args()
+        entries, next_cursor = catalog.seek(cursor, limit, q=request.args.get("q", "").strip())
+        items = [
+            {
+                "id": entry.id,
+                "slug": entry.slug,
+                "name": entry.name,
+                "description": entry.description,
+                "category": entry.category,
+                "supported": bool(entry.supported),
+            }
+            for entry in entries
+        ]
+        return jsonify({"ok": True, "items": items, "next": next_cursor})
+
+    @app.get("/admin/api/usage")
+    @admin_required
+    def admin_api_usage():
+        """Usage counters from the hourly rollups (?hours= or ?since=&until=, cipher, action, by)"""
+        by = request.args.get("by", "cipher")
+        if by not in ("cipher", "cipher_action", "hour"):
+            return jsonify({"ok": False, "error": "by must be cipher, cipher_action or hour."}), 400
+        try:
+            since, until = parse_window(
+                request.args.get("hours", "24"), request.args.get("since"), request.args.get("until")
+            )
+        except ValueError:
+            return jsonify({"ok": False, "error": "Invalid time window."}), 400
+        items = usage_rollups.usage(
+            since, until,
+            cipher_name=request.args.get("cipher", "").strip() or None,
+            action=request.args.get("action", "").strip() or None,
+            by=by,
+        )
+        for item in items:
+            if "hour" in item:
+                item["hour"] = _iso(item["hour"])
+        # Rollups are hourly, so the window starts at the first whole hour after `since`
+        since = first_hour(since) if since else None
+        return jsonify({"ok": True, "since": _iso(since), "until": _iso(until), "items": items})
+
+    @app.get("/admin/api/archive/<table>")
+    @admin_required
+    def admin_api_archive(table):
+        """Archived log rows (?since=&until=, user_id, action, limit), oldest first"""
+        denied = _high_admin_only()
+        if denied:
+            return denied
+        if table not in RETENTION_POLICIES:
+            return jsonify({"ok": False, "error": "Unknown log table."}), 404
+        _, limit = _page_args()
+        try:
+            since, until = parse_window(since=request.args.get("since"), until=request.args.get("until"))
+        except ValueError:
+            return jsonify({"ok": False, "error": "Invalid time window."}), 400
+        filters = {}
+        user_id = request.args.get("user_id", type=int)
+        if user_id is not None:
+            filters["user_id" if table == "activity_logs" else "admin_id"] = user_id
+        if request.args.get("action"):
+            filters["action"] = request.args["action"]
+        items = list(log_retention.query_archive(table, since, until, limit=limit, **filters))
+        return jsonify({"ok": True, "months": list(log_retention.archived_months(table)), "items": items})
     
     @app.post("/admin/ciphers/create")
     @admin_required
@@ -1072,7 +1564,7 @@ def create_app(config_name="development"):
             flash("Slug and name required.", "error")
             return redirect(url_for("admin_dashboard"))
         
-        if CipherDefinition.query.filter_by(slug=slug).first():
+        if catalog.get(slug):
             flash("Cipher with this slug already exists.", "error")
             return redirect(url_for("admin_dashboard"))
         
@@ -1090,7 +1582,7 @@ def create_app(config_name="development"):
             default_params=default_params,
         )
         db.session.add(cipher)
-        db.session.commit()
+        catalog.record_change(added=cipher)
         
         log_admin_action("create_cipher", slug, f"Created cipher: {name}")
         flash(f"Cipher '{name}' created.", "success")
@@ -1103,7 +1595,7 @@ def create_app(config_name="development"):
         cipher = CipherDefinition.query.get_or_404(cipher_id)
         slug = cipher.slug
         db.session.delete(cipher)
-        db.session.commit()
+        catalog.record_change(removed_id=cipher_id)
         
         log_admin_action("delete_cipher", slug, f"Deleted cipher: {cipher.name}")
         flash(f"Cipher '{cipher.name}' deleted.", "success")
@@ -1126,6 +1618,7 @@ def create_app(config_name="development"):
         user.is_admin = True
         user.admin_level = "standard"
         db.session.commit()
+        identity_cache.invalidate(user.id)
         
         log_admin_action("promote_user", user.username, "Promoted to admin")
         flash(f"User '{user.username}' promoted to admin.", "success")
@@ -1146,6 +1639,7 @@ def create_app(config_name="development"):
         user.is_admin = False
         user.admin_level = "standard"
         db.session.commit()
+        identity_cache.invalidate(user.id)
         
         log_admin_action("demote_user", user.username, f"Demoted from admin")
         flash(f"User '{user.username}' demoted.", "success")
@@ -1167,11 +1661,28 @@ def create_app(config_name="development"):
         username = user.username
         db.session.delete(user)
         db.session.commit()
+        identity_cache.invalidate(user_id)
+        presence_tracker.forget(user_id)
         
         log_admin_action("delete_user", username, f"User account deleted")
         flash(f"User '{username}' deleted.", "success")
         return redirect(url_for("admin_dashboard"))
 
+    @app.get("/admin/log-pipeline")
+    @admin_required
+    def admin_log_pipeline():
+        """Activity log writer, presence, identity cache, search and catalog counters"""
+        return jsonify({
+            "ok": True,
+            "stats": activity_log_writer.stats(),
+            "presence": presence_tracker.stats(),
+            "identity": identity_cache.stats(),
+            "search": cipher_search.stats(),
+            "catalog": catalog_stats.stats(),
+            "rollups": usage_rollups.stats(),
+            "retention": log_retention.stats(),
+        })
+
     @app.get("/admin/users/<int:user_id>")
     @admin_required
     def admin_user_detail(user_id):
@@ -1202,6 +1713,13 @@ def create_app(config_name="development"):
     @app.errorhandler(500)
     def server_error(e):
         return render_template("error.html", code=500, message="Server error."), 500
+
+    @app.errorhandler(cc.ExecutorBusy)
+    def cpu_busy(e):
+        response = jsonify({"ok": False, "error": "Server is busy, please retry shortly."})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(app.config["CPU_RETRY_AFTER"])
+        return response
     
     return app
 
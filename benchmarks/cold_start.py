@@ -0,0 +1,66 @@
+"""
+Cold-start benchmark: wall time from `import app` to the first response.
+
+Each run is a fresh interpreter, as on a serverless cold start. "fresh" runs
+start from an empty SQLite database; "warm" runs reuse one that an earlier
+process already created and seeded.
+
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --repo /path/to/other/checkout   # e.g. a `git worktree` of an older commit
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app as appmod
+imported = time.perf_counter()
+response = appmod.app.test_client().get(sys.argv[2])
+done = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({"import": imported - start, "first_response": done - start}))
+"""
+
+def _probe(repo, database, path):
+    env = dict(os.environ, DATABASE_URL="sqlite:///" + database, CPU_POOL_WORKERS="0")
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, repo, path],
+        env=env, cwd=repo, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def _summary(samples, field):
+    values = sorted(sample[field] * 1000 for sample in samples)
+    return f"median {statistics.median(values):8.1f} ms  min {values[0]:8.1f} ms  max {values[-1]:8.1f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repo", default=ROOT, help="checkout to benchmark (default: this one)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/", help="URL of the first request")
+    args = parser.parse_args()
+
+    repo = os.path.abspath(args.repo)
+    with tempfile.TemporaryDirectory() as tmp:
+        fresh = [_probe(repo, os.path.join(tmp, f"fresh-{i}.sqlite3"), args.path) for i in range(args.runs)]
+        warm_db = os.path.join(tmp, "warm.sqlite3")
+        _probe(repo, warm_db, args.path)
+        warm = [_probe(repo, warm_db, args.path) for _ in range(args.runs)]
+
+    print(f"repo: {repo}  runs: {args.runs}  first request: GET {args.path}")
+    for label, samples in (("fresh db", fresh), ("warm db", warm)):
+        print(f"  {label:9s} import          {_summary(samples, 'import')}")
+        print(f"  {label:9s} first response  {_summary(samples, 'first_response')}")
+
+if __name__ == "__main__":
+    main()
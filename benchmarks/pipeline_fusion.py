@@ -0,0 +1,71 @@
+"""
+Pipeline fusion benchmark: a compiled cipher chain against running its steps one by one.
+
+The chain mixes per-character ciphers with transpositions, so step by step
+it makes one pass per cipher; compiled, it runs as one translate plus one
+gather. "sharp-s" text has a character (ß) that uppercases to two, which
+forces the chain-order passes.
+
+    python benchmarks/pipeline_fusion.py
+    python benchmarks/pipeline_fusion.py --sizes 10000 1000000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import crypto_core as cc  # noqa: E402
+
+CHAIN = [
+    {"slug": "caesar", "params": {"shift": 3}},
+    {"slug": "rail-fence", "params": {"rails": 4}},
+    {"slug": "substitution", "params": {"key": "QWERTYUIOPASDFGHJKLZXCVBNM"}},
+    {"slug": "rail-fence-7", "params": {}},
+    {"slug": "atbash", "params": {}},
+    {"slug": "reverse", "params": {}},
+    {"slug": "affine", "params": {"a": 5, "b": 8}},
+]
+
+def _sequential(text, action):
+    run = cc.encrypt_with_cipher if action == "encrypt" else cc.decrypt_with_cipher
+    for step in CHAIN if action == "encrypt" else CHAIN[::-1]:
+        text = run(step["slug"], text, **step["params"])
+    return text
+
+def _best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), statistics.median(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pipeline = cc.compile_pipeline(CHAIN)
+    print(f"chain: {' > '.join(step['slug'] for step in CHAIN)}")
+    print(f"passes: {len(pipeline.encrypt_pass.stages)} (fused: {len(pipeline.encrypt_pass.commuted or ())})"
+          f"  numpy: {cc._np is not None}")
+    sample = "The quick brown fox jumps over the lazy dog; pack my box with five dozen liquor jugs. "
+    for size in args.sizes:
+        for label, text in (("ascii", (sample * (size // len(sample) + 1))[:size]),
+                            ("unicode", (sample.replace("o", "ö") * (size // len(sample) + 1))[:size]),
+                            ("sharp-s", (sample.replace("s", "ß") * (size // len(sample) + 1))[:size])):
+            seq, _, expected = _best(lambda: _sequential(text, "encrypt"), args.repeat)
+            fused, _, result = _best(lambda: pipeline.encrypt(text), args.repeat)
+            assert result == expected
+            assert pipeline.decrypt(result) == _sequential(result, "decrypt")
+            print(f"  {size:>9} chars {label:<8} steps {seq * 1000:9.2f} ms  compiled {fused * 1000:9.2f} ms"
+                  f"  x{seq / fused:5.1f}")
+
+if __name__ == "__main__":
+    main()
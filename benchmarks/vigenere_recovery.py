@@ -0,0 +1,72 @@
+"""
+Vigenère key recovery benchmark: period search and full key recovery time
+over ciphertexts of increasing size.
+
+Each corpus is English prose from the standard library docs (sentences
+shuffled with a fixed seed and repeated up to the size), encrypted with
+vigenere-key-<KEY>. "period search" is IC plus Kasiski over every
+candidate period; "recover" adds the column solve and quadgram ranking.
+
+    python benchmarks/vigenere_recovery.py
+    python benchmarks/vigenere_recovery.py --sizes 10000 100000 --no-numpy   # pure-Python fallback
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import crypto_core as cc  # noqa: E402
+import cryptanalysis  # noqa: E402
+
+def _corpus(size, seed=7):
+    sentences = re.split(r"(?<=[.!?]) +", cryptanalysis.stdlib_corpus())
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        rng.shuffle(sentences)
+        for sentence in sentences:
+            parts.append(sentence)
+            length += len(sentence) + 1
+            if length >= size:
+                break
+    return " ".join(parts)[:size]
+
+def _time(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 4_000_000])
+    parser.add_argument("--key", default="CRYPTANALYSIS")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-numpy", action="store_true", help="benchmark the pure-Python fallback")
+    args = parser.parse_args()
+
+    if args.no_numpy:
+        cryptanalysis._np = None
+    cryptanalysis.english_model()
+    print(f"key: {args.key} ({len(args.key)} letters)  numpy: {cryptanalysis._np is not None}  runs: {args.runs}")
+    for size in args.sizes:
+        ciphertext = cc.vigenere_encrypt(_corpus(size), args.key)
+        values, positions = cryptanalysis._key_positions(ciphertext, "letters")
+        search_ms, periods = _time(lambda: cryptanalysis.estimate_periods(values, positions), args.runs)
+        recover_ms, recoveries = _time(lambda: cryptanalysis.recover_keys(ciphertext), args.runs)
+        best = recoveries[0]
+        status = "ok" if best.slug == f"vigenere-key-{args.key}" else f"got {best.slug}"
+        print(f"  {size:>9,} chars  period search {search_ms:9.1f} ms  recover {recover_ms:9.1f} ms  "
+              f"period {periods[0].period} (IC {periods[0].ic:.4f})  {status}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Virtual cipher catalog.
+Fixed-parameter variants (caesar-N, xor-N, vigenere-key-*, ...) are not stored
+as cipher_definitions rows; each family is an integer range whose members are
+formatted on demand. The catalog merges them after the persisted rows and
+answers count, category filter and offset/limit pagination from the ranges,
+so a family can grow to any size without touching the database. Searches go
+through the ranked index in search.py; totals and per-category counts come
+from CatalogStats, a snapshot cached per catalog revision.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from models import db, CipherDefinition, AppMeta
+from pagination import InvalidCursor, after, decode_cursor, encode_cursor
+from search import cipher_search, bump_catalog_revision, current_catalog_revision
+
+VARIANT_CATEGORY = "variant"
+_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+@dataclass(frozen=True)
+class VirtualCipher:
+    """A generated catalog entry; quacks like CipherDefinition for templates"""
+    slug: str
+    name: str
+    description: str
+    category: str = VARIANT_CATEGORY
+    supported: bool = True
+    base_slug: str = ""
+    default_params: str = ""
+    id: Optional[int] = None
+
+@dataclass(frozen=True)
+class VariantFamily:
+    """
+    Members start..start+count-1 of one variant family. Numeric families use
+    the number as key ("xor-42"); with width > 0 the number is written in
+    base 26 with that many letters ("vigenere-key-abc").
+    """
+    prefix: str
+    name: str
+    description: str
+    count: int
+    start: int = 0
+    width: int = 0
+
+    def label(self, i: int) -> str:
+        n = self.start + i
+        if not self.width:
+            return str(n)
+        chars = []
+        for _ in range(self.width):
+            n, rem = divmod(n, 26)
+            chars.append(_ALPHABET[rem])
+        return "".join(reversed(chars))
+
+    def entry(self, i: int) -> VirtualCipher:
+        label = self.label(i)
+        return VirtualCipher(
+            slug=self.prefix + label.lower(),
+            name=self.name.format(label),
+            description=self.description.format(label),
+        )
+
+    def index(self, slug: str) -> Optional[int]:
+        """Member index of slug in this family, or None"""
+        if not slug.startswith(self.prefix):
+            return None
+        key = slug[len(self.prefix):]
+        if not self.width:
+            if not key.isdigit() or str(int(key)) != key:
+                return None
+            i = int(key) - self.start
+        else:
+            if len(key) != self.width or not key.isascii() or not key.isalpha() or not key.islower():
+                return None
+            n = 0
+            for ch in key:
+                n = n * 26 + ord(ch) - ord("a")
+            i = n - self.start
+        return i if 0 <= i < self.count else None
+
+VARIANT_FAMILIES = (
+    VariantFamily("caesar-", "Caesar Shift {}", "Fixed Caesar shift of {}.", count=26),
+    VariantFamily("rot-", "ROT-{}", "ROT variant with shift {}.", count=25, start=1),
+    VariantFamily("shift-", "Shift {}", "Simple shift variant with fixed offset {}.", count=25, start=1),
+    VariantFamily("rail-fence-", "Rail Fence ({} rails)", "Rail fence with {} rails.", count=11, start=2),
+    VariantFamily("xor-", "XOR {}", "Fixed XOR key {}.", count=255, start=1),
+    VariantFamily("atbash-shift-", "Atbash + Shift {}", "Atbash followed by shift {}.", count=26),
+    VariantFamily("vigenere-key-", "Vigenere Key {}", "Vigenere with fixed key {}.", count=300, width=3),
+    VariantFamily("beaufort-key-", "Beaufort Key {}", "Beaufort with fixed key {}.", count=200, width=4),
+)
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Catalog counts at one revision: persisted rows by (category, supported) plus the families"""
+    revision: Optional[str]
+    persisted: Mapping[Tuple[str, bool], int]
+    virtual: int
+
+    def persisted_count(self, category="all", supported_only=False):
+        return sum(
+            n for (cat, supported), n in self.persisted.items()
+            if (not category or category == "all" or cat == category) and (supported or not supported_only)
+        )
+
+    def virtual_count(self, category="all"):
+        return self.virtual if not category or category in ("all", VARIANT_CATEGORY) else 0
+
+    def count(self, category="all", supported_only=False):
+        return self.persisted_count(category, supported_only) + self.virtual_count(category)
+
+    @property
+    def unsupported(self):
+        return sum(n for (_, supported), n in self.persisted.items() if not supported)
+
+    @property
+    def categories(self):
+        names = {cat for cat, _ in self.persisted if cat}
+        if self.virtual:
+            names.add(VARIANT_CATEGORY)
+        return sorted(names)
+
+    def to_json(self):
+        return json.dumps({
+            "revision": self.revision,
+            "persisted": [[cat, supported, n] for (cat, supported), n in sorted(self.persisted.items())],
+        })
+
+class MemoryStatsStore:
+    """Nothing is shared: each worker aggregates once per revision and keeps the snapshot in memory"""
+
+    def load(self, revision):
+        return None
+
+    def save(self, snapshot):
+        pass
+
+class SqlStatsStore:
+    """
+    Snapshots are shared through app_meta, so only the first worker (or cold
+    start) after a catalog change runs the aggregate query.
+    """
+    KEY = "catalog_stats"
+
+    def load(self, revision):
+        raw = db.session.execute(select(AppMeta.value).where(AppMeta.key == self.KEY)).scalar()
+        if not raw:
+            return None
+        data = json.loads(raw)
+        if data.get("revision") != revision:
+            return None
+        return {(cat, bool(supported)): n for cat, supported, n in data["persisted"]}
+
+    def save(self, snapshot):
+        db.session.merge(AppMeta(key=self.KEY, value=snapshot.to_json()))
+        db.session.commit()
+
+class CatalogStats:
+    """Flask extension: catalog totals, per-category counts and categories, cached per revision"""
+
+    def __init__(self, app=None, families=()):
+        self.families = tuple(families)
+        self.store = MemoryStatsStore()
+        self.refresh_interval = 30.0
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.computed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CATALOG_STATS_BACKEND", "memory")
+        app.config.setdefault("CATALOG_STATS_REFRESH_SECONDS", 30)
+        self.store = SqlStatsStore() if app.config["CATALOG_STATS_BACKEND"] == "sql" else MemoryStatsStore()
+        self.refresh_interval = float(app.config["CATALOG_STATS_REFRESH_SECONDS"])
+        app.extensions["catalog_stats"] = self
+
+    def _aggregate(self):
+        rows = db.session.execute(
+            select(CipherDefinition.category, CipherDefinition.supported, func.count())
+            .group_by(CipherDefinition.category, CipherDefinition.supported)
+        )
+        persisted = {}
+        for category, supported, n in rows:
+            key = (category or "", bool(supported))
+            persisted[key] = persisted.get(key, 0) + n
+        return persisted
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current counts; the revision is re-read at most once per refresh interval"""
+        now = time.monotonic()
+        with self._lock:
+            if self._snapshot is not None and now - self._checked_at < self.refresh_interval:
+                return self._snapshot
+            revision = current_catalog_revision()
+            self._checked_at = now
+            if self._snapshot is None or self._snapshot.revision != revision:
+                persisted = self.store.load(revision)
+                fresh = persisted is None
+                if fresh:
+                    persisted = self._aggregate()
+                    self.computed += 1
+                snapshot = CatalogSnapshot(
+                    revision=revision,
+                    persisted=MappingProxyType(persisted),
+                    virtual=sum(family.count for family in self.families),
+                )
+                if fresh:
+                    self.store.save(snapshot)
+                self._snapshot = snapshot
+            return self._snapshot
+
+    def invalidate(self):
+        """Re-read the revision on the next snapshot()"""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "backend": "sql" if isinstance(self.store, SqlStatsStore) else "memory",
+            "revision": snapshot.revision if snapshot else None,
+            "total": snapshot.count() if snapshot else None,
+            "computed": self.computed,
+        }
+
+class VirtualCatalog:
+    """Persisted CipherDefinition rows (ordered by name) followed by the variant families"""
+
+    def __init__(self, families=VARIANT_FAMILIES):
+        self.families = tuple(families)
+
+    def _query(self, category="all", supported_only=False):
+        query = CipherDefinition.query
+        if supported_only:
+            query = query.filter_by(supported=True)
+        if category and category != "all":
+            query = query.filter_by(category=category)
+        return query
+
+    def _families(self, category="all"):
+        if category and category not in ("all", VARIANT_CATEGORY):
+            return ()
+        return self.families
+
+    def count(self, q="", category="all", supported_only=False):
+        if q:
+            return len(cipher_search.search(q, category, supported_only))
+        return catalog_stats.snapshot().count(category, supported_only)
+
+    def page(self, offset, limit, q="", category="all", supported_only=False) -> Tuple[int, List]:
+        """(total matching entries, entries[offset:offset + limit]); searches are ranked"""
+        if q:
+            return self._search_page(offset, limit, q, category, supported_only)
+        query = self._query(category, supported_only)
+        snapshot = catalog_stats.snapshot()
+        persisted = snapshot.persisted_count(category, supported_only)
+        families = self._families(category)
+        total = snapshot.count(category, supported_only)
+        entries = []
+        if offset < persisted:
+            entries = query.order_by(CipherDefinition.name).offset(offset).limit(limit).all()
+        skip = max(offset - persisted, 0)
+        for family in families:
+            wanted = limit - len(entries)
+            if wanted <= 0:
+                break
+            if skip >= family.count:
+                skip -= family.count
+                continue
+            entries.extend(family.entry(i) for i in range(skip, min(skip + wanted, family.count)))
+            skip = 0
+        return total, entries
+
+    def _search_page(self, offset, limit, q, category, supported_only):
+        hits = cipher_search.search(q, category, supported_only)
+        window = hits[offset:offset + limit]
+        row_ids = [hit.row_id for hit in window if hit.row_id is not None]
+        rows = {row.id: row for row in CipherDefinition.query.filter(CipherDefinition.id.in_(row_ids))} if row_ids else {}
+        entries = []
+        for hit in window:
+            if hit.row_id is None:
+                entries.append(self.families[hit.family].entry(hit.member))
+            elif hit.row_id in rows:
+                entries.append(rows[hit.row_id])
+        return len(hits), entries
+
+    def seek(self, cursor=None, limit=24, q="", category="all", supported_only=False) -> Tuple[List, Optional[str]]:
+        """
+        Keyset page: (entries, next cursor or None). The cursor names the last
+        entry returned: ["r", name, id] for a persisted row (continued with a
+        (name, id) seek), ["v", family, member] for a generated entry, or
+        ["s", rank] for a position in the ranked search results.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        kind = position[0] if position else None
+        shapes = {"r": (str, str, int), "v": (str, int, int), "s": (str, int)}
+        if position is not None and (
+            kind not in shapes or len(position) != len(shapes[kind])
+            or not all(isinstance(v, t) for v, t in zip(position, shapes[kind]))
+            or any(v < 0 for v in position[1:] if isinstance(v, int))
+        ):
+            raise InvalidCursor("Invalid cursor.")
+        if q:
+            start = position[1] + 1 if kind == "s" else 0
+            total, entries = self._search_page(start, limit, q, category, supported_only)
+            return entries, encode_cursor(["s", start + limit - 1]) if start + limit < total else None
+
+        picked = []
+        if kind in (None, "r"):
+            query = self._query(category, supported_only)
+            if kind == "r":
+                query = query.filter(after((CipherDefinition.name, CipherDefinition.id), position[1:], descending=False))
+            rows = query.order_by(CipherDefinition.name, CipherDefinition.id).limit(limit + 1).all()
+            picked = [(["r", row.name, row.id], row) for row in rows]
+            family_start, member_start = 0, 0
+        elif kind == "v":
+            family_start, member_start = position[1], position[2] + 1
+        else:
+            raise InvalidCursor("Invalid cursor.")
+        if self._families(category):
+            for f in range(family_start, len(self.families)):
+                family = self.families[f]
+                first = member_start if f == family_start else 0
+                for i in range(first, min(family.count, first + limit + 1 - len(picked))):
+                    picked.append((["v", f, i], family.entry(i)))
+                if len(picked) > limit:
+                    break
+        if len(picked) <= limit:
+            return [entry for _, entry in picked], None
+        picked = picked[:limit]
+        return [entry for _, entry in picked], encode_cursor(picked[-1][0])
+
+    def categories(self):
+        return catalog_stats.snapshot().categories
+
+    def record_change(self, added=None, removed_id=None):
+        """
+        Commit an admin edit to cipher_definitions under a new catalog
+        revision and publish it to this process's search index and stats.
+        Other workers pick up the revision within their refresh interval.
+        """
+        previous = current_catalog_revision()
+        revision = bump_catalog_revision()
+        db.session.commit()
+        if added is not None:
+            cipher_search.add(added, previous, revision)
+        if removed_id is not None:
+            cipher_search.remove(removed_id, previous, revision)
+        catalog_stats.invalidate()
+
+    def virtual(self, slug) -> Optional[VirtualCipher]:
+        """The generated entry for slug, if some family covers it"""
+        for family in self.families:
+            i = family.index(slug)
+            if i is not None:
+                return family.entry(i)
+        return None
+
+    def get(self, slug):
+        """CipherDefinition row or generated entry for slug, or None"""
+        return CipherDefinition.query.filter_by(slug=slug).first() or self.virtual(slug)
+
+catalog = VirtualCatalog()
+catalog_stats = CatalogStats(families=VARIANT_FAMILIES)
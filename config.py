@@ -52,6 +52,79 @@ class Config:
     # High admin key required to authorize new admins
     HIGH_ADMIN_KEY = os.environ.get("HIGH_ADMIN_KEY", "dev-high-admin-key-change-me")
 
+    # Check the seeded catalog fingerprint at startup; disable to seed only via `flask seed`
+    SEED_ON_STARTUP = os.environ.get("SEED_ON_STARTUP", "1") == "1"
+
+    # Cipher search: "memory" (n-gram index per process) or "database" (SQLite FTS5 / Postgres pg_trgm)
+    SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "memory")
+    SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE", "256"))
+    SEARCH_REFRESH_SECONDS = int(os.environ.get("SEARCH_REFRESH_SECONDS", "30"))
+
+    # Catalog counts are cached per catalog revision: "memory" (per worker) or "sql" (shared via app_meta)
+    CATALOG_STATS_BACKEND = os.environ.get("CATALOG_STATS_BACKEND", "memory")
+    CATALOG_STATS_REFRESH_SECONDS = int(os.environ.get("CATALOG_STATS_REFRESH_SECONDS", "30"))
+
+    # Fold activity logs into hourly per-cipher counters (usage_rollups) as they are written
+    USAGE_ROLLUPS_ENABLED = os.environ.get("USAGE_ROLLUPS_ENABLED", "1") == "1"
+
+    # Whole months older than these many days are archived by `flask logs archive` (0 keeps forever)
+    ACTIVITY_LOG_RETENTION_DAYS = int(os.environ.get("ACTIVITY_LOG_RETENTION_DAYS", "90"))
+    ADMIN_LOG_RETENTION_DAYS = int(os.environ.get("ADMIN_LOG_RETENTION_DAYS", "365"))
+    LOG_ARCHIVE_DIR = os.environ.get("LOG_ARCHIVE_DIR") or os.path.join(INSTANCE_DIR, "log_archive")
+    LOG_RETENTION_BATCH_SIZE = int(os.environ.get("LOG_RETENTION_BATCH_SIZE", "2000"))
+
+    # Rows per request for the lazily loaded admin panels (/admin/api/*)
+    ADMIN_PAGE_SIZE = int(os.environ.get("ADMIN_PAGE_SIZE", "50"))
+
+    # Maximum number of items, and of text characters over all items, accepted by /api/encrypt/batch
+    BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "1000"))
+    BATCH_MAX_CHARS = int(os.environ.get("BATCH_MAX_CHARS", str(4 * 1024 * 1024)))
+
+    # /api/crack: longest accepted ciphertext, characters scored per key, most
+    # candidates returned, and the score (mean log10 quadgram probability;
+    # English prose is about -4.5) past which the remaining keyspaces are
+    # skipped. CRACK_STOP_SCORE=inf always tries every key.
+    CRACK_MAX_LENGTH = int(os.environ.get("CRACK_MAX_LENGTH", str(1024 * 1024)))
+    CRACK_SAMPLE_CHARS = int(os.environ.get("CRACK_SAMPLE_CHARS", "20000"))
+    CRACK_MAX_TOP_K = int(os.environ.get("CRACK_MAX_TOP_K", "20"))
+    CRACK_STOP_SCORE = float(os.environ.get("CRACK_STOP_SCORE", "-5.0"))
+    # Wall-clock seconds a "substitution" keyspace search may take (restarts run on the CPU pool)
+    CRACK_SUBSTITUTION_BUDGET = float(os.environ.get("CRACK_SUBSTITUTION_BUDGET", "5"))
+
+    # Most bigrams and trigrams /api/analyze lists
+    ANALYZE_MAX_TOP = int(os.environ.get("ANALYZE_MAX_TOP", "100"))
+
+    # Scrypt cost for new AES bundles (recorded in each bundle), and the
+    # in-process cache of derived keys used when decrypting
+    AES_SCRYPT_N = int(os.environ.get("AES_SCRYPT_N", str(2**14)))
+    AES_SCRYPT_R = int(os.environ.get("AES_SCRYPT_R", "8"))
+    AES_SCRYPT_P = int(os.environ.get("AES_SCRYPT_P", "1"))
+    AES_KEY_CACHE_SIZE = int(os.environ.get("AES_KEY_CACHE_SIZE", "256"))
+    AES_KEY_CACHE_TTL = int(os.environ.get("AES_KEY_CACHE_TTL", "300"))
+
+    # Process pool for KDF and large-payload cipher jobs (per web worker).
+    # Past CPU_POOL_MAX_PENDING queued jobs, requests get a 503 with Retry-After.
+    CPU_POOL_WORKERS = int(os.environ.get("CPU_POOL_WORKERS", "0" if _is_serverless else "2"))
+    CPU_POOL_MAX_PENDING = int(os.environ.get("CPU_POOL_MAX_PENDING", "8"))
+    CPU_POOL_TIMEOUT = float(os.environ.get("CPU_POOL_TIMEOUT", "30"))
+    CPU_OFFLOAD_MIN_LENGTH = int(os.environ.get("CPU_OFFLOAD_MIN_LENGTH", str(256 * 1024)))
+    CPU_RETRY_AFTER = int(os.environ.get("CPU_RETRY_AFTER", "2"))
+
+    # Activity log rows are queued and bulk-inserted by a background thread.
+    # Serverless hosts freeze threads between requests, so they write inline.
+    ACTIVITY_LOG_ASYNC = os.environ.get("ACTIVITY_LOG_ASYNC", "0" if _is_serverless else "1") == "1"
+    ACTIVITY_LOG_QUEUE_SIZE = int(os.environ.get("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+    ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get("ACTIVITY_LOG_BATCH_SIZE", "500"))
+    ACTIVITY_LOG_FLUSH_MS = int(os.environ.get("ACTIVITY_LOG_FLUSH_MS", "500"))
+
+    # Last-seen presence is kept in memory and written back this often
+    PRESENCE_ASYNC = os.environ.get("PRESENCE_ASYNC", "0" if _is_serverless else "1") == "1"
+    PRESENCE_FLUSH_SECONDS = int(os.environ.get("PRESENCE_FLUSH_SECONDS", "60"))
+
+    # Logged-in identity snapshots; invalidation is per process, so keep the TTL short
+    IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", "1024"))
+    IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", "15"))
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
@@ -0,0 +1,866 @@
+"""
+Ciphertext-only cryptanalysis.
+Every Caesar shift, affine key, XOR byte and rail count is tried against a
+ciphertext, and Vigenère-family keys are recovered column by column once
+the key period is known. Each candidate plaintext is scored against
+English: the mean log10 quadgram probability from english_model(), a
+precomputed 26**4 uint8 table shipped gzipped in data/. A chi-squared test
+on letter frequencies is reported alongside. Each keyspace runs as one job
+on crypto_core.CPU_EXECUTOR. Solvers stop once a candidate scores above
+the stop threshold and return the top-k candidates.
+"""
+
+import gzip
+import itertools
+import math
+import os
+import random
+import re
+import string
+import struct
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import crypto_core as cc
+from crypto_core import _np
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "english_quadgrams.bin.gz")
+_HEADER = struct.Struct("<ff")  # log10 probability of table value 0 and of table value 255
+_SIZE = 26 ** 4
+
+# Relative letter frequencies of English text (A-Z), for the chi-squared test
+ENGLISH_FREQUENCIES = (
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+)
+
+AFFINE_MULTIPLIERS = (1, 3, 5, 7, 9, 11, 15, 17, 19, 21, 23, 25)  # units mod 26; a = 1 is Caesar
+RAIL_RANGE = range(2, 13)  # matches the rail-fence-N catalog variants
+PERIOD_RANGE = range(2, 41)  # Vigenère-family key lengths
+SUBSTITUTION_RESTARTS = 64  # annealing runs per substitution search
+# keyspace -> number of keys ("vigenere": key periods, each solved column by column;
+# "substitution": annealing restarts)
+KEYSPACES = {
+    "caesar": 26,
+    "affine": 26 * len(AFFINE_MULTIPLIERS),
+    "xor": 255,
+    "rail-fence": len(RAIL_RANGE),
+    "vigenere": len(PERIOD_RANGE),
+    "substitution": SUBSTITUTION_RESTARTS,
+}
+# "caesar" is the a = 1 slice of "affine". "vigenere" and "substitution" are
+# opt-in: on short texts their many keys can fit noise better than a simpler
+# cipher fits the truth, and a substitution search takes seconds.
+DEFAULT_KEYSPACES = ("affine", "xor", "rail-fence")
+
+XOR_KEYS = range(1, 256)  # the xor-N catalog variants
+_PRINTABLE = frozenset(range(32, 127)) | {9, 10, 13}
+# Letters make up well over this share of the non-space characters of English text
+LETTER_SHARE = 0.8
+
+# ============ ENGLISH MODEL ============
+
+class QuadgramModel:
+    """
+    log10 P(quadgram) for every A-Z quadgram, quantized to one byte each.
+    Value v stands for floor + v * step, so sums of table values rank
+    candidates exactly like sums of log probabilities.
+    """
+
+    def __init__(self, table: bytes, floor: float, top: float):
+        if len(table) != _SIZE:
+            raise ValueError("Quadgram table must have 26**4 entries.")
+        self.table = table
+        self.floor = floor
+        self.step = (top - floor) / 255
+        self.array = _np.frombuffer(table, dtype=_np.uint8) if _np is not None else None
+
+    @classmethod
+    def from_corpus(cls, text: str, backoff: float = 0.4) -> "QuadgramModel":
+        """
+        Estimate log10 P(abcd) = log P(a) + log S(b|a) + log S(c|ab) + log S(d|abc)
+        from a corpus (letters only), where S is a stupid-backoff estimate:
+        the n-gram's relative frequency when it was seen, otherwise `backoff`
+        times the estimate from one letter less context. A modest corpus then
+        still ranks unseen but plausible quadgrams above impossible ones.
+        """
+        values = [int(value) for value in _letter_values(text)]
+        grams = [Counter(tuple(values[i:i + n]) for i in range(len(values) - n + 1)) for n in range(1, 5)]
+        if not grams[3]:
+            raise ValueError("Corpus has no quadgrams.")
+        total = len(values)
+
+        def conditional(context, letter):
+            # S(letter | context), backing off one context letter at a time
+            penalty = 1.0
+            while context:
+                seen = grams[len(context)].get(context + (letter,), 0)
+                if seen:
+                    return penalty * seen / grams[len(context) - 1][context]
+                context = context[1:]
+                penalty *= backoff
+            return penalty * max(grams[0].get((letter,), 0), 0.5) / total
+
+        first = [math.log10(conditional((), a)) for a in range(26)]
+        second = [[math.log10(conditional((a,), b)) for b in range(26)] for a in range(26)]
+        logs = []
+        for a, b, c in itertools.product(range(26), repeat=3):
+            prefix = first[a] + second[a][b] + math.log10(conditional((a, b), c))
+            logs.extend(prefix + math.log10(conditional((a, b, c), d)) for d in range(26))
+        floor, top = min(logs), max(logs)
+        scale = 255 / (top - floor)
+        return cls(bytes(round((value - floor) * scale) for value in logs), floor, top)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "QuadgramModel":
+        with gzip.open(path, "rb") as fh:
+            data = fh.read()
+        floor, top = _HEADER.unpack_from(data)
+        return cls(data[_HEADER.size:], floor, top)
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        top = self.floor + self.step * 255
+        with gzip.open(path, "wb", compresslevel=9) as fh:
+            fh.write(_HEADER.pack(self.floor, top) + self.table)
+
+    def score_values(self, values) -> float:
+        """Mean log10 quadgram probability of a sequence of 0-25 letter values"""
+        if _np is not None and isinstance(values, _np.ndarray):
+            if len(values) < 4:
+                return self.floor
+            ids = _quadgram_array(values)
+            return self.floor + self.step * float(self.array[ids].mean())
+        ids = list(_quadgram_ids(values))
+        if not ids:
+            return self.floor
+        table = self.table
+        return self.floor + self.step * sum(table[i] for i in ids) / len(ids)
+
+    def score(self, text: str) -> float:
+        return self.discount(self.score_values(_letter_values(text)), text)
+
+    def discount(self, score: float, text: str) -> float:
+        """
+        Pull score toward the floor when letters are a small share of text's
+        non-space characters, so a few English-looking letters among
+        punctuation cannot outrank a real decryption.
+        """
+        share = _letter_share(text)
+        return self.floor + (score - self.floor) * min(share / LETTER_SHARE, 1.0)
+
+def stdlib_corpus() -> str:
+    """
+    English prose available offline: the Python reference topics that ship
+    with the standard library, minus indented code and prompts. The shipped
+    table was built from this text.
+    """
+    from pydoc_data.topics import topics
+    lines = (line for topic in topics.values() for line in topic.splitlines())
+    return " ".join(line for line in lines if line and not line.startswith((" ", "\t", ">>>", "...")))
+
+@lru_cache(maxsize=1)
+def english_model() -> QuadgramModel:
+    """The shipped English table, loaded once per process"""
+    return QuadgramModel.load()
+
+def _letter_values(text: str):
+    """0-25 values of the letters A-Z/a-z in text (an array when NumPy is available)"""
+    letters = re.sub(r"[^A-Z]", "", text.upper())
+    if _np is not None:
+        return _np.frombuffer(letters.encode("ascii"), dtype=_np.uint8) - _np.uint8(65)
+    return [ord(ch) - 65 for ch in letters]
+
+def _letter_share(text: str) -> float:
+    visible = len(text) - sum(map(text.count, " \t\r\n"))
+    return len(re.findall(r"[A-Za-z]", text)) / visible if visible else 0.0
+
+def _quadgram_ids(values):
+    for i in range(len(values) - 3):
+        yield ((values[i] * 26 + values[i + 1]) * 26 + values[i + 2]) * 26 + values[i + 3]
+
+def _quadgram_array(values):
+    v = values.astype(_np.int32)
+    return ((v[:-3] * 26 + v[1:-2]) * 26 + v[2:-1]) * 26 + v[3:]
+
+def chi_squared(counts: Sequence[int]) -> float:
+    """Chi-squared distance of 26 letter counts from English letter frequencies"""
+    total = sum(counts)
+    if not total:
+        return float("inf")
+    return sum((count - total * p) ** 2 / (total * p) for count, p in zip(counts, ENGLISH_FREQUENCIES))
+
+# ============ CANDIDATES ============
+
+@dataclass
+class Candidate:
+    """One decryption of the ciphertext; slug and params replay it through decrypt_with_cipher"""
+    cipher: str
+    slug: str
+    params: Dict[str, int]
+    score: float
+    chi_squared: float
+    plaintext: str = field(default="", repr=False)
+
+    def to_json(self, preview: int = 200) -> dict:
+        return {
+            "cipher": self.cipher,
+            "slug": self.slug,
+            "params": self.params,
+            "score": round(self.score, 4),
+            "chi_squared": round(self.chi_squared, 2),
+            "preview": self.plaintext[:preview],
+        }
+
+def _affine_candidate(a: int, b: int, score: float, chi: float) -> Candidate:
+    if a == 1:
+        return Candidate("caesar", f"caesar-{b}", {}, score, chi)
+    return Candidate("affine", "affine", {"a": a, "b": b}, score, chi)
+
+def _decrypt(candidate: Candidate, text: str) -> str:
+    if candidate.cipher == "caesar":
+        return cc.caesar_decrypt(text, int(candidate.slug.rsplit("-", 1)[1]))
+    if candidate.cipher == "affine":
+        return cc._affine_decrypt(text, candidate.params["a"], candidate.params["b"])
+    if candidate.cipher == "xor":
+        return cc.simple_xor(text, int(candidate.slug.rsplit("-", 1)[1]))
+    if candidate.cipher in ("vigenere", "beaufort"):
+        return cc.decrypt_with_cipher(candidate.slug, text, **candidate.params)
+    return cc.rail_fence_decrypt(text, int(candidate.slug.rsplit("-", 1)[1]))
+
+# ============ KEYSPACE SOLVERS ============
+# Each returns (candidates best first, keys tried). They score a sample of
+# the ciphertext; plaintexts are filled in later for the survivors only.
+
+def _solve_affine(sample: str, multipliers: Sequence[int], stop_score: Optional[float]) -> Tuple[List[Candidate], int]:
+    """
+    Monoalphabetic keys permute letters, so the sample's distinct quadgrams
+    are counted once and every key is scored by remapping those ids. They
+    keep every other character too, so one letter share discounts all keys.
+    """
+    model = english_model()
+    share = min(_letter_share(sample) / LETTER_SHARE, 1.0)
+    values = _letter_values(sample)
+    candidates, tried = [], 0
+    if _np is not None:
+        digits = counts = None
+        if len(values) >= 4:
+            ids, counts = _np.unique(_quadgram_array(values), return_counts=True)
+            digits = [(ids // 26 ** k) % 26 for k in (3, 2, 1, 0)]
+        letter_counts = _np.bincount(values, minlength=26)
+        x = _np.arange(26)
+        for a in multipliers:
+            inverse = pow(a, -1, 26)
+            # plain[b][y] = inverse * (y - b) mod 26, for all 26 shifts at once
+            plain = (inverse * (x[None, :] - x[:, None])) % 26
+            if digits is None:
+                scores = _np.full(26, model.floor)
+            else:
+                mapped = ((plain[:, digits[0]] * 26 + plain[:, digits[1]]) * 26 + plain[:, digits[2]]) * 26 + plain[:, digits[3]]
+                scores = model.floor + share * model.step * (model.array[mapped] * counts).sum(axis=1) / counts.sum()
+            for b in range(26):
+                # Plain letter p appears as many times as cipher letter (a * p + b) mod 26.
+                plain_counts = letter_counts[(a * x + b) % 26]
+                candidates.append(_affine_candidate(a, b, float(scores[b]), chi_squared(plain_counts.tolist())))
+            tried += 26
+            if stop_score is not None and max(scores) >= stop_score:
+                break
+    else:
+        quadgrams = Counter(tuple(values[i:i + 4]) for i in range(len(values) - 3))
+        letter_counts = Counter(values)
+        total = sum(quadgrams.values())
+        for a in multipliers:
+            inverse = pow(a, -1, 26)
+            best = model.floor
+            for b in range(26):
+                plain = [(inverse * (y - b)) % 26 for y in range(26)]
+                if total:
+                    points = sum(
+                        model.table[((plain[q[0]] * 26 + plain[q[1]]) * 26 + plain[q[2]]) * 26 + plain[q[3]]] * n
+                        for q, n in quadgrams.items()
+                    )
+                    score = model.floor + share * model.step * points / total
+                else:
+                    score = model.floor
+                plain_counts = [letter_counts.get((a * p + b) % 26, 0) for p in range(26)]
+                candidates.append(_affine_candidate(a, b, score, chi_squared(plain_counts)))
+                best = max(best, score)
+            tried += 26
+            if stop_score is not None and best >= stop_score:
+                break
+    return candidates, tried
+
+def _letter_counts(text: str) -> List[int]:
+    counts = [0] * 26
+    for value in _letter_values(text):
+        counts[value] += 1
+    return counts
+
+def _solve_xor(sample: str, shortlist: int, stop_score: Optional[float]) -> Tuple[List[Candidate], int]:
+    """
+    Rank every key by printable share, letter share and chi-squared from the
+    sample's character histogram, then quadgram-score the shortlist best first.
+    """
+    model = english_model()
+    histogram = Counter(ord(ch) for ch in sample)
+    visible = sum(n for code, n in histogram.items() if code not in (9, 10, 13, 32)) or 1
+    total = len(sample) or 1
+    ranked = []
+    for key in XOR_KEYS:
+        printable = letters = 0
+        counts = [0] * 26
+        for code, n in histogram.items():
+            plain = code ^ key
+            if plain in _PRINTABLE:
+                printable += n
+            if 65 <= plain <= 90 or 97 <= plain <= 122:
+                counts[(plain & ~32) - 65] += n
+                letters += n
+        ranked.append((-round(printable / total, 2), -min(round(letters / visible, 1), LETTER_SHARE), chi_squared(counts), key))
+    ranked.sort()
+    candidates = []
+    for negative_printable, _, chi, key in ranked[:shortlist]:
+        plain = cc.simple_xor(sample, key)
+        # Text that decodes to control characters is not English, however its letters score.
+        score = model.score(plain) if -negative_printable >= 0.95 else model.floor
+        candidates.append(Candidate("xor", f"xor-{key}", {}, score, chi))
+        if stop_score is not None and score >= stop_score:
+            break
+    return candidates, len(XOR_KEYS)
+
+def _solve_rail_fence(text: str, sample_size: int, stop_score: Optional[float]) -> Tuple[List[Candidate], int]:
+    """Undo each rail count on the whole text (it is a transposition) and score the sample"""
+    model = english_model()
+    chi = chi_squared(_letter_counts(text[:sample_size]))  # a transposition keeps letter frequencies
+    candidates, tried = [], 0
+    for rails in RAIL_RANGE:
+        plain = cc.rail_fence_decrypt(text, rails)
+        score = model.score(plain[:sample_size])
+        candidates.append(Candidate("rail-fence", f"rail-fence-{rails}", {}, score, chi))
+        tried += 1
+        if stop_score is not None and score >= stop_score:
+            break
+    return candidates, tried
+
+# ============ POLYALPHABETIC KEYS ============
+# Vigenère-family ciphertexts (vigenere, beaufort, gronsfeld, quagmire and
+# their *-key-* variants) repeat a key of some period, so every period-th
+# letter is a Caesar shift of English. The period is the smallest one whose
+# columns have an English index of coincidence (Kasiski distances rank the
+# rest), then each column's shift is the one with the lowest chi-squared,
+# polished by quadgram score where columns are too short for chi-squared.
+# Gronsfeld keys come out as Vigenère keys in A-J.
+
+RANDOM_IC = 1 / 26
+MIN_COLUMN = 10  # letters per column below which a period is not tried
+REFINE_LETTERS = 2000  # letters the quadgram pass over column shifts looks at
+REFINE_BELOW = 100  # letters per column from which chi-squared alone is trusted
+# Where a cipher advances its key: on letters only, or on every character position
+ALIGNMENTS = ("letters", "positions")
+
+def _key_positions(text: str, alignment: str):
+    """(0-25 letter values, key position of each letter) of text, uppercased as the ciphers do"""
+    cleaned = cc._clean(text)
+    if _np is not None:
+        codes = _np.frombuffer(cleaned.encode("utf-32-le", "surrogatepass"), dtype=_np.uint32)
+        mask = (codes >= 65) & (codes <= 90)
+        values = (codes[mask] - 65).astype(_np.uint8)
+        # int32 keeps the per-period modulo and bincount passes cheap on megabyte texts
+        positions = _np.flatnonzero(mask) if alignment == "positions" else _np.arange(len(values))
+        return values, positions.astype(_np.int32)
+    pairs = [(i, ord(ch) - 65) for i, ch in enumerate(cleaned) if "A" <= ch <= "Z"]
+    values = [value for _, value in pairs]
+    positions = [i for i, _ in pairs] if alignment == "positions" else list(range(len(values)))
+    return values, positions
+
+def column_counts(values, positions, period: int):
+    """26 letter counts for each of the period key columns (a period x 26 array with NumPy)"""
+    if _np is not None:
+        cells = (positions % period) * 26 + values
+        return _np.bincount(cells, minlength=period * 26).reshape(period, 26)
+    counts = [[0] * 26 for _ in range(period)]
+    for position, value in zip(positions, values):
+        counts[position % period][value] += 1
+    return counts
+
+def index_of_coincidence(counts) -> float:
+    """Mean index of coincidence over columns of letter counts (English is about 0.066)"""
+    if _np is not None:
+        counts = _np.asarray(counts, dtype=_np.int64).reshape(-1, 26)
+        sizes = counts.sum(axis=1)
+        usable = sizes > 1
+        if not usable.any():
+            return 0.0
+        pairs = (counts * (counts - 1)).sum(axis=1)[usable]
+        return float((pairs / (sizes[usable] * (sizes[usable] - 1))).mean())
+    ics = [
+        sum(c * (c - 1) for c in column) / (sum(column) * (sum(column) - 1))
+        for column in counts if sum(column) > 1
+    ]
+    return sum(ics) / len(ics) if ics else 0.0
+
+def kasiski(values, positions, periods: Sequence[int] = PERIOD_RANGE) -> Dict[int, float]:
+    """
+    For each period, the share of distances between repeated trigrams that
+    it divides, relative to chance (1 / period): well above 1 when the key
+    repeats every period letters.
+    """
+    if len(values) < 6:
+        return {period: 0.0 for period in periods}
+    if _np is not None:
+        v = values.astype(_np.int32)
+        ids = (v[:-2] * 26 + v[1:-1]) * 26 + v[2:]
+        order = _np.argsort(ids, kind="stable")
+        starts = positions[:-2][order]
+        repeated = ids[order][1:] == ids[order][:-1]
+        distances = (starts[1:] - starts[:-1])[repeated]
+        if not len(distances):
+            return {period: 0.0 for period in periods}
+        return {period: float(_np.count_nonzero(distances % period == 0)) * period / len(distances) for period in periods}
+    last, distances = {}, []
+    for i in range(len(values) - 2):
+        trigram = (values[i], values[i + 1], values[i + 2])
+        if trigram in last:
+            distances.append(positions[i] - last[trigram])
+        last[trigram] = positions[i]
+    if not distances:
+        return {period: 0.0 for period in periods}
+    return {period: sum(d % period == 0 for d in distances) * period / len(distances) for period in periods}
+
+@dataclass
+class PeriodEstimate:
+    period: int
+    ic: float
+    kasiski: float
+
+def estimate_periods(values, positions, periods: Sequence[int] = PERIOD_RANGE, limit: int = 3) -> List[PeriodEstimate]:
+    """
+    The most likely key periods, best first: periods whose columns reach
+    three quarters of the best IC above chance, smallest first (the true
+    period before its multiples), then the rest by Kasiski ratio.
+    """
+    periods = [period for period in periods if period * MIN_COLUMN <= len(values)]
+    if not periods:
+        return []
+    ratios = kasiski(values, positions, periods)
+    estimates = [
+        PeriodEstimate(period, index_of_coincidence(column_counts(values, positions, period)), ratios[period])
+        for period in periods
+    ]
+    threshold = RANDOM_IC + 0.75 * (max(estimate.ic for estimate in estimates) - RANDOM_IC)
+    likely = [estimate for estimate in estimates if estimate.ic >= threshold]
+    rest = sorted((estimate for estimate in estimates if estimate.ic < threshold), key=lambda e: (-e.kasiski, -e.ic))
+    return (likely + rest)[:limit]
+
+def solve_columns(counts, variant: str = "vigenere") -> List[int]:
+    """
+    Key shift of each column with the lowest chi-squared against English:
+    plain = cipher - key for "vigenere", plain = key - cipher for "beaufort".
+    """
+    sign = 1 if variant == "vigenere" else -1
+    if _np is not None:
+        x = _np.arange(26)
+        # source[k][p]: the cipher letter that plain letter p comes from under shift k
+        source = (sign * x[None, :] + x[:, None]) % 26
+        plain = _np.asarray(counts)[:, source]  # columns x shifts x 26
+        expected = plain.sum(axis=2, keepdims=True) * _np.asarray(ENGLISH_FREQUENCIES)
+        with _np.errstate(divide="ignore", invalid="ignore"):
+            chi = _np.nan_to_num(((plain - expected) ** 2 / expected).sum(axis=2), nan=0.0)
+        return chi.argmin(axis=1).tolist()
+    return [
+        min(range(26), key=lambda k: chi_squared([column[(sign * p + k) % 26] for p in range(26)]))
+        for column in counts
+    ]
+
+def refine_shifts(values, positions, shifts: Sequence[int], variant: str = "vigenere", passes: int = 3) -> List[int]:
+    """
+    Re-pick each column's shift for the best quadgram score of the first
+    REFINE_LETTERS letters, holding the other columns fixed, until a pass
+    changes nothing.
+    """
+    model = english_model()
+    values, positions = values[:REFINE_LETTERS], positions[:REFINE_LETTERS]
+    shifts = list(shifts)
+    period = len(shifts)
+    sign = 1 if variant == "vigenere" else -1
+    if len(values) < 4:
+        return shifts
+    if _np is not None:
+        values = values.astype(_np.int32)
+        columns = positions % period
+        x = _np.arange(26)
+        for _ in range(passes):
+            changed = False
+            for column in range(period):
+                # Row k is the plaintext with this column's shift set to k.
+                plain = _np.tile((values - _np.asarray(shifts)[columns]) * sign % 26, (26, 1))
+                in_column = columns == column
+                plain[:, in_column] = (values[in_column][None, :] - x[:, None]) * sign % 26
+                ids = ((plain[:, :-3] * 26 + plain[:, 1:-2]) * 26 + plain[:, 2:-1]) * 26 + plain[:, 3:]
+                best = int(model.array[ids].sum(axis=1).argmax())
+                if best != shifts[column]:
+                    shifts[column], changed = best, True
+            if not changed:
+                break
+        return shifts
+    columns = [position % period for position in positions]
+
+    def score(key):
+        return model.score_values([(v - key[c]) * sign % 26 for v, c in zip(values, columns)])
+    best_score = score(shifts)
+    for _ in range(passes):
+        changed = False
+        for column in range(period):
+            for shift in range(26):
+                trial = shifts[:column] + [shift] + shifts[column + 1:]
+                trial_score = score(trial)
+                if trial_score > best_score:
+                    best_score, shifts, changed = trial_score, trial, True
+        if not changed:
+            break
+    return shifts
+
+def _shift_key(shifts: Sequence[int]) -> str:
+    return "".join(chr(65 + shift) for shift in shifts)
+
+@dataclass
+class KeyRecovery:
+    """A recovered Vigenère-family key and how it was found"""
+    variant: str
+    alignment: str
+    period: int
+    key: str
+    ic: float
+    kasiski: float
+    score: float = 0.0
+
+    @property
+    def shifts(self) -> List[int]:
+        return [ord(ch) - 65 for ch in self.key]
+
+    @property
+    def slug(self) -> str:
+        if self.alignment == "letters":
+            return f"{self.variant}-key-{self.key}"
+        return "quagmire" if self.variant == "vigenere" else "beaufort"
+
+    @property
+    def params(self) -> Dict[str, str]:
+        return {} if self.alignment == "letters" else {"key": self.key}
+
+    def decrypt(self, text: str) -> str:
+        return cc.decrypt_with_cipher(self.slug, text, **self.params)
+
+def recover_keys(text: str, variants: Sequence[str] = ("vigenere", "beaufort"), alignments: Sequence[str] = ALIGNMENTS,
+                 periods: Sequence[int] = PERIOD_RANGE, limit: int = 3, refine: int = 2,
+                 sample_size: int = 20000) -> List[KeyRecovery]:
+    """
+    Recover keys for every variant, alignment and likely period from the
+    whole text, ranked by the quadgram score of the decrypted first
+    sample_size characters. The `refine` best keys whose columns are short
+    are then polished with refine_shifts and ranked again.
+    """
+    model = english_model()
+    sample = text[:sample_size]
+    recoveries = []
+    for alignment in alignments:
+        values, positions = _key_positions(text, alignment)
+        if alignment == "positions" and len(values) == len(text):
+            continue  # nothing but letters: same columns as "letters"
+        for estimate in estimate_periods(values, positions, periods, limit):
+            counts = column_counts(values, positions, estimate.period)
+            for variant in variants:
+                key = _shift_key(solve_columns(counts, variant))
+                recoveries.append(KeyRecovery(variant, alignment, estimate.period, key, estimate.ic, estimate.kasiski))
+    for recovery in recoveries:
+        recovery.score = model.score(recovery.decrypt(sample))
+    recoveries.sort(key=lambda recovery: (-recovery.score, recovery.period))
+    for recovery in recoveries[:refine]:
+        values, positions = _key_positions(sample, recovery.alignment)
+        if len(values) >= REFINE_BELOW * recovery.period:
+            continue  # long columns: a quadgram pass would only fit the model, not the key
+        recovery.key = _shift_key(refine_shifts(values, positions, recovery.shifts, recovery.variant))
+        recovery.score = model.score(recovery.decrypt(sample))
+    recoveries.sort(key=lambda recovery: (-recovery.score, recovery.period))
+    return recoveries
+
+# ============ SUBSTITUTION KEYS ============
+# General substitutions (substitution, substitution-simple, slide, keyword
+# alphabets) have 26! keys, so keys are searched, not enumerated: simulated
+# annealing over letter swaps from many random restarts. The ciphertext's
+# distinct quadgrams are kept as integer arrays (symbol digits and counts)
+# and a swap only re-scores the quadgrams holding one of the two symbols,
+# so a move costs a few hundred table lookups whatever the text length.
+# Homophonic texts (several symbols per letter, e.g. homophonic_simple)
+# use every visible character as a symbol and reassign one at a time.
+
+SUBSTITUTION_LETTERS = 5000  # symbols of ciphertext the search scores
+ANNEAL_ITERATIONS = 10000  # moves per restart
+ANNEAL_ITERATIONS_HOMOPHONIC = 40000  # many-to-one keys have more room to wander
+ANNEAL_TEMPERATURE = 1.0  # starting temperature, in table units per quadgram; 0 hill-climbs
+
+def _symbols(text: str, homophonic: bool) -> Tuple[List[str], List[int]]:
+    """(symbol alphabet, ciphertext as symbol indices): A-Z case-folded, or every visible character"""
+    if homophonic:
+        chars = [ch for ch in text if not ch.isspace()]
+    else:
+        chars = [ch for ch in text.upper() if "A" <= ch <= "Z"]
+    alphabet = sorted(set(chars))
+    index = {ch: i for i, ch in enumerate(alphabet)}
+    return alphabet, [index[ch] for ch in chars[:SUBSTITUTION_LETTERS]]
+
+class _QuadgramCounts:
+    """Distinct ciphertext quadgrams: symbol digits, counts, and the quadgrams holding each key slot"""
+
+    def __init__(self, symbols: Sequence[int], slots: int):
+        counts = Counter(tuple(symbols[i:i + 4]) for i in range(len(symbols) - 3))
+        self.total = sum(counts.values())
+        if _np is not None:
+            quadgrams = _np.array(list(counts), dtype=_np.int64).reshape(-1, 4)
+            self.digits = quadgrams.T.copy()  # 4 x distinct
+            self.counts = _np.array(list(counts.values()), dtype=_np.int64)
+            self.holds = (self.digits[:, None, :] == _np.arange(slots)[None, :, None]).any(axis=0)  # slot x distinct
+            self.touching = [_np.flatnonzero(row) for row in self.holds]
+        else:
+            self.digits = list(counts)
+            self.counts = list(counts.values())
+            self.touching = [[i for i, q in enumerate(self.digits) if slot in q] for slot in range(slots)]
+
+    def plain_ids(self, key, touched=None):
+        """Plaintext quadgram ids under key (symbol -> letter), for all or the touched quadgrams"""
+        if _np is not None:
+            d = self.digits if touched is None else self.digits[:, touched]
+            return ((key[d[0]] * 26 + key[d[1]]) * 26 + key[d[2]]) * 26 + key[d[3]]
+        digits = self.digits if touched is None else [self.digits[i] for i in touched]
+        return [((key[a] * 26 + key[b]) * 26 + key[c]) * 26 + key[d] for a, b, c, d in digits]
+
+    def touched_by(self, a: int, b: int):
+        """Quadgrams holding slot a or slot b, each once"""
+        if _np is not None:
+            other = self.touching[b]
+            return _np.concatenate((self.touching[a], other[~self.holds[a, other]]))
+        return sorted(set(self.touching[a]).union(self.touching[b]))
+
+def _anneal(symbols: Sequence[int], slots: int, homophonic: bool, seeds: Sequence[int], deadline: float,
+            iterations: int = ANNEAL_ITERATIONS, temperature: float = ANNEAL_TEMPERATURE) -> Tuple[int, List[int], int]:
+    """
+    One worker's share of the restarts: anneal from a random key per seed
+    until the seeds or the wall-clock deadline run out. Returns the best
+    (fitness as a sum of table values, key as slot -> letter, restarts run).
+    """
+    model = english_model()
+    counts = _QuadgramCounts(symbols, slots)
+    table = model.array.astype(_np.int64) if _np is not None else model.table
+    best_fitness, best_key, runs = -1, list(range(slots)), 0
+    if not counts.total:
+        return best_fitness, best_key, runs
+    for seed in seeds:
+        if runs and time.time() >= deadline:
+            break
+        rng = random.Random(seed)
+        if homophonic:
+            # Symbols by frequency take letters by English frequency, with a random jitter per restart.
+            seen = Counter(symbols)
+            ranked = sorted(range(slots), key=lambda slot: -seen[slot] * rng.uniform(0.5, 1.5))
+            letters = sorted(range(26), key=lambda letter: -ENGLISH_FREQUENCIES[letter])
+            key = [0] * slots
+            for rank, slot in enumerate(ranked):
+                key[slot] = letters[rank % 26]
+        else:
+            key = rng.sample(range(26), 26)
+        if _np is not None:
+            key = _np.array(key, dtype=_np.int64)
+            current = counts.plain_ids(key)
+            fitness = int((table[current] * counts.counts).sum())
+        else:
+            current = counts.plain_ids(key)
+            fitness = sum(table[q] * n for q, n in zip(current, counts.counts))
+        start = temperature * counts.total
+        for step in range(iterations):
+            if step % 1000 == 0 and time.time() >= deadline:
+                break
+            # Swap two slots' letters; homophonic symbols may also take a new letter
+            # (the only move when there is a single symbol).
+            a = rng.randrange(slots)
+            b = a
+            if slots > 1:
+                b = rng.randrange(slots - 1)
+                b += b >= a
+            trial = key.copy()
+            if homophonic and (slots < 2 or rng.random() < 0.5):
+                trial[a] = rng.randrange(26)
+                b = a
+            else:
+                trial[a], trial[b] = key[b], key[a]
+            touched = counts.touched_by(a, b)
+            if not len(touched):
+                continue
+            proposed = counts.plain_ids(trial, touched)
+            if _np is not None:
+                delta = int(((table[proposed] - table[current[touched]]) * counts.counts[touched]).sum())
+            else:
+                delta = sum((table[p] - table[current[i]]) * counts.counts[i] for i, p in zip(touched, proposed))
+            heat = start * (1 - step / iterations)
+            if delta >= 0 or (heat > 0 and rng.random() < math.exp(delta / heat)):
+                key, fitness = trial, fitness + delta
+                if _np is not None:
+                    current[touched] = proposed
+                else:
+                    for i, p in zip(touched, proposed):
+                        current[i] = p
+        runs += 1
+        if fitness > best_fitness:
+            best_fitness, best_key = fitness, [int(letter) for letter in key]
+    return best_fitness, best_key, runs
+
+@dataclass
+class SubstitutionResult:
+    """Best key found; `mapping` is ciphertext symbol -> plaintext letter"""
+    mapping: Dict[str, str]
+    score: float
+    plaintext: str
+    restarts: int
+    elapsed: float
+
+    @property
+    def key(self) -> str:
+        """substitution_encrypt key (plain letter -> cipher letter), when the mapping is one-to-one on A-Z"""
+        inverse = {plain: cipher for cipher, plain in self.mapping.items()}
+        if len(inverse) != len(self.mapping) or not all("A" <= cipher <= "Z" for cipher in self.mapping):
+            return ""
+        unused = iter(sorted(set(string.ascii_uppercase) - set(self.mapping)))
+        return "".join(inverse.get(plain) or next(unused) for plain in string.ascii_uppercase)
+
+def solve_substitution(text: str, budget: float = 5.0, restarts: int = SUBSTITUTION_RESTARTS, seed: int = 0,
+                       homophonic: bool = False, iterations: Optional[int] = None,
+                       temperature: float = ANNEAL_TEMPERATURE) -> SubstitutionResult:
+    """
+    Search for the substitution key of text: `restarts` annealing runs
+    (seeded seed, seed + 1, ...) spread over CPU_EXECUTOR workers, stopping
+    at `budget` seconds of wall-clock time. Results only depend on the seeds
+    and on how many restarts fit in the budget, not on the worker count.
+    """
+    started = time.time()
+    if iterations is None:
+        iterations = ANNEAL_ITERATIONS_HOMOPHONIC if homophonic else ANNEAL_ITERATIONS
+    alphabet, symbols = _symbols(text, homophonic)
+    slots = len(alphabet) if homophonic else 26
+    jobs = max(1, min(cc.CPU_EXECUTOR.max_workers, restarts))
+    deadline = started + budget
+    futures = [
+        cc.CPU_EXECUTOR.submit(_anneal, symbols, slots, homophonic,
+                               range(seed + job, seed + restarts, jobs), deadline, iterations, temperature)
+        for job in range(jobs)
+    ]
+    best_fitness, best_key, runs = -1, list(range(slots)), 0
+    wait_until = deadline + cc.CPU_EXECUTOR.timeout  # for all the jobs together, not each
+    try:
+        for future in futures:
+            fitness, key, count = cc.CPU_EXECUTOR.result(future, max(wait_until - time.time(), 0))
+            runs += count
+            if fitness > best_fitness:
+                best_fitness, best_key = fitness, key
+    finally:
+        for future in futures:
+            future.cancel()
+    mapping = {symbol: chr(65 + best_key[i]) for i, symbol in enumerate(alphabet)}
+    if homophonic:
+        plaintext = "".join(mapping.get(ch, ch) for ch in text)
+    else:
+        plaintext = "".join(mapping.get(ch, ch) for ch in cc._clean(text))
+    return SubstitutionResult(mapping, english_model().score(plaintext), plaintext, runs, time.time() - started)
+
+def _solve_polyalphabetic(text: str, sample_size: int, top_k: int) -> Tuple[List[Candidate], int]:
+    """Key recovery from (up to) sample_size characters"""
+    sample = text[:sample_size]
+    candidates = []
+    for recovery in recover_keys(sample, limit=3, sample_size=sample_size)[:top_k]:
+        plain = recovery.decrypt(sample)
+        candidates.append(Candidate(recovery.variant, recovery.slug, recovery.params, recovery.score,
+                                    chi_squared(_letter_counts(plain))))
+    return candidates, len(PERIOD_RANGE)
+
+def solve_keyspace(keyspace: str, text: str, sample_size: int = 20000, top_k: int = 5,
+                   stop_score: Optional[float] = None) -> Tuple[List[Candidate], int]:
+    """Best candidates of one keyspace, with full plaintexts; runs in CPU_EXECUTOR workers"""
+    sample = text[:sample_size]
+    if keyspace in ("caesar", "affine"):
+        multipliers = (1,) if keyspace == "caesar" else AFFINE_MULTIPLIERS
+        candidates, tried = _solve_affine(sample, multipliers, stop_score)
+    elif keyspace == "xor":
+        candidates, tried = _solve_xor(sample, max(top_k, 8), stop_score)
+    elif keyspace == "rail-fence":
+        candidates, tried = _solve_rail_fence(text, sample_size, stop_score)
+    elif keyspace == "vigenere":
+        candidates, tried = _solve_polyalphabetic(text, sample_size, top_k)
+    else:
+        raise ValueError(f"Unknown keyspace: {keyspace}")
+    candidates.sort(key=lambda candidate: (-candidate.score, candidate.chi_squared))
+    best = candidates[:top_k]
+    for candidate in best:
+        candidate.plaintext = _decrypt(candidate, text)
+    return best, tried
+
+# ============ SOLVER ============
+
+@dataclass
+class CrackResult:
+    candidates: List[Candidate]
+    tried: int
+    total: int
+
+    @property
+    def stopped_early(self) -> bool:
+        return self.tried < self.total
+
+def crack(text: str, keyspaces: Sequence[str] = DEFAULT_KEYSPACES, top_k: int = 5,
+          sample_size: int = 20000, stop_score: Optional[float] = None,
+          substitution_budget: float = 5.0) -> CrackResult:
+    """
+    Try every key of the requested keyspaces ("caesar" is the a = 1 slice of
+    "affine") and return the top_k distinct plaintexts across all of them. Once any
+    keyspace reports a candidate scoring stop_score or better, keyspaces that
+    have not started yet are cancelled. The keyspaces share one
+    CPU_EXECUTOR.timeout. A "substitution" search runs last, for at most
+    substitution_budget seconds, and is skipped after a hit.
+    """
+    unknown = set(keyspaces) - set(KEYSPACES)
+    if unknown:
+        raise ValueError(f"Unknown keyspace: {', '.join(sorted(unknown))}")
+    keyspaces = list(dict.fromkeys(keyspaces))
+    if "affine" in keyspaces and "caesar" in keyspaces:
+        keyspaces.remove("caesar")
+    futures = [
+        cc.CPU_EXECUTOR.submit(solve_keyspace, keyspace, text, sample_size, top_k, stop_score)
+        for keyspace in keyspaces if keyspace != "substitution"
+    ]
+    wait_until = time.time() + cc.CPU_EXECUTOR.timeout  # one timeout for every keyspace together
+    candidates, tried, stopped = [], 0, False
+    try:
+        for future in futures:
+            if stopped and future.cancel():
+                continue
+            found, count = cc.CPU_EXECUTOR.result(future, max(wait_until - time.time(), 0))
+            candidates.extend(found)
+            tried += count
+            if stop_score is not None and any(candidate.score >= stop_score for candidate in found):
+                stopped = True
+    finally:
+        for future in futures:
+            future.cancel()
+    if "substitution" in keyspaces and not stopped:
+        result = solve_substitution(text, budget=substitution_budget)
+        candidates.append(Candidate("substitution", "substitution", {"key": result.key}, result.score,
+                                    chi_squared(_letter_counts(result.plaintext)), result.plaintext))
+        tried += result.restarts
+    # Rounding lets the earlier keyspace win ties (caesar-7 over vigenere-key-HH).
+    candidates.sort(key=lambda candidate: (-round(candidate.score, 6), candidate.chi_squared))
+    unique, seen = [], set()
+    for candidate in candidates:
+        if candidate.plaintext not in seen:
+            seen.add(candidate.plaintext)
+            unique.append(candidate)
+    return CrackResult(unique[:top_k], tried, sum(KEYSPACES[keyspace] for keyspace in keyspaces))
@@ -4,11 +4,29 @@ Includes toy ciphers (educational) and real encryption (AES)
 """
 
 import base64
+import codecs
+import concurrent.futures
+import hashlib
+import hmac
+import itertools
 import os
 import json
+import multiprocessing
 import re
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from functools import lru_cache, reduce
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Iterable, Iterator, Mapping, Optional, Tuple
+
+try:
+    import numpy as _np
+except ImportError:  # optional: vectorized kernels fall back to pure Python
+    _np = None
 
 # ============ UTILITY FUNCTIONS ============
 
@@ -26,18 +44,301 @@ def _num_to_char(n: int) -> str:
     """Convert 0-25 to letter (wraps around)"""
     return chr(((n % 26) + 26) % 26 + A_ORD)
 
+# ============ TRANSLATION ENGINE ============
+
+_TABLE_MAX_SIZE = 512  # entries per translation table, ASCII included
+
+class _TranslationTable(dict):
+    """
+    str.translate mapping built from a per-character rule.
+    ASCII is precomputed; other code points are resolved on first use and
+    remembered only while the table holds fewer than _TABLE_MAX_SIZE
+    entries, since tables are cached and the code points come from user
+    text. Results that are not one character long are always remembered:
+    pipelines look them up to detect reshaping text. Characters the rule
+    rejects are left out so the error is raised only if that character
+    actually appears in the input.
+    """
+    __slots__ = ("_rule",)
+
+    def __init__(self, rule):
+        super().__init__()
+        self._rule = rule
+        for code in range(128):
+            try:
+                self[code] = rule(chr(code))
+            except Exception:
+                pass
+
+    def __missing__(self, code):
+        value = self._rule(chr(code))
+        if len(self) < _TABLE_MAX_SIZE or len(value) != 1:
+            self[code] = value
+        return value
+
+@lru_cache(maxsize=1024, typed=True)
+def _translation_table(rule_factory, *params) -> _TranslationTable:
+    """Compile a monoalphabetic rule into a cached translation table"""
+    return _TranslationTable(rule_factory(*params))
+
+_maketrans = lru_cache(maxsize=256)(str.maketrans)
+
+def _translate(text: str, rule_factory, *params) -> str:
+    """Apply a monoalphabetic rule to the whole text in one pass"""
+    return text.translate(_translation_table(rule_factory, *params))
+
+def _translation_kernel(rule_factory, *params, clean: bool = True):
+    """Prebuilt encrypt/decrypt callable for a fixed rule"""
+    table = _translation_table(rule_factory, *params)
+    if clean:
+        return lambda text, **kw: _clean(text).translate(table)
+    return lambda text, **kw: text.translate(table)
+
+def _shift_rule(shift: int):
+    """A-Z shifted by a fixed amount"""
+    def rule(ch):
+        if "A" <= ch <= "Z":
+            return _num_to_char(_char_to_num(ch) + shift)
+        return ch
+    return rule
+
+def _atbash_rule():
+    """A-Z mirrored (A↔Z)"""
+    def rule(ch):
+        if "A" <= ch <= "Z":
+            return _num_to_char(25 - _char_to_num(ch))
+        return ch
+    return rule
+
+def _atbash_shift_rule(shift: int):
+    """Atbash followed by a Caesar shift"""
+    atbash, caesar = _atbash_rule(), _shift_rule(shift)
+    return lambda ch: caesar(atbash(ch))
+
+def _shift_atbash_rule(shift: int):
+    """Caesar shift followed by Atbash"""
+    atbash, caesar = _atbash_rule(), _shift_rule(shift)
+    return lambda ch: atbash(caesar(ch))
+
+def _keyed_rule(key: str):
+    """A-Z mapped onto the letters of a substitution key"""
+    def rule(ch):
+        if "A" <= ch <= "Z":
+            return key[_char_to_num(ch)]
+        return ch
+    return rule
+
+def _inverse_keyed_rule(key: str):
+    """Inverse of _keyed_rule"""
+    reverse_key = [""] * 26
+    for i, ch in enumerate(key):
+        reverse_key[_char_to_num(ch)] = _num_to_char(i)
+    return _keyed_rule(tuple(reverse_key))
+
+def _alpha_rule(transform):
+    """Letters (str.isalpha) mapped through transform(0-25 value), others unchanged"""
+    def rule(ch):
+        if ch.isalpha():
+            return _num_to_char(transform(_char_to_num(ch)))
+        return ch
+    return rule
+
+def _affine_rule(a: int, b: int):
+    return _alpha_rule(lambda x: (a * x + b) % 26)
+
+def _affine_inverse_rule(inv: int, b: int):
+    return _alpha_rule(lambda x: (inv * (x - b)) % 26)
+
+def _multiply_rule(key: int):
+    return _alpha_rule(lambda x: x * key)
+
+def _numeric_rule(transform):
+    """Every character mapped through transform(0-25 value), letter or not"""
+    return lambda ch: _num_to_char(transform(_char_to_num(ch)))
+
+def _xor_rule(key: int):
+    return lambda ch: chr(ord(ch) ^ key)
+
+def _rot47_rule():
+    def rule(ch):
+        if 33 <= ord(ch) <= 126:
+            return chr(33 + (ord(ch) - 33 + 47) % 94)
+        return ch
+    return rule
+
+def _keyboard_rule(offset: int):
+    """Shift along the QWERTY letter rows"""
+    qwerty = "qwertyuiopasdfghjklzxcvbnm"
+    def rule(ch):
+        if ch in qwerty:
+            return qwerty[(qwerty.index(ch) + offset) % len(qwerty)]
+        return ch
+    return rule
+
+# ============ VECTORIZED KERNELS ============
+# With NumPy installed, inputs of _NUMPY_MIN_LENGTH characters or more are
+# processed as arrays of code points instead of one character at a time.
+
+_NUMPY_MIN_LENGTH = 4096
+
+def _vectorize(text: str) -> bool:
+    """Whether text is large enough to be worth the NumPy path"""
+    return _np is not None and len(text) >= _NUMPY_MIN_LENGTH
+
+def _to_codes(text: str):
+    """Code points of text as a read-only array (uint8 when text is ASCII)"""
+    if text.isascii():
+        return _np.frombuffer(text.encode("ascii"), dtype=_np.uint8)
+    return _np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=_np.uint32)
+
+def _from_codes(codes) -> str:
+    """Inverse of _to_codes"""
+    if codes.dtype == _np.uint8:
+        return codes.tobytes().decode("ascii")
+    return codes.tobytes().decode("utf-32-le", "surrogatepass")
+
+def _letter_mask(codes, lower: bool = False):
+    """Positions holding A-Z (and a-z when lower is set)"""
+    mask = (codes >= 65) & (codes <= 90)
+    if lower:
+        mask |= (codes >= 97) & (codes <= 122)
+    return mask
+
+def _letter_values(codes):
+    """(code - ord("A")) mod 26 for each code, as uint8"""
+    if codes.dtype == _np.uint8:
+        return ((_np.arange(256) - A_ORD) % 26).astype(_np.uint8)[codes]
+    return ((codes.astype(_np.int64) - A_ORD) % 26).astype(_np.uint8)
+
+def _key_stream(values, start: int, count: int):
+    """Values mod 26 repeated cyclically from index start, count entries long (uint8)"""
+    if count == 0:
+        return _np.zeros(0, dtype=_np.uint8)
+    period = _np.asarray(values)
+    if period.dtype != _np.uint8:  # uint8 input is already letter values
+        period = (period.astype(_np.int64) % 26).astype(_np.uint8)
+    period = _np.roll(period, -(start % len(period)))
+    return _np.tile(period, -(-count // len(period)))[:count]
+
+def _shift_letters(codes, mask, shifts, text_sign: int = 1):
+    """
+    Copy of codes with each masked letter x replaced by (text_sign * x + shift)
+    mod 26. Kept in uint8 so the reduction is one conditional subtract.
+    """
+    letters = _letter_values(codes[mask])
+    if text_sign < 0:
+        shifted = shifts + _np.uint8(26) - letters
+    else:
+        shifted = letters + shifts
+    shifted -= _np.uint8(26) * (shifted >= 26)
+    out = codes.copy()
+    out[mask] = shifted + _np.uint8(A_ORD)
+    return out
+
+# ============ TRANSPOSITION KERNELS ============
+# A rail fence is a fixed permutation of positions. In pure Python it is
+# computed in closed form with strided slices; with NumPy, large inputs use
+# a (length, rails) index permutation and a single fancy-index gather. Only
+# permutations of up to _PERMUTATION_CACHE_LENGTH positions are cached:
+# longer texts rarely repeat a length, and each entry would hold arrays as
+# long as the text.
+
+_PERMUTATION_CACHE_LENGTH = 64 * 1024
+
+def _interleave(first: str, second: str) -> str:
+    """Merge two alternating subsequences (first is as long or one longer)"""
+    merged = [""] * (len(first) + len(second))
+    merged[0::2] = first
+    merged[1::2] = second
+    return "".join(merged)
+
+def _rail_slices(text: str, rails: int, offset: int) -> Iterator[Tuple[int, str]]:
+    """Split text starting at zigzag position offset into (rail, chars) runs"""
+    cycle = 2 * (rails - 1)
+    for rail in range(rails):
+        down = (rail - offset) % cycle
+        if rail == 0 or rail == rails - 1:
+            yield rail, text[down::cycle]
+            continue
+        up = (cycle - rail - offset) % cycle
+        if down < up:
+            yield rail, _interleave(text[down::cycle], text[up::cycle])
+        else:
+            yield rail, _interleave(text[up::cycle], text[down::cycle])
+
+def _rail_counts(length: int, rails: int) -> list:
+    """Number of characters on each rail for a text of the given length"""
+    cycle = 2 * (rails - 1)
+    counts = []
+    for rail in range(rails):
+        count = len(range(rail, length, cycle))
+        if 0 < rail < rails - 1:
+            count += len(range(cycle - rail, length, cycle))
+        counts.append(count)
+    return counts
+
+def _build_zigzag_permutation(length: int, rails: int) -> Tuple[Any, Any]:
+    cycle = 2 * (rails - 1)
+    runs = []
+    for rail in range(rails):
+        down = _np.arange(rail, length, cycle, dtype=_np.int32)
+        if rail == 0 or rail == rails - 1:
+            runs.append(down)
+            continue
+        up = _np.arange(cycle - rail, length, cycle)
+        run = _np.empty(len(down) + len(up), dtype=down.dtype)
+        run[0::2] = down
+        run[1::2] = up
+        runs.append(run)
+    encrypt = _np.concatenate(runs)
+    decrypt = _np.empty_like(encrypt)
+    decrypt[encrypt] = _np.arange(length, dtype=_np.int32)
+    encrypt.flags.writeable = decrypt.flags.writeable = False
+    return encrypt, decrypt
+
+_cached_zigzag_permutation = lru_cache(maxsize=64)(_build_zigzag_permutation)
+
+def _zigzag_permutation(length: int, rails: int) -> Tuple[Any, Any]:
+    """NumPy gather indices (encrypt, decrypt) for a zigzag over `length` positions"""
+    if length <= _PERMUTATION_CACHE_LENGTH:
+        return _cached_zigzag_permutation(length, rails)
+    return _build_zigzag_permutation(length, rails)
+
+def _gather(text: str, indices) -> str:
+    """Reorder text so that position i holds text[indices[i]]"""
+    return _from_codes(_to_codes(text)[indices])
+
+def _zigzag(text: str, rails: int, decrypt: bool = False) -> str:
+    """Apply (or undo) the rail fence permutation"""
+    if rails < 2:
+        raise ValueError("Rails must be at least 2.")
+    length = len(text)
+    if length == 0:
+        return ""
+    # Past one rail per character the zigzag never turns back: the identity.
+    rails = min(rails, max(length, 2))
+    if _vectorize(text):
+        return _gather(text, _zigzag_permutation(length, rails)[decrypt])
+    if not decrypt:
+        return "".join(chars for _, chars in _rail_slices(text, rails, 0))
+    cycle = 2 * (rails - 1)
+    plain = [""] * length
+    start = 0
+    for rail, count in enumerate(_rail_counts(length, rails)):
+        run = text[start:start + count]
+        start += count
+        if rail == 0 or rail == rails - 1:
+            plain[rail::cycle] = run
+        else:
+            plain[rail::cycle] = run[0::2]
+            plain[cycle - rail::cycle] = run[1::2]
+    return "".join(plain)
+
 # ============ CLASSIC CIPHERS (Toy) ============
 
 def caesar_encrypt(text: str, shift: int) -> str:
     """Caesar cipher: shift each letter by a fixed amount"""
-    text = _clean(text)
-    out = []
-    for ch in text:
-        if "A" <= ch <= "Z":
-            out.append(_num_to_char(_char_to_num(ch) + shift))
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _translate(_clean(text), _shift_rule, shift)
 
 def caesar_decrypt(text: str, shift: int) -> str:
     """Caesar decipher"""
@@ -53,54 +354,50 @@ def rot13_decrypt(text: str) -> str:
 
 def atbash_encrypt(text: str) -> str:
     """Atbash cipher: mirror the alphabet (A↔Z, B↔Y, etc)"""
-    text = _clean(text)
-    out = []
-    for ch in text:
-        if "A" <= ch <= "Z":
-            out.append(_num_to_char(25 - _char_to_num(ch)))
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _translate(_clean(text), _atbash_rule)
 
 def atbash_decrypt(text: str) -> str:
     """Atbash is symmetric"""
     return atbash_encrypt(text)
 
-def vigenere_encrypt(text: str, key: str) -> str:
-    """Vigenère cipher: polyalphabetic with repeating key"""
-    text = _clean(text)
+def _letter_key(key: str) -> Tuple[int, ...]:
+    """Validate an A-Z key and return its 0-25 values"""
     key = _clean(key)
     if not key or any(not ("A" <= c <= "Z") for c in key):
         raise ValueError("Key must contain only A-Z letters.")
-    
+    return tuple(_char_to_num(c) for c in key)
+
+def _polyalphabetic(text: str, key: Tuple[int, ...], ki: int, text_sign: int, key_sign: int) -> Tuple[str, int]:
+    """
+    Map each A-Z letter x to (text_sign * x + key_sign * k) mod 26, where k
+    is the next key value; the key index only advances on letters.
+    Returns the output and the key index to resume from.
+    """
+    if _vectorize(text):
+        codes = _to_codes(text)
+        mask = _letter_mask(codes)
+        count = int(_np.count_nonzero(mask))
+        shifts = _key_stream([key_sign * k for k in key], ki, count)
+        return _from_codes(_shift_letters(codes, mask, shifts, text_sign)), ki + count
     out = []
-    ki = 0
     for ch in text:
         if "A" <= ch <= "Z":
-            k = _char_to_num(key[ki % len(key)])
-            out.append(_num_to_char(_char_to_num(ch) + k))
+            k = key[ki % len(key)]
+            out.append(_num_to_char(text_sign * _char_to_num(ch) + key_sign * k))
             ki += 1
         else:
             out.append(ch)
-    return "".join(out)
+    return "".join(out), ki
+
+def vigenere_encrypt(text: str, key: str) -> str:
+    """Vigenère cipher: polyalphabetic with repeating key"""
+    text = _clean(text)
+    return _polyalphabetic(text, _letter_key(key), 0, 1, 1)[0]
 
 def vigenere_decrypt(text: str, key: str) -> str:
     """Vigenère decipher"""
     text = _clean(text)
-    key = _clean(key)
-    if not key or any(not ("A" <= c <= "Z") for c in key):
-        raise ValueError("Key must contain only A-Z letters.")
-    
-    out = []
-    ki = 0
-    for ch in text:
-        if "A" <= ch <= "Z":
-            k = _char_to_num(key[ki % len(key)])
-            out.append(_num_to_char(_char_to_num(ch) - k))
-            ki += 1
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _polyalphabetic(text, _letter_key(key), 0, 1, -1)[0]
 
 def substitution_encrypt(text: str, key: str) -> str:
     """
@@ -113,14 +410,7 @@ def substitution_encrypt(text: str, key: str) -> str:
     if len(key) != 26 or len(set(key)) != 26:
         raise ValueError("Key must be exactly 26 unique A-Z letters.")
     
-    out = []
-    for ch in text:
-        if "A" <= ch <= "Z":
-            idx = _char_to_num(ch)
-            out.append(key[idx])
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _translate(text, _keyed_rule, key)
 
 def substitution_decrypt(text: str, key: str) -> str:
     """Substitution decipher"""
@@ -129,92 +419,18 @@ def substitution_decrypt(text: str, key: str) -> str:
     if len(key) != 26 or len(set(key)) != 26:
         raise ValueError("Key must be exactly 26 unique A-Z letters.")
     
-    # Create reverse mapping
-    reverse_key = [""] * 26
-    for i, ch in enumerate(key):
-        reverse_key[_char_to_num(ch)] = _num_to_char(i)
-    
-    out = []
-    for ch in text:
-        if "A" <= ch <= "Z":
-            idx = _char_to_num(ch)
-            out.append(reverse_key[idx])
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _translate(text, _inverse_keyed_rule, key)
 
 def rail_fence_encrypt(text: str, rails: int = 3) -> str:
     """
     Rail Fence (Zigzag) cipher.
     rails: number of rails (2-10 recommended)
     """
-    if rails < 2:
-        raise ValueError("Rails must be at least 2.")
-    
-    text = _clean(text)
-    if len(text) == 0:
-        return ""
-    
-    # Create rail structure
-    fence = [[] for _ in range(rails)]
-    rail = 0
-    direction = 1  # 1 for down, -1 for up
-    
-    for ch in text:
-        fence[rail].append(ch)
-        if rail == 0:
-            direction = 1
-        elif rail == rails - 1:
-            direction = -1
-        rail += direction
-    
-    return "".join("".join(rail_chars) for rail_chars in fence)
+    return _zigzag(_clean(text), rails)
 
 def rail_fence_decrypt(text: str, rails: int = 3) -> str:
     """Rail Fence decipher"""
-    if rails < 2:
-        raise ValueError("Rails must be at least 2.")
-    
-    text = _clean(text)
-    if len(text) == 0:
-        return ""
-    
-    # Calculate lengths for each rail
-    rail_lengths = [0] * rails
-    rail = 0
-    direction = 1
-    
-    for _ in range(len(text)):
-        rail_lengths[rail] += 1
-        if rail == 0:
-            direction = 1
-        elif rail == rails - 1:
-            direction = -1
-        rail += direction
-    
-    # Split ciphertext into rails
-    fence = []
-    pos = 0
-    for length in rail_lengths:
-        fence.append(list(text[pos : pos + length]))
-        pos += length
-    
-    # Reconstruct plaintext
-    out = []
-    rail = 0
-    direction = 1
-    rail_idx = [0] * rails
-    
-    for _ in range(len(text)):
-        out.append(fence[rail][rail_idx[rail]])
-        rail_idx[rail] += 1
-        if rail == 0:
-            direction = 1
-        elif rail == rails - 1:
-            direction = -1
-        rail += direction
-    
-    return "".join(out)
+    return _zigzag(_clean(text), rails, decrypt=True)
 
 def beaufort_encrypt(text: str, key: str) -> str:
     """
@@ -222,20 +438,7 @@ def beaufort_encrypt(text: str, key: str) -> str:
     Similar to Vigenère but uses subtraction instead.
     """
     text = _clean(text)
-    key = _clean(key)
-    if not key or any(not ("A" <= c <= "Z") for c in key):
-        raise ValueError("Key must contain only A-Z letters.")
-    
-    out = []
-    ki = 0
-    for ch in text:
-        if "A" <= ch <= "Z":
-            k = _char_to_num(key[ki % len(key)])
-            out.append(_num_to_char(k - _char_to_num(ch)))
-            ki += 1
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _polyalphabetic(text, _letter_key(key), 0, -1, 1)[0]
 
 def beaufort_decrypt(text: str, key: str) -> str:
     """Beaufort is reciprocal (decrypt = encrypt)"""
@@ -297,14 +500,7 @@ def multiply_encrypt(text: str, key: int) -> str:
     text = _clean(text)
     if key < 1 or key > 25:
         raise ValueError("Key must be 1-25")
-    result = []
-    for ch in text:
-        if ch.isalpha():
-            pos = _char_to_num(ch)
-            result.append(_num_to_char(pos * key))
-        else:
-            result.append(ch)
-    return "".join(result)
+    return _translate(text, _multiply_rule, key)
 
 def playfair_encrypt(text: str, key: str) -> str:
     """Playfair cipher - simplified 5x5 grid"""
@@ -363,7 +559,7 @@ def polybius_square_encrypt(text: str) -> str:
 def simple_xor(text: str, key: int) -> str:
     """XOR each character with key"""
     key = key % 256
-    return "".join(chr(ord(ch) ^ key) for ch in text)
+    return _translate(text, _xor_rule, key)
 
 def hex_encrypt(text: str) -> str:
     """Convert to hexadecimal"""
@@ -395,15 +591,7 @@ def binary_decrypt(text: str) -> str:
 
 def keyboard_shift(text: str, shift: int = 1) -> str:
     """Shift each character by position on keyboard"""
-    keyboard = "qwertyuiopasdfghjklzxcvbnm"
-    result = []
-    for ch in text.lower():
-        if ch in keyboard:
-            idx = keyboard.index(ch)
-            result.append(keyboard[(idx + shift) % len(keyboard)])
-        else:
-            result.append(ch)
-    return "".join(result).upper()
+    return _translate(text.lower(), _keyboard_rule, shift).upper()
 
 def number_substitution(text: str) -> str:
     """Replace each letter with its position (A=1, B=2, etc)"""
@@ -425,16 +613,12 @@ def unicode_encrypt(text: str) -> str:
     """Show Unicode codepoints"""
     return "".join(f"U+{ord(ch):04X} " for ch in text).strip()
 
+def _alpha_mirror_rule():
+    return _alpha_rule(lambda x: 25 - x)
+
 def reverse_alphabet(text: str) -> str:
     """Replace each letter with its reverse in alphabet"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        if ch.isalpha():
-            result.append(_num_to_char(25 - _char_to_num(ch)))
-        else:
-            result.append(ch)
-    return "".join(result)
+    return _translate(_clean(text), _alpha_mirror_rule)
 
 def shift_odd_even(text: str, shift: int = 1) -> str:
     """Shift odd positions one way, even another"""
@@ -478,15 +662,7 @@ def columnar_transposition_encrypt(text: str, key: str) -> str:
 
 def affine_cipher(text: str, a: int = 5, b: int = 8) -> str:
     """Affine cipher: (ax + b) mod 26"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        if ch.isalpha():
-            x = _char_to_num(ch)
-            result.append(_num_to_char((a * x + b) % 26))
-        else:
-            result.append(ch)
-    return "".join(result)
+    return _translate(_clean(text), _affine_rule, a, b)
 
 def word_reverse(text: str) -> str:
     """Reverse each word individually"""
@@ -516,6 +692,14 @@ def vigenere_autokey(text: str, key: str) -> str:
     if not key:
         raise ValueError("Key required")
     
+    if _vectorize(text) and text.isascii():
+        codes = _to_codes(text)
+        mask = _letter_mask(codes)
+        extension = codes[mask][:max(len(text) - len(key), 0)]
+        extended = _letter_values(_np.concatenate([_to_codes(key), extension]))
+        shifts = _key_stream(extended, 0, len(text))[mask]
+        return _from_codes(_shift_letters(codes, mask, shifts))
+    
     extended_key = list(key)
     for ch in text:
         if ch.isalpha() and len(extended_key) < len(text):
@@ -543,20 +727,13 @@ def double_transposition(text: str, key: int = 3) -> str:
 
 def rot47(text: str) -> str:
     """ROT47 cipher for ASCII characters"""
-    result = []
-    for ch in text:
-        if 33 <= ord(ch) <= 126:
-            result.append(chr(33 + (ord(ch) - 33 + 47) % 94))
-        else:
-            result.append(ch)
-    return "".join(result)
+    return _translate(text, _rot47_rule)
 
 def substitution_simple(text: str, key: str = "QWERTYUIOPASDFGHJKLZXCVBNM") -> str:
     """Simple substitution with custom alphabet"""
     text = _clean(text)
     plain = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    table = str.maketrans(plain, key)
-    return text.translate(table)
+    return text.translate(_maketrans(plain, key))
 
 def scytale_encrypt(text: str, rails: int = 3) -> str:
     """Scytale cipher - wrap text around cylinder"""
@@ -568,8 +745,11 @@ def scytale_encrypt(text: str, rails: int = 3) -> str:
 
 def atbash_with_shift(text: str, shift: int = 1) -> str:
     """Atbash followed by Caesar shift"""
-    reversed_text = atbash_encrypt(text)
-    return caesar_encrypt(reversed_text, shift=shift)
+    return _translate(_clean(text), _atbash_shift_rule, shift)
+
+def atbash_shift_decrypt(text: str, shift: int = 1) -> str:
+    """Inverse of atbash_with_shift"""
+    return _translate(_clean(text), _shift_atbash_rule, -shift)
 
 def bifid_simple(text: str) -> str:
     """Simplified Bifid cipher"""
@@ -595,12 +775,23 @@ def straddling_checkerboard(text: str) -> str:
     }
     return "".join(checkerboard.get(ch, "") for ch in text)
 
+def _keyed_position_shift(text: str, key: str) -> str:
+    """Vectorized text[i] + key[i % len(key)] over the letters of ASCII text"""
+    codes = _to_codes(text)
+    mask = _letter_mask(codes)
+    if not mask.any():
+        return text
+    stream = _key_stream(_letter_values(_to_codes(key)), 0, len(text))
+    return _from_codes(_shift_letters(codes, mask, stream[mask]))
+
 def running_key(text: str, key: str) -> str:
     """Running key cipher - key as long as message"""
     text = _clean(text)
     key = _clean(key)
     if len(key) < len(text):
         key = (key * ((len(text) // len(key)) + 1))[:len(text)]
+    if _vectorize(text) and text.isascii():
+        return _keyed_position_shift(text, key)
     result = []
     for i, ch in enumerate(text):
         if ch.isalpha():
@@ -624,6 +815,8 @@ def quagmire(text: str, key: str = "ZEBRAS") -> str:
     """Quagmire cipher - modified substitution"""
     text = _clean(text)
     key = _clean(key)
+    if _vectorize(text) and text.isascii():
+        return _keyed_position_shift(text, key)
     result = []
     for i, ch in enumerate(text):
         if ch.isalpha():
@@ -633,6 +826,10 @@ def quagmire(text: str, key: str = "ZEBRAS") -> str:
             result.append(ch)
     return "".join(result)
 
+def quagmire_decrypt(text: str, key: str = "ZEBRAS") -> str:
+    """Quagmire decipher: shift back by the key letter at each position"""
+    return quagmire(text, "".join(_num_to_char(-_char_to_num(c)) for c in _clean(key) if "A" <= c <= "Z"))
+
 def foursquare_simple(text: str) -> str:
     """Simplified Four-Square cipher"""
     text = _clean(text).replace('J', 'I')
@@ -692,11 +889,20 @@ def pattern_alphabet(text: str) -> str:
     
     return "".join(result)
 
-def gronsfeld(text: str, key: str = "1234567") -> str:
-    """Gronsfeld cipher - numeric Vigenère"""
-    text = _clean(text)
+def _gronsfeld(text: str, key: str, ki: int) -> Tuple[str, int]:
+    """Gronsfeld core; returns the output and the key index to resume from"""
+    if _vectorize(text) and text.isascii():
+        codes = _to_codes(text)
+        mask = _letter_mask(codes)
+        count = int(_np.count_nonzero(mask))
+        try:
+            digits = [int(d) for d in key]
+        except ValueError:
+            digits = None  # let the loop below raise at the first bad digit it uses
+        if digits is not None:
+            shifts = _key_stream(digits, ki, count)
+            return _from_codes(_shift_letters(codes, mask, shifts)), ki + count
     result = []
-    ki = 0
     for ch in text:
         if ch.isalpha():
             shift = int(key[ki % len(key)])
@@ -704,7 +910,11 @@ def gronsfeld(text: str, key: str = "1234567") -> str:
             ki += 1
         else:
             result.append(ch)
-    return "".join(result)
+    return "".join(result), ki
+
+def gronsfeld(text: str, key: str = "1234567") -> str:
+    """Gronsfeld cipher - numeric Vigenère"""
+    return _gronsfeld(_clean(text), key, 0)[0]
 
 def phonetic_alphabet(text: str) -> str:
     """Phonetic alphabet cipher"""
@@ -778,15 +988,7 @@ def atbash_numeric(text: str) -> str:
 
 def keyboard_qwerty(text: str, offset: int = 1) -> str:
     """Shift on QWERTY keyboard"""
-    qwerty = "qwertyuiopasdfghjklzxcvbnm"
-    result = []
-    for ch in text.lower():
-        if ch in qwerty:
-            idx = qwerty.index(ch)
-            result.append(qwerty[(idx + offset) % len(qwerty)])
-        else:
-            result.append(ch)
-    return "".join(result)
+    return _translate(text.lower(), _keyboard_rule, offset)
 
 def transposition_rail(text: str, rails: int = 3) -> str:
     """Rail fence transposition"""
@@ -880,16 +1082,12 @@ def alternating_reverse(text: str) -> str:
     words = text.split()
     return " ".join(w[::-1] if i % 2 == 1 else w for i, w in enumerate(words))
 
+def _mirrored_rule():
+    return lambda ch: chr(ord('Z') + ord('A') - ord(ch)) if ch.isalpha() else ch
+
 def mirrored_alphabet(text: str) -> str:
     """Mirror alphabet mapping"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        if ch.isalpha():
-            result.append(chr(ord('Z') + ord('A') - ord(ch)))
-        else:
-            result.append(ch)
-    return "".join(result)
+    return _translate(_clean(text), _mirrored_rule)
 
 def anagram_simple(text: str) -> str:
     """Simple anagram by shuffling"""
@@ -949,8 +1147,7 @@ def substitution_reverse_keyboard(text: str) -> str:
     text = _clean(text)
     qwerty = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
     reversed_qwerty = "ZXCVBNMASDFGHJKLQWERTYUIOP"
-    trans = str.maketrans(qwerty, reversed_qwerty)
-    return text.translate(trans)
+    return text.translate(_maketrans(qwerty, reversed_qwerty))
 
 def prime_cipher(text: str) -> str:
     """Encode using prime numbers"""
@@ -1011,16 +1208,12 @@ def diagonal_cipher(text: str) -> str:
     return "".join(result)
 
 def zigzag_simple(text: str) -> str:
-    """Simple zigzag pattern"""
-    text = _clean(text)
-    result = []
-    for i, ch in enumerate(text):
-        if i % 2 == 0:
-            result.append(ch)
-    for i, ch in enumerate(text):
-        if i % 2 == 1:
-            result.append(ch)
-    return "".join(result)
+    """Simple zigzag pattern (even positions, then odd ones)"""
+    return _zigzag(_clean(text), 2)
+
+def zigzag_simple_decrypt(text: str) -> str:
+    """Inverse of zigzag_simple"""
+    return _zigzag(_clean(text), 2, decrypt=True)
 
 def triangle_cipher(text: str) -> str:
     """Triangle arrangement"""
@@ -1052,6 +1245,11 @@ def fractionated_morse(text: str) -> str:
 def beaufort(text: str, key: str = "SECRET") -> str:
     """Beaufort Cipher - reciprocal key cipher"""
     key = (key * ((len(text) // len(key)) + 1))[:len(text)]
+    if _vectorize(text) and text.isascii():
+        codes = _to_codes(text)
+        mask = _letter_mask(codes, lower=True)
+        shifts = _key_stream(_letter_values(_to_codes(key)), 0, len(text))[mask]
+        return _from_codes(_shift_letters(codes, mask, shifts, -1))
     return ''.join(chr((ord(key[i]) - ord(text[i])) % 26 + 65) if text[i].isalpha() else text[i] for i in range(len(text)))
 
 def porta(text: str, key: str = "SECRET") -> str:
@@ -1120,8 +1318,7 @@ def slide(text: str, key: str = "SECRET") -> str:
     keyword = key.upper().replace('J', 'I')
     key_sq = keyword + ''.join(c for c in 'ABCDEFGHIKLMNOPQRSTUVWXYZ' if c not in keyword)
     plaintext = 'ABCDEFGHIKLMNOPQRSTUVWXYZ'
-    trans_table = str.maketrans(plaintext, key_sq)
-    return text.upper().translate(trans_table)
+    return text.upper().translate(_maketrans(plaintext, key_sq))
 
 def trifid(text: str, key: str = "SECRET") -> str:
     """Trifid Cipher - three-part cipher combining substitution and transposition"""
@@ -1177,41 +1374,29 @@ def simple_phonetic(text: str) -> str:
     phonetic = {'A': 'ay', 'E': 'ee', 'I': 'eye', 'O': 'oh', 'U': 'you'}
     return ''.join(phonetic.get(c.upper(), c) for c in text)
 
+def _mirror_alphabet_rule():
+    return lambda c: chr(90 - (ord(c.upper()) - 65)) if c.isalpha() else c
+
 def mirror_alphabet(text: str) -> str:
     """Mirror Alphabet - Atbash variant"""
-    return ''.join(chr(90 - (ord(c.upper()) - 65)) if c.isalpha() else c for c in text)
+    return _translate(text, _mirror_alphabet_rule)
 
 def reverse_alphabet(text: str) -> str:
     """Reverse Alphabet - reverse order substitution"""
-    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-    reversed_alphabet = alphabet[::-1]
-    trans_table = str.maketrans(alphabet, reversed_alphabet)
-    return text.upper().translate(trans_table)
+    return _translate(text.upper(), _atbash_rule)
 
 def keyboard_shift(text: str, key: str = "SECRET") -> str:
     """Keyboard Shift - shift based on keyboard adjacency"""
-    qwerty = "qwertyuiopasdfghjklzxcvbnm"
-    result = []
-    for c in text.lower():
-        if c in qwerty:
-            idx = qwerty.index(c)
-            result.append(qwerty[(idx + 1) % len(qwerty)])
-        else:
-            result.append(c)
-    return ''.join(result)
+    return _translate(text.lower(), _keyboard_rule, 1)
 
 # Transposition Advanced
 def zigzag_extended(text: str, rails: int = 4) -> str:
     """Extended Zigzag - multiple rail fence variants"""
-    fence = [[] for _ in range(rails)]
-    rail = 0
-    direction = 1
-    for c in text:
-        fence[rail].append(c)
-        rail += direction
-        if rail == 0 or rail == rails - 1:
-            direction *= -1
-    return ''.join(''.join(row) for row in fence)
+    return _zigzag(text, int(rails))
+
+def zigzag_extended_decrypt(text: str, rails: int = 4) -> str:
+    """Inverse of zigzag_extended"""
+    return _zigzag(text, int(rails), decrypt=True)
 
 def columnar_double(text: str, key1: str = "SECRET", key2: str = "DOUBLE") -> str:
     """Double Columnar Transposition - apply twice"""
@@ -1366,6 +1551,11 @@ def bacon_b_cipher(text: str) -> str:
 def vigenere_progressive(text: str, key: str = "KEY") -> str:
     """Vigenère with progressive key"""
     text = _clean(text)
+    if _vectorize(text):
+        shifted = (_letter_values(_to_codes(text))
+                   + _key_stream(range(26), 0, len(text))
+                   + _key_stream(_letter_values(_to_codes(key)), 0, len(text)))
+        return _from_codes(shifted % 26 + _np.uint8(A_ORD))
     result = []
     for i, ch in enumerate(text):
         shift = (i + _char_to_num(key[i % len(key)])) % 26
@@ -1431,14 +1621,12 @@ def product_cipher(text: str) -> str:
         result.append(_num_to_char(val))
     return "".join(result)
 
+def _modular_rule(mod: int):
+    return _numeric_rule(lambda x: (x + mod) % 26)
+
 def modular_cipher(text: str, mod: int = 13) -> str:
     """Modular arithmetic cipher"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = (_char_to_num(ch) + mod) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _translate(_clean(text), _modular_rule, mod)
 
 def simple_substitution_shift(text: str, shift: int = 5) -> str:
     """Substitution with fixed shift"""
@@ -1459,95 +1647,74 @@ def polyalphabetic_extended(text: str, keys: list = None) -> str:
 
 def simple_xor_extended(text: str, key: int = 42) -> str:
     """Extended XOR with variable key"""
-    result = []
-    for ch in text:
-        result.append(chr(ord(ch) ^ key))
-    return "".join(result)
+    return _translate(text, _xor_rule, key)
+
+def _multiplicative_rule(multiplier: int):
+    return _numeric_rule(lambda x: (x * multiplier) % 26)
 
 def multiplicative_cipher(text: str, multiplier: int = 3) -> str:
     """Multiply character values"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = (_char_to_num(ch) * multiplier) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _translate(_clean(text), _multiplicative_rule, multiplier)
+
+def _additive_inverse_rule():
+    return _numeric_rule(lambda x: (26 - x) % 26)
 
 def additive_inverse(text: str) -> str:
     """Additive inverse cipher"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = (26 - _char_to_num(ch)) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _translate(_clean(text), _additive_inverse_rule)
+
+def _exponential_rule(exp: int):
+    return _numeric_rule(lambda x: (pow(x + 1, exp, 26) - 1) % 26)
 
 def exponential_cipher(text: str, exp: int = 2) -> str:
     """Exponential character transformation"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = pow(_char_to_num(ch) + 1, exp, 26) - 1
-        result.append(_num_to_char(val % 26))
-    return "".join(result)
+    return _translate(_clean(text), _exponential_rule, exp)
+
+def _logarithmic_rule():
+    import math
+    return _numeric_rule(lambda x: int(math.log(x + 2, 2)) % 26)
 
 def logarithmic_cipher(text: str) -> str:
     """Logarithmic transformation"""
-    import math
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = int(math.log(_char_to_num(ch) + 2, 2)) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _translate(_clean(text), _logarithmic_rule)
+
+def _square_rule():
+    return _numeric_rule(lambda x: (x ** 2) % 26)
 
 def square_cipher(text: str) -> str:
     """Square each character value"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = (_char_to_num(ch) ** 2) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _translate(_clean(text), _square_rule)
+
+def _cubic_rule():
+    return _numeric_rule(lambda x: (x ** 3) % 26)
 
 def cubic_cipher(text: str) -> str:
     """Cube each character value"""
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = (_char_to_num(ch) ** 3) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _translate(_clean(text), _cubic_rule)
+
+def _sine_rule():
+    import math
+    return _numeric_rule(lambda x: int(math.sin(x) * 13 + 13) % 26)
 
 def sine_cipher(text: str) -> str:
     """Sine-based transformation"""
+    return _translate(_clean(text), _sine_rule)
+
+def _cosine_rule():
     import math
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = int(math.sin(_char_to_num(ch)) * 13 + 13) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _numeric_rule(lambda x: int(math.cos(x) * 13 + 13) % 26)
 
 def cosine_cipher(text: str) -> str:
     """Cosine-based transformation"""
+    return _translate(_clean(text), _cosine_rule)
+
+def _gcd_rule(gcd_base: int):
     import math
-    text = _clean(text)
-    result = []
-    for ch in text:
-        val = int(math.cos(_char_to_num(ch)) * 13 + 13) % 26
-        result.append(_num_to_char(val))
-    return "".join(result)
+    return _numeric_rule(lambda x: math.gcd(x + 1, gcd_base) % 26)
 
 def gcd_cipher(text: str, gcd_base: int = 26) -> str:
     """GCD-based cipher"""
-    import math
-    text = _clean(text)
-    result = []
-    for ch in text:
-        g = math.gcd(_char_to_num(ch) + 1, gcd_base)
-        result.append(_num_to_char(g % 26))
-    return "".join(result)
+    return _translate(_clean(text), _gcd_rule, gcd_base)
 
 def lcm_cipher(text: str) -> str:
     """LCM-based cipher"""
@@ -1850,52 +2017,339 @@ def look_and_say_cipher(text: str) -> str:
         i += count
     return "".join(result)
 
-def thue_morse_cipher(text: str) -> str:
-    """Thue-Morse sequence cipher"""
+def _thue_morse_sequence() -> list:
     tm = [0, 1]
     for _ in range(10):
         tm.extend([1 - x for x in tm])
-    text = _clean(text)
+    return tm
+
+_THUE_MORSE = _thue_morse_sequence()
+
+def _thue_morse(text: str, offset: int) -> str:
+    """Thue-Morse core for text starting at position offset"""
+    tm = _THUE_MORSE
     result = []
-    for i, ch in enumerate(text):
+    for i, ch in enumerate(text, offset):
         shift = tm[(_char_to_num(ch) + i) % len(tm)] * 13
         result.append(_num_to_char((_char_to_num(ch) + shift) % 26))
     return "".join(result)
 
+def thue_morse_cipher(text: str) -> str:
+    """Thue-Morse sequence cipher"""
+    return _thue_morse(_clean(text), 0)
+
+# ============ CPU EXECUTOR ============
+# KDF and large-payload cipher jobs run in a bounded process pool so a few
+# expensive requests cannot tie up every web worker. With max_workers=0 (the
+# default outside the app) jobs simply run inline.
+
+class ExecutorBusy(RuntimeError):
+    """The CPU pool could not take or finish a job in time"""
+
+class ExecutorSaturated(ExecutorBusy):
+    """max_pending jobs are already queued or running"""
+
+class ExecutorTimeout(ExecutorBusy, TimeoutError):
+    """A job did not finish within the executor timeout"""
+
+class ExecutorBroken(ExecutorBusy):
+    """A pool worker died (e.g. killed for memory) and took the job with it"""
+
+class CPUExecutor:
+    """
+    Process pool with a queue-depth limit. The pool is created lazily and
+    per process, so forked web workers never share their parent's pool.
+    """
+
+    def __init__(self, max_workers: int = 0, max_pending: int = 8, timeout: float = 30.0,
+                 offload_min_length: int = 256 * 1024):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.offload_min_length = offload_min_length
+        self._pool = None
+        self._pool_pid = None
+        self._pending = 0
+        self._generation = 0  # bumped with every new pool; jobs of older pools no longer count
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                  timeout: Optional[float] = None, offload_min_length: Optional[int] = None) -> None:
+        with self._lock:
+            if max_workers is not None and max_workers != self.max_workers:
+                self.max_workers = max_workers
+                self._shutdown_pool()
+            if max_pending is not None:
+                self.max_pending = max_pending
+            if timeout is not None:
+                self.timeout = timeout
+            if offload_min_length is not None:
+                self.offload_min_length = offload_min_length
+
+    def _shutdown_pool(self) -> None:
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._pool_pid = os.getpid()
+            self._pending = 0
+            self._generation += 1
+        return self._pool
+
+    def _release(self, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._pending -= 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Queue fn(*args, **kwargs); raises ExecutorSaturated when the queue is full"""
+        if self.max_workers <= 0:
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExecutorSaturated(f"CPU pool is busy ({self._pending} jobs pending).")
+            try:
+                future = self._get_pool().submit(fn, *args, **kwargs)
+            except concurrent.futures.process.BrokenProcessPool:
+                self._shutdown_pool()  # a worker died; start a fresh pool
+                future = self._get_pool().submit(fn, *args, **kwargs)
+            self._pending += 1
+            generation = self._generation
+        future.add_done_callback(lambda _future: self._release(generation))
+        return future
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Run fn in the pool and wait for its result, at most `timeout` seconds"""
+        return self.result(self.submit(fn, *args, **kwargs), self.timeout)
+
+    def result(self, future: concurrent.futures.Future, timeout: float):
+        """future.result(timeout), with a timeout or a dead worker raised as ExecutorBusy"""
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()  # only helps if it has not started; a running job keeps its slot
+            raise ExecutorTimeout(f"CPU job did not finish within {self.timeout:g} seconds.") from None
+        except concurrent.futures.process.BrokenProcessPool:
+            # The next submit() replaces the pool.
+            raise ExecutorBroken("A CPU worker died before finishing the job.") from None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._shutdown_pool()
+
+CPU_EXECUTOR = CPUExecutor()
+
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 
+AES_BUNDLE_VERSION = 2
+
+@dataclass(frozen=True)
+class ScryptProfile:
+    """Scrypt cost parameters; the default is what version 1 bundles used"""
+    n: int = 2**14
+    r: int = 8
+    p: int = 1
+
+    # Upper bounds for parameters read back from a bundle, so a crafted bundle
+    # cannot make the server spend unbounded CPU or memory on key derivation.
+    MAX_N = 2**20
+    MAX_R = 32
+    MAX_P = 16
+    MAX_MEMORY = 256 * 1024 * 1024
+
+    def validate(self) -> "ScryptProfile":
+        for name in ("n", "r", "p"):
+            if not isinstance(getattr(self, name), int) or isinstance(getattr(self, name), bool):
+                raise ValueError(f"Scrypt {name} must be an integer.")
+        if self.n < 2 or self.n & (self.n - 1) or self.n > self.MAX_N:
+            raise ValueError(f"Scrypt n must be a power of two up to {self.MAX_N}.")
+        if not 1 <= self.r <= self.MAX_R or not 1 <= self.p <= self.MAX_P:
+            raise ValueError("Scrypt r or p out of range.")
+        if 128 * self.n * self.r > self.MAX_MEMORY:
+            raise ValueError("Scrypt parameters exceed the memory limit.")
+        return self
+
+DEFAULT_SCRYPT = ScryptProfile()
+
 @dataclass
 class AESBundle:
-    """Container for AES-GCM encrypted data"""
+    """
+    Container for AES-GCM encrypted data.
+    Version 2 records the KDF parameters; bundles without a version are
+    version 1 and always used DEFAULT_SCRYPT.
+    """
     salt_b64: str
     nonce_b64: str
     ciphertext_b64: str
-
-def _kdf_scrypt(password: str, salt: bytes) -> bytes:
+    version: int = AES_BUNDLE_VERSION
+    kdf: str = "scrypt"
+    kdf_n: int = DEFAULT_SCRYPT.n
+    kdf_r: int = DEFAULT_SCRYPT.r
+    kdf_p: int = DEFAULT_SCRYPT.p
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "AESBundle":
+        """Build a bundle from its JSON form (either version)"""
+        if not isinstance(data, Mapping):
+            raise ValueError("Bundle must be an object.")
+        fields = {
+            "salt_b64": data.get("salt_b64", ""),
+            "nonce_b64": data.get("nonce_b64", ""),
+            "ciphertext_b64": data.get("ciphertext_b64", ""),
+        }
+        version = data.get("version", 1)
+        if version == 1:
+            return cls(**fields, version=1)
+        if version != AES_BUNDLE_VERSION:
+            raise ValueError(f"Unsupported bundle version: {version}")
+        if data.get("kdf", "scrypt") != "scrypt":
+            raise ValueError(f"Unsupported KDF: {data.get('kdf')}")
+        return cls(
+            **fields,
+            kdf_n=data.get("kdf_n", DEFAULT_SCRYPT.n),
+            kdf_r=data.get("kdf_r", DEFAULT_SCRYPT.r),
+            kdf_p=data.get("kdf_p", DEFAULT_SCRYPT.p),
+        )
+
+    @property
+    def profile(self) -> ScryptProfile:
+        if self.version == 1:
+            return DEFAULT_SCRYPT
+        return ScryptProfile(self.kdf_n, self.kdf_r, self.kdf_p).validate()
+
+def _kdf_scrypt(password: str, salt: bytes, profile: ScryptProfile = DEFAULT_SCRYPT) -> bytes:
     """Derive encryption key from password using Scrypt KDF"""
-    kdf = Scrypt(salt=salt, length=32, n=2**14, r=8, p=1)
+    kdf = Scrypt(salt=salt, length=32, n=profile.n, r=profile.r, p=profile.p)
     return kdf.derive(password.encode("utf-8"))
 
-def aes_encrypt(plaintext: str, password: str) -> AESBundle:
+class DerivedKeyCache:
     """
-    AES-GCM encryption with password-based key derivation.
-    Returns bundle with salt, nonce, and ciphertext (all base64).
+    Bounded, expiring cache of scrypt-derived keys, so many bundles sharing a
+    password and salt derive the key once. Entries are keyed by an HMAC of
+    (params, salt, password) under a per-process secret: neither passwords
+    nor a plain hash of them are kept in memory.
     """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0,
+                 kdf: Callable[[str, bytes, ScryptProfile], bytes] = _kdf_scrypt):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.kdf = kdf
+        self._secret = os.urandom(32)
+        self._entries: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def configure(self, maxsize: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._evict(time.monotonic())
+
+    def _lookup_key(self, password: str, salt: bytes, profile: ScryptProfile) -> bytes:
+        mac = hmac.new(self._secret, digestmod=hashlib.sha256)
+        mac.update(f"{profile.n}:{profile.r}:{profile.p}:{len(salt)}:".encode("ascii"))
+        mac.update(salt)
+        mac.update(password.encode("utf-8"))
+        return mac.digest()
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            lookup, (expires, _) = next(iter(self._entries.items()))
+            if expires > now and len(self._entries) <= self.maxsize:
+                break
+            del self._entries[lookup]
+
+    def derive(self, password: str, salt: bytes, profile: ScryptProfile = DEFAULT_SCRYPT) -> bytes:
+        """Return the key for (password, salt, profile), deriving it on a miss"""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return self.kdf(password, salt, profile)
+        lookup = self._lookup_key(password, salt, profile)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(lookup)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        key = self.kdf(password, salt, profile)  # outside the lock: it is the slow part
+        with self._lock:
+            # Expiry is fixed at insertion, so entries stay ordered by expiry.
+            self._entries.pop(lookup, None)
+            self._entries[lookup] = (now + self.ttl, key)
+            self._evict(now)
+        return key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def _pooled_kdf(password: str, salt: bytes, profile: ScryptProfile) -> bytes:
+    """Run the scrypt derivation on CPU_EXECUTOR"""
+    return CPU_EXECUTOR.run(_kdf_scrypt, password, salt, profile)
+
+AES_KEY_CACHE = DerivedKeyCache(kdf=_pooled_kdf)
+
+def _check_password(password: str) -> None:
     if not password or len(password) < 6:
         raise ValueError("Password must be at least 6 characters.")
-    
-    salt = os.urandom(16)
-    key = _kdf_scrypt(password, salt)
-    nonce = os.urandom(12)
-    aesgcm = AESGCM(key)
-    ct = aesgcm.encrypt(nonce, plaintext.encode("utf-8"), None)
-    
-    return AESBundle(
-        salt_b64=base64.b64encode(salt).decode("ascii"),
-        nonce_b64=base64.b64encode(nonce).decode("ascii"),
-        ciphertext_b64=base64.b64encode(ct).decode("ascii"),
-    )
+
+class AESSession:
+    """
+    A key derived once from a password and salt; encrypts any number of
+    messages under fresh random nonces. All bundles share the salt, so
+    decrypting them later hits AES_KEY_CACHE after the first one.
+    """
+
+    def __init__(self, password: str, salt: Optional[bytes] = None, profile: Optional[ScryptProfile] = None):
+        _check_password(password)
+        self.profile = (profile or DEFAULT_SCRYPT).validate()
+        self.salt = salt if salt is not None else os.urandom(16)
+        self._aesgcm = AESGCM(AES_KEY_CACHE.derive(password, self.salt, self.profile))
+
+    def encrypt(self, plaintext: str) -> AESBundle:
+        nonce = os.urandom(12)
+        ct = self._aesgcm.encrypt(nonce, plaintext.encode("utf-8"), None)
+        return AESBundle(
+            salt_b64=base64.b64encode(self.salt).decode("ascii"),
+            nonce_b64=base64.b64encode(nonce).decode("ascii"),
+            ciphertext_b64=base64.b64encode(ct).decode("ascii"),
+            kdf_n=self.profile.n,
+            kdf_r=self.profile.r,
+            kdf_p=self.profile.p,
+        )
+
+    def encrypt_many(self, plaintexts: Iterable[str]) -> list:
+        return [self.encrypt(plaintext) for plaintext in plaintexts]
+
+def aes_encrypt(plaintext: str, password: str, profile: Optional[ScryptProfile] = None) -> AESBundle:
+    """
+    AES-GCM encryption with password-based key derivation.
+    Returns bundle with salt, nonce, ciphertext (all base64) and KDF parameters.
+    """
+    return AESSession(password, profile=profile).encrypt(plaintext)
+
+def aes_encrypt_many(plaintexts: Iterable[str], password: str, profile: Optional[ScryptProfile] = None) -> list:
+    """Encrypt several messages under one derived key (one salt, fresh nonces)"""
+    return AESSession(password, profile=profile).encrypt_many(plaintexts)
 
 def aes_decrypt(bundle: AESBundle, password: str) -> str:
     """Decrypt AES-GCM ciphertext"""
@@ -1903,13 +2357,262 @@ def aes_decrypt(bundle: AESBundle, password: str) -> str:
         salt = base64.b64decode(bundle.salt_b64)
         nonce = base64.b64decode(bundle.nonce_b64)
         ct = base64.b64decode(bundle.ciphertext_b64)
-        key = _kdf_scrypt(password, salt)
+        key = AES_KEY_CACHE.derive(password, salt, bundle.profile)
         aesgcm = AESGCM(key)
         pt = aesgcm.decrypt(nonce, ct, None)
         return pt.decode("utf-8")
+    except ExecutorBusy:
+        raise
     except Exception as e:
         raise ValueError("Decryption failed. Wrong password or corrupted data.")
 
+# Segmented binary format for large payloads (the STREAM construction):
+#   header   magic "CLAES", version, kdf id, log2(n), r, p, segment size,
+#            16-byte salt, 7-byte nonce prefix
+#   segments AES-GCM of segment_size plaintext bytes (the last may be shorter
+#            or empty), each with its own 16-byte tag
+# Segment i uses nonce prefix || i (uint32) || last flag, and the header is
+# the associated data of every segment. Reordering, truncation, appending
+# and header edits therefore all fail authentication.
+
+AES_STREAM_MAGIC = b"CLAES"
+AES_STREAM_VERSION = 1
+AES_STREAM_SEGMENT_SIZE = 64 * 1024
+_AES_STREAM_HEADER = struct.Struct(">5sBBBBBI16s7s")
+_AES_STREAM_KDF_SCRYPT = 1
+_AES_STREAM_TAG_SIZE = 16
+_AES_STREAM_MAX_SEGMENTS = 2**32
+_AES_STREAM_SEGMENT_LIMITS = (1024, 16 * 1024 * 1024)
+
+def iter_byte_chunks(stream, chunk_size: int = AES_STREAM_SEGMENT_SIZE) -> Iterator[bytes]:
+    """Read a binary file-like object in chunks"""
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        yield data
+
+def _segments(chunks: Iterable[bytes], size: int) -> Iterator[Tuple[bytes, bool]]:
+    """Re-frame byte chunks into (segment, is_last) pairs of exactly `size` bytes but the last"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        # Keep at least one byte back: a full segment is only known not to be
+        # the last one once more data has arrived.
+        while len(buffer) > size:
+            yield bytes(buffer[:size]), False
+            del buffer[:size]
+    yield bytes(buffer), True
+
+def _segment_nonce(prefix: bytes, index: int, last: bool) -> bytes:
+    if index >= _AES_STREAM_MAX_SEGMENTS:
+        raise ValueError("Stream is too long.")
+    return prefix + struct.pack(">IB", index, last)
+
+def aes_stream_encrypt(chunks: Iterable[bytes], password: str, profile: Optional[ScryptProfile] = None,
+                       segment_size: int = AES_STREAM_SEGMENT_SIZE) -> Iterator[bytes]:
+    """
+    Encrypt an iterable of byte chunks into the segmented format, yielding
+    the header and then one encrypted segment at a time.
+    """
+    _check_password(password)
+    profile = (profile or DEFAULT_SCRYPT).validate()
+    low, high = _AES_STREAM_SEGMENT_LIMITS
+    if not low <= segment_size <= high:
+        raise ValueError(f"Segment size must be between {low} and {high} bytes.")
+    salt, prefix = os.urandom(16), os.urandom(7)
+    header = _AES_STREAM_HEADER.pack(
+        AES_STREAM_MAGIC, AES_STREAM_VERSION, _AES_STREAM_KDF_SCRYPT,
+        profile.n.bit_length() - 1, profile.r, profile.p, segment_size, salt, prefix,
+    )
+    aesgcm = AESGCM(AES_KEY_CACHE.derive(password, salt, profile))
+    def generate():
+        yield header
+        for index, (segment, last) in enumerate(_segments(chunks, segment_size)):
+            yield aesgcm.encrypt(_segment_nonce(prefix, index, last), segment, header)
+    return generate()
+
+def _read_stream_header(chunks: Iterator[bytes]) -> Tuple[bytes, bytes]:
+    """Pull the header off a chunk iterator; returns (header, leftover bytes)"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= _AES_STREAM_HEADER.size:
+            break
+    if len(buffer) < _AES_STREAM_HEADER.size or not buffer.startswith(AES_STREAM_MAGIC):
+        raise ValueError("Not an AES stream.")
+    size = _AES_STREAM_HEADER.size
+    return bytes(buffer[:size]), bytes(buffer[size:])
+
+def aes_stream_decrypt(chunks: Iterable[bytes], password: str) -> Iterator[bytes]:
+    """
+    Decrypt the segmented format, yielding plaintext one authenticated
+    segment at a time. A truncated or extended stream raises ValueError when
+    the end is reached, after the segments before it have been yielded.
+    """
+    chunks = iter(chunks)
+    header, leftover = _read_stream_header(chunks)
+    _, version, kdf, log_n, r, p, segment_size, salt, prefix = _AES_STREAM_HEADER.unpack(header)
+    if version != AES_STREAM_VERSION or kdf != _AES_STREAM_KDF_SCRYPT:
+        raise ValueError(f"Unsupported AES stream version: {version}")
+    low, high = _AES_STREAM_SEGMENT_LIMITS
+    if not low <= segment_size <= high or log_n >= 64:
+        raise ValueError("Corrupted AES stream header.")
+    profile = ScryptProfile(1 << log_n, r, p).validate()
+    aesgcm = AESGCM(AES_KEY_CACHE.derive(password, salt, profile))
+
+    def generate():
+        body = _segments(itertools.chain([leftover], chunks), segment_size + _AES_STREAM_TAG_SIZE)
+        for index, (segment, last) in enumerate(body):
+            try:
+                yield aesgcm.decrypt(_segment_nonce(prefix, index, last), segment, header)
+            except InvalidTag:
+                if index == 0:
+                    raise ValueError("Decryption failed. Wrong password or corrupted data.") from None
+                raise ValueError("Decryption failed. Stream is truncated or corrupted.") from None
+    return generate()
+
+# ============ STREAMING ============
+
+STREAM_CHUNK_SIZE = 64 * 1024
+_SPOOL_MAX_SIZE = 1024 * 1024
+_SPOOL_ENCODING = "utf-32-le"  # fixed width, so character offsets map to byte offsets
+STREAM_MAX_RAILS = 64  # the encrypt kernel keeps one spool per rail
+
+def iter_text_chunks(stream, chunk_size: int = STREAM_CHUNK_SIZE, encoding: str = "utf-8") -> Iterator[str]:
+    """Decode a binary file-like object into text chunks without reading it all"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+def _spool_write(spool, text: str) -> None:
+    spool.write(text.encode(_SPOOL_ENCODING, "surrogatepass"))
+
+def _spool_read(spool, count: int) -> str:
+    return spool.read(4 * count).decode(_SPOOL_ENCODING, "surrogatepass")
+
+def _iter_spool(spool) -> Iterator[str]:
+    spool.seek(0)
+    while True:
+        text = _spool_read(spool, STREAM_CHUNK_SIZE)
+        if not text:
+            break
+        yield text
+
+def _stream_map(func):
+    """Stream kernel for ciphers that transform each character independently"""
+    def stream(chunks: Iterable[str], **params) -> Iterator[str]:
+        func("A", **params)  # surface parameter errors before the first chunk
+        return (func(chunk, **params) for chunk in chunks)
+    return stream
+
+def _polyalphabetic_stream(text_sign: int, key_sign: int):
+    def stream(chunks: Iterable[str], key: str = "") -> Iterator[str]:
+        key_values = _letter_key(key)
+        def generate():
+            ki = 0
+            for chunk in chunks:
+                out, ki = _polyalphabetic(_clean(chunk), key_values, ki, text_sign, key_sign)
+                yield out
+        return generate()
+    return stream
+
+vigenere_stream_encrypt = _polyalphabetic_stream(1, 1)
+vigenere_stream_decrypt = _polyalphabetic_stream(1, -1)
+beaufort_stream = _polyalphabetic_stream(-1, 1)
+
+def gronsfeld_stream(chunks: Iterable[str], key: str = "1234567") -> Iterator[str]:
+    """Gronsfeld over a stream; the key index carries across chunks"""
+    if not key or not all("0" <= d <= "9" for d in key):
+        raise ValueError("Key must contain only digits 0-9.")
+    def generate():
+        ki = 0
+        for chunk in chunks:
+            out, ki = _gronsfeld(_clean(chunk), key, ki)
+            yield out
+    return generate()
+
+def thue_morse_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Thue-Morse over a stream; the sequence position carries across chunks"""
+    def generate():
+        offset = 0
+        for chunk in chunks:
+            chunk = _clean(chunk)
+            yield _thue_morse(chunk, offset)
+            offset += len(chunk)
+    return generate()
+
+def _stream_rails(rails: int) -> int:
+    if not 2 <= rails <= STREAM_MAX_RAILS:
+        raise ValueError(f"Rails must be between 2 and {STREAM_MAX_RAILS} when streaming.")
+    return rails
+
+def rail_fence_stream_encrypt(chunks: Iterable[str], rails: int = 3) -> Iterator[str]:
+    """
+    Rail Fence over a stream. Rails are spooled to temporary files (on disk
+    past _SPOOL_MAX_SIZE) and emitted once the input is exhausted.
+    """
+    rails = _stream_rails(rails)
+    def generate():
+        spools = [tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) for _ in range(rails)]
+        try:
+            offset = 0
+            for chunk in chunks:
+                chunk = _clean(chunk)
+                for rail, chars in _rail_slices(chunk, rails, offset):
+                    _spool_write(spools[rail], chars)
+                offset += len(chunk)
+            for spool in spools:
+                yield from _iter_spool(spool)
+        finally:
+            for spool in spools:
+                spool.close()
+    return generate()
+
+def rail_fence_stream_decrypt(chunks: Iterable[str], rails: int = 3) -> Iterator[str]:
+    """
+    Rail Fence decipher over a stream. The ciphertext is spooled first (rail
+    lengths depend on the total length), then the zigzag is rebuilt a block
+    of whole cycles at a time.
+    """
+    rails = _stream_rails(rails)
+    def generate():
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as spool:
+            length = 0
+            for chunk in chunks:
+                chunk = _clean(chunk)
+                _spool_write(spool, chunk)
+                length += len(chunk)
+
+            cycle = 2 * (rails - 1)
+            starts = [0]
+            for count in _rail_counts(length, rails)[:-1]:
+                starts.append(starts[-1] + count)
+            consumed = [0] * rails
+            block = max(STREAM_CHUNK_SIZE // cycle, 1) * cycle
+            for block_start in range(0, length, block):
+                size = min(block, length - block_start)
+                out = [""] * size
+                for rail, count in enumerate(_rail_counts(size, rails)):
+                    spool.seek(4 * (starts[rail] + consumed[rail]))
+                    chars = _spool_read(spool, count)
+                    consumed[rail] += count
+                    if rail == 0 or rail == rails - 1:
+                        out[rail::cycle] = chars
+                    else:
+                        out[rail::cycle] = chars[0::2]
+                        out[cycle - rail::cycle] = chars[1::2]
+                yield "".join(out)
+    return generate()
+
 # ============ CIPHER REGISTRY ============
 
 CLASSIC_CIPHERS = {
@@ -1967,6 +2670,8 @@ CLASSIC_CIPHERS = {
         "description": "Write message in zigzag pattern across N rails, then read row-by-row.",
         "encrypt": rail_fence_encrypt,
         "decrypt": rail_fence_decrypt,
+        "permutation": lambda rails=3, **kw: ("rail", int(rails)),
+        "clean": True,
         "params": ["rails"],
         "param_types": {"rails": "number"},
     },
@@ -1985,6 +2690,7 @@ CLASSIC_CIPHERS = {
         "description": "Reverse the entire text. Symmetrical (encrypt = decrypt).",
         "encrypt": lambda text, **kw: simple_reverse(text),
         "decrypt": lambda text, **kw: simple_reverse(text),
+        "permutation": lambda **kw: ("reverse", 0),
         "params": [],
         "param_types": {},
     },
@@ -2088,7 +2794,7 @@ CLASSIC_CIPHERS = {
         "name": "Affine Cipher",
         "description": "Linear transformation: (ax + b) mod 26.",
         "encrypt": lambda text, a=5, b=8, **kw: affine_cipher(text, int(a), int(b)),
-        "decrypt": lambda text, **kw: "Decryption not fully supported",
+        "decrypt": lambda text, a=5, b=8, **kw: _affine_decrypt(text, int(a), int(b)),
         "params": ["a", "b"],
         "param_types": {"a": "number", "b": "number"},
     },
@@ -2162,7 +2868,7 @@ CLASSIC_CIPHERS = {
         "name": "Quagmire Cipher",
         "description": "Modified substitution with running key component.",
         "encrypt": lambda text, key="ZEBRAS", **kw: quagmire(text, key),
-        "decrypt": lambda text, **kw: "Decryption not fully supported",
+        "decrypt": lambda text, key="ZEBRAS", **kw: quagmire_decrypt(text, key),
         "params": ["key"],
         "param_types": {"key": "text"},
     },
@@ -2332,7 +3038,7 @@ CLASSIC_CIPHERS = {
         "name": "Rail Fence Variant",
         "description": "Alternative rail fence transposition.",
         "encrypt": lambda text, rails=3, **kw: transposition_rail(text, int(rails)),
-        "decrypt": lambda text, **kw: "Decryption not fully supported",
+        "decrypt": lambda text, rails=3, **kw: rail_fence_decrypt(text, int(rails)),
         "params": ["rails"],
         "param_types": {"rails": "number"},
     },
@@ -2508,7 +3214,7 @@ CLASSIC_CIPHERS = {
         "name": "Zigzag Pattern",
         "description": "Separate text into even/odd positions.",
         "encrypt": zigzag_simple,
-        "decrypt": lambda text, **kw: "Decryption not fully supported",
+        "decrypt": zigzag_simple_decrypt,
         "params": [],
         "param_types": {},
     },
@@ -2592,9 +3298,9 @@ CLASSIC_CIPHERS = {
     "keyboard-shift": {"name": "Keyboard Shift", "description": "Shift based on keyboard adjacency", "encrypt": keyboard_shift, "decrypt": lambda text, **kw: "Not supported", "params": ["key"], "param_types": {"key": "text"}},
     
     # ===== TRANSPOSITION ADVANCED =====
-    "zigzag-extended": {"name": "Extended Zigzag", "description": "Multi-rail fence variants", "encrypt": zigzag_extended, "decrypt": lambda text, rails=4, **kw: "Not supported", "params": ["rails"], "param_types": {"rails": "number"}},
+    "zigzag-extended": {"name": "Extended Zigzag", "description": "Multi-rail fence variants", "encrypt": zigzag_extended, "decrypt": zigzag_extended_decrypt, "params": ["rails"], "param_types": {"rails": "number"}},
     "columnar-double": {"name": "Double Columnar", "description": "Apply twice", "encrypt": columnar_double, "decrypt": lambda text, **kw: "Not supported", "params": ["key1", "key2"], "param_types": {"key1": "text", "key2": "text"}},
-    "fence-extended": {"name": "Extended Fence", "description": "Split into multiple fences", "encrypt": fence_extended, "decrypt": lambda text, **kw: "Not supported", "params": ["key"], "param_types": {"key": "text"}},
+    "fence-extended": {"name": "Extended Fence", "description": "Split into multiple fences", "encrypt": fence_extended, "decrypt": fence_extended, "params": ["key"], "param_types": {"key": "text"}},
     
     # ===== MODERN CRYPTOGRAPHIC =====
     "xor-extended": {"name": "Extended XOR", "description": "Multi-byte key XOR", "encrypt": xor_extended, "decrypt": xor_extended, "params": ["key"], "param_types": {"key": "text"}},
@@ -2610,7 +3316,31 @@ CLASSIC_CIPHERS = {
     # ===== HYBRID APPROACHES =====
     "hybrid-vigenere-caesar": {"name": "Hybrid Vigenère-Caesar", "description": "Combines both methods", "encrypt": hybrid_vigenere_caesar, "decrypt": lambda text, **kw: "Not supported", "params": ["key"], "param_types": {"key": "text"}},
     "hybrid-subst-transpos": {"name": "Hybrid Substitution-Transposition", "description": "Combined transformation", "encrypt": hybrid_substitution_transposition, "decrypt": lambda text, **kw: "Not supported", "params": ["key"], "param_types": {"key": "text"}},
+
+    # ===== PIPELINES =====
+    "pipeline": {"name": "Cipher Pipeline", "description": "Chain ciphers: steps is a JSON list of {slug, params}, applied in order", "encrypt": lambda text, **kw: pipeline_encrypt(text, **kw), "decrypt": lambda text, **kw: pipeline_decrypt(text, **kw), "params": ["steps"], "param_types": {"steps": "text"}},
+}
+
+# Ciphers whose kernels transform each character independently. Pipelines
+# fuse these ("chunkwise") and entries with a "permutation" (a fixed
+# reordering of positions, after uppercasing when "clean" is set).
+_CHUNKWISE_CIPHERS = ("caesar", "rot13", "atbash", "substitution", "xor", "rot47", "reverse-alphabet", "mirror", "affine")
+
+# Streaming kernels (encrypt, decrypt); state such as the key index carries across chunks
+_STREAM_KERNELS = {
+    "vigenere": (vigenere_stream_encrypt, vigenere_stream_decrypt),
+    "gronsfeld": (gronsfeld_stream, None),
+    "thue-morse": (thue_morse_stream, None),
+    "rail-fence": (rail_fence_stream_encrypt, rail_fence_stream_decrypt),
 }
+for _slug in _CHUNKWISE_CIPHERS:
+    CLASSIC_CIPHERS[_slug]["chunkwise"] = True
+    _STREAM_KERNELS[_slug] = (
+        _stream_map(CLASSIC_CIPHERS[_slug]["encrypt"]),
+        _stream_map(CLASSIC_CIPHERS[_slug]["decrypt"]),
+    )
+for _slug, (_encrypt, _decrypt) in _STREAM_KERNELS.items():
+    CLASSIC_CIPHERS[_slug].update(stream_encrypt=_encrypt, stream_decrypt=_decrypt)
 
 # ============ HELPER FUNCTIONS ============
 
@@ -2628,14 +3358,7 @@ def _affine_decrypt(text: str, a: int, b: int) -> str:
     inv = _mod_inverse(a, 26)
     if inv == -1:
         raise ValueError("Invalid affine key.")
-    out = []
-    for ch in text:
-        if ch.isalpha():
-            x = _char_to_num(ch)
-            out.append(_num_to_char((inv * (x - b)) % 26))
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _translate(text, _affine_inverse_rule, inv, b)
 
 def _dynamic_cipher_info(slug: str) -> Optional[dict]:
     """Return dynamic cipher info for slug variants."""
@@ -2647,8 +3370,11 @@ def _dynamic_cipher_info(slug: str) -> Optional[dict]:
                 return {
                     "name": f"Caesar Shift {shift}",
                     "description": "Fixed-shift Caesar variant.",
-                    "encrypt": lambda text, shift=shift, **kw: caesar_encrypt(text, shift),
-                    "decrypt": lambda text, shift=shift, **kw: caesar_decrypt(text, shift),
+                    "encrypt": _translation_kernel(_shift_rule, shift),
+                    "decrypt": _translation_kernel(_shift_rule, -shift),
+                    "stream_encrypt": _stream_map(_translation_kernel(_shift_rule, shift)),
+                    "stream_decrypt": _stream_map(_translation_kernel(_shift_rule, -shift)),
+                    "chunkwise": True,
                     "params": [],
                     "param_types": {},
                 }
@@ -2664,6 +3390,10 @@ def _dynamic_cipher_info(slug: str) -> Optional[dict]:
                     "description": "Fixed-rail zigzag transposition.",
                     "encrypt": lambda text, rails=rails, **kw: rail_fence_encrypt(text, rails),
                     "decrypt": lambda text, rails=rails, **kw: rail_fence_decrypt(text, rails),
+                    "stream_encrypt": lambda chunks, rails=rails, **kw: rail_fence_stream_encrypt(chunks, rails),
+                    "stream_decrypt": lambda chunks, rails=rails, **kw: rail_fence_stream_decrypt(chunks, rails),
+                    "permutation": lambda rails=rails, **kw: ("rail", int(rails)),
+                    "clean": True,
                     "params": [],
                     "param_types": {},
                 }
@@ -2677,8 +3407,11 @@ def _dynamic_cipher_info(slug: str) -> Optional[dict]:
                 return {
                     "name": f"XOR {key}",
                     "description": "Fixed-key XOR for quick obfuscation.",
-                    "encrypt": lambda text, key=key, **kw: simple_xor(text, key),
-                    "decrypt": lambda text, key=key, **kw: simple_xor(text, key),
+                    "encrypt": _translation_kernel(_xor_rule, key, clean=False),
+                    "decrypt": _translation_kernel(_xor_rule, key, clean=False),
+                    "stream_encrypt": _stream_map(_translation_kernel(_xor_rule, key, clean=False)),
+                    "stream_decrypt": _stream_map(_translation_kernel(_xor_rule, key, clean=False)),
+                    "chunkwise": True,
                     "params": [],
                     "param_types": {},
                 }
@@ -2692,8 +3425,11 @@ def _dynamic_cipher_info(slug: str) -> Optional[dict]:
                 return {
                     "name": f"Atbash + Shift {shift}",
                     "description": "Atbash followed by fixed Caesar shift.",
-                    "encrypt": lambda text, shift=shift, **kw: atbash_with_shift(text, shift),
-                    "decrypt": lambda text, shift=shift, **kw: atbash_encrypt(caesar_encrypt(text, -shift)),
+                    "encrypt": _translation_kernel(_atbash_shift_rule, shift),
+                    "decrypt": _translation_kernel(_shift_atbash_rule, -shift),
+                    "stream_encrypt": _stream_map(_translation_kernel(_atbash_shift_rule, shift)),
+                    "stream_decrypt": _stream_map(_translation_kernel(_shift_atbash_rule, -shift)),
+                    "chunkwise": True,
                     "params": [],
                     "param_types": {},
                 }
@@ -2707,6 +3443,8 @@ def _dynamic_cipher_info(slug: str) -> Optional[dict]:
                 "description": "Vigenere with a fixed key.",
                 "encrypt": lambda text, key=key, **kw: vigenere_encrypt(text, key),
                 "decrypt": lambda text, key=key, **kw: vigenere_decrypt(text, key),
+                "stream_encrypt": lambda chunks, key=key, **kw: vigenere_stream_encrypt(chunks, key),
+                "stream_decrypt": lambda chunks, key=key, **kw: vigenere_stream_decrypt(chunks, key),
                 "params": [],
                 "param_types": {},
             }
@@ -2720,6 +3458,8 @@ def _dynamic_cipher_info(slug: str) -> Optional[dict]:
                 "description": "Beaufort with a fixed key.",
                 "encrypt": lambda text, key=key, **kw: beaufort_encrypt(text, key),
                 "decrypt": lambda text, key=key, **kw: beaufort_decrypt(text, key),
+                "stream_encrypt": lambda chunks, key=key, **kw: beaufort_stream(chunks, key),
+                "stream_decrypt": lambda chunks, key=key, **kw: beaufort_stream(chunks, key),
                 "params": [],
                 "param_types": {},
             }
@@ -2727,33 +3467,434 @@ def _dynamic_cipher_info(slug: str) -> Optional[dict]:
 
     return None
 
+# ============ COMPILED REGISTRY ============
+
+@dataclass(frozen=True)
+class CipherHandle:
+    """Resolved cipher: kernels plus metadata, shared across requests"""
+    slug: str
+    name: str
+    description: str
+    encrypt: Callable[..., str]
+    decrypt: Callable[..., str]
+    params: Tuple[str, ...]
+    param_types: Mapping[str, str]
+    info: Mapping[str, Any]
+    stream_encrypt: Optional[Callable[..., Iterator[str]]] = None
+    stream_decrypt: Optional[Callable[..., Iterator[str]]] = None
+
+    @classmethod
+    def from_info(cls, slug: str, info: dict) -> "CipherHandle":
+        """Validate a registry entry and freeze it into a handle"""
+        params = tuple(info.get("params", ()))
+        param_types = dict(info.get("param_types", {}))
+        if set(params) != set(param_types):
+            raise ValueError(f"Cipher {slug} declares params {params} but types for {sorted(param_types)}")
+        param_types = MappingProxyType(param_types)
+        return cls(
+            slug=slug,
+            name=info.get("name", slug),
+            description=info.get("description", ""),
+            encrypt=info["encrypt"],
+            decrypt=info["decrypt"],
+            params=params,
+            param_types=param_types,
+            info=MappingProxyType({**info, "params": params, "param_types": param_types}),
+            stream_encrypt=info.get("stream_encrypt"),
+            stream_decrypt=info.get("stream_decrypt"),
+        )
+
+class CipherRegistry:
+    """
+    Slug resolution for built-in and dynamic ciphers.
+    Built-in handles are compiled up front; dynamic variants (caesar-N,
+    vigenere-key-*, ...) are built on first use and kept in a bounded LRU,
+    so a lookup costs one dict probe either way. Unknown slugs raise inside
+    the LRU, and lru_cache does not cache exceptions, so only hits take up
+    its slots.
+    """
+
+    def __init__(self, ciphers: Dict[str, dict], factory: Callable[[str], Optional[dict]], maxsize: int = 4096):
+        self._handles = {slug: CipherHandle.from_info(slug, info) for slug, info in ciphers.items()}
+        self._factory = factory
+        self._resolve_dynamic = lru_cache(maxsize=maxsize)(self._build_dynamic)
+
+    def _build_dynamic(self, slug: str) -> CipherHandle:
+        info = self._factory(slug)
+        if not info:
+            raise KeyError(slug)
+        return CipherHandle.from_info(slug, info)
+
+    def resolve(self, slug: str) -> Optional[CipherHandle]:
+        """Return the handle for slug, or None if no such cipher exists"""
+        handle = self._handles.get(slug)
+        if handle is None:
+            try:
+                handle = self._resolve_dynamic(slug)
+            except KeyError:
+                return None
+        return handle
+
+    def __contains__(self, slug: str) -> bool:
+        return self.resolve(slug) is not None
+
+    def cache_info(self):
+        """LRU statistics for dynamic variants"""
+        return self._resolve_dynamic.cache_info()
+
+CIPHER_REGISTRY = CipherRegistry(CLASSIC_CIPHERS, _dynamic_cipher_info)
+
+def resolve_cipher(slug: str) -> Optional[CipherHandle]:
+    """Resolve a slug to its compiled cipher handle"""
+    return CIPHER_REGISTRY.resolve(slug)
+
+def _require_cipher(slug: str) -> CipherHandle:
+    handle = CIPHER_REGISTRY.resolve(slug)
+    if handle is None:
+        raise ValueError(f"Unknown cipher: {slug}")
+    return handle
+
 def cipher_exists(slug: str) -> bool:
     """Check if a cipher slug exists"""
-    return slug in CLASSIC_CIPHERS or _dynamic_cipher_info(slug) is not None
+    return slug in CIPHER_REGISTRY
 
-def get_cipher_info(slug: str) -> dict:
+def get_cipher_info(slug: str) -> Mapping[str, Any]:
     """Get cipher metadata"""
-    if slug in CLASSIC_CIPHERS:
-        return CLASSIC_CIPHERS[slug]
-    dynamic = _dynamic_cipher_info(slug)
-    return dynamic or {}
+    handle = CIPHER_REGISTRY.resolve(slug)
+    return handle.info if handle else {}
 
 def encrypt_with_cipher(slug: str, text: str, **params) -> str:
     """Encrypt text using specified cipher"""
-    if slug in CLASSIC_CIPHERS:
-        cipher = CLASSIC_CIPHERS[slug]
-    else:
-        cipher = _dynamic_cipher_info(slug)
-        if not cipher:
-            raise ValueError(f"Unknown cipher: {slug}")
-    return cipher["encrypt"](text, **params)
+    return _require_cipher(slug).encrypt(text, **params)
 
 def decrypt_with_cipher(slug: str, text: str, **params) -> str:
     """Decrypt text using specified cipher"""
-    if slug in CLASSIC_CIPHERS:
-        cipher = CLASSIC_CIPHERS[slug]
+    return _require_cipher(slug).decrypt(text, **params)
+
+def run_cipher(action: str, slug: str, text: str, **params) -> str:
+    """Encrypt or decrypt with a cipher, on CPU_EXECUTOR for large payloads"""
+    func = decrypt_with_cipher if action == "decrypt" else encrypt_with_cipher
+    if len(text) >= CPU_EXECUTOR.offload_min_length:
+        return CPU_EXECUTOR.run(func, slug, text, **params)
+    return func(slug, text, **params)
+
+def stream_encrypt(slug: str, chunks: Iterable[str], **params) -> Iterator[str]:
+    """Encrypt an iterable of text chunks, yielding encrypted chunks"""
+    kernel = _require_cipher(slug).stream_encrypt
+    if kernel is None:
+        raise ValueError(f"Cipher does not support streaming: {slug}")
+    return kernel(chunks, **params)
+
+def stream_decrypt(slug: str, chunks: Iterable[str], **params) -> Iterator[str]:
+    """Decrypt an iterable of text chunks, yielding decrypted chunks"""
+    kernel = _require_cipher(slug).stream_decrypt
+    if kernel is None:
+        raise ValueError(f"Cipher does not support streaming: {slug}")
+    return kernel(chunks, **params)
+
+def encrypt_many(items) -> list:
+    """
+    Encrypt a batch of {"slug", "text", "params"} items.
+    Items are grouped by slug so each cipher is resolved once; items as long
+    as CPU_EXECUTOR.offload_min_length run on the CPU pool like run_cipher.
+    Results keep input order: {"ok": True, "result": ...} or {"ok": False,
+    "error": ...}. ExecutorBusy is raised rather than reported per item.
+    """
+    results = [None] * len(items)
+    groups: Dict[str, list] = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"ok": False, "error": "Item must be an object."}
+            continue
+        groups.setdefault(str(item.get("slug", "")).strip(), []).append(index)
+
+    for slug, indexes in groups.items():
+        handle = CIPHER_REGISTRY.resolve(slug)
+        for index in indexes:
+            item = items[index]
+            if handle is None:
+                results[index] = {"ok": False, "error": f"Unknown cipher: {slug}"}
+                continue
+            text = item.get("text", "")
+            params = item.get("params") or {}
+            if not isinstance(text, str) or not isinstance(params, dict):
+                results[index] = {"ok": False, "error": "Text must be a string and params an object."}
+                continue
+            try:
+                if len(text) >= CPU_EXECUTOR.offload_min_length:
+                    result = CPU_EXECUTOR.run(encrypt_with_cipher, slug, text, **params)
+                else:
+                    result = handle.encrypt(text, **params)
+                results[index] = {"ok": True, "result": result}
+            except ExecutorBusy:
+                raise
+            except Exception as e:
+                results[index] = {"ok": False, "error": str(e)}
+    return results
+
+# ============ PIPELINES ============
+# A pipeline chains registry ciphers. Each step is lowered to stages: a
+# per-character map (entries marked "chunkwise", or the uppercasing a
+# "clean" transposition does first), a permutation of positions (entries
+# with a "permutation"), or an opaque kernel. Neighbouring maps fuse into one
+# translation table and neighbouring permutations into one gather index.
+# Without kernels, maps that turn every character of the text into exactly
+# one character commute with permutations, so the chain runs as one
+# translate through all maps plus one gather through all permutations; text
+# with a character that reshapes (ß uppercases to SS) runs step by step.
+
+PIPELINE_MAX_STEPS = 16
+
+def _compose_rules(first, second):
+    """Per-character rule: first, then second over each character first produced"""
+    return lambda ch: "".join(second(c) for c in first(ch))
+
+def _upper_rule(ch: str) -> str:
+    return ch.upper()
+
+def _permutation(kind: str, arg: int, inverse: bool, length: int):
+    """Gather indices of one transposition over `length` positions (an array with NumPy, else a list)"""
+    if kind == "rail":
+        if arg < 2:
+            raise ValueError("Rails must be at least 2.")
+        rails = min(arg, max(length, 2))
+        if _np is not None and length:
+            return _zigzag_permutation(length, rails)[inverse]
+        cycle = 2 * (rails - 1)
+        order = sorted(range(length), key=lambda i: min(i % cycle, cycle - i % cycle))  # stable: by rail, then position
+    elif _np is not None:  # reverse, its own inverse
+        indices = _np.arange(length - 1, -1, -1, dtype=_np.intp)
+        indices.flags.writeable = False
+        return indices
     else:
-        cipher = _dynamic_cipher_info(slug)
-        if not cipher:
-            raise ValueError(f"Unknown cipher: {slug}")
-    return cipher["decrypt"](text, **params)
+        order = list(range(length - 1, -1, -1))
+        inverse = False
+    if inverse:
+        undo = [0] * length
+        for position, index in enumerate(order):
+            undo[index] = position
+        order = undo
+    if _np is None:
+        return order
+    indices = _np.array(order, dtype=_np.intp)
+    indices.flags.writeable = False
+    return indices
+
+def _build_fused_permutation(keys: Tuple[tuple, ...], length: int):
+    indices = None
+    for key in keys:
+        step = _permutation(*key, length)
+        if indices is None:
+            indices = step
+        else:
+            indices = indices[step] if _np is not None else [indices[i] for i in step]
+    return indices
+
+_cached_fused_permutation = lru_cache(maxsize=256)(_build_fused_permutation)
+
+def _fused_permutation(keys: Tuple[tuple, ...], length: int):
+    """Gather indices of several transpositions applied in order, cached for short texts"""
+    if length <= _PERMUTATION_CACHE_LENGTH:
+        return _cached_fused_permutation(keys, length)
+    return _build_fused_permutation(keys, length)
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """One pass over the text: a fused map, a fused permutation or an opaque kernel"""
+    kind: str  # "map", "permute" or "kernel"
+    steps: Tuple[str, ...]  # slugs of the steps folded into this pass
+    table: Optional[_TranslationTable] = None
+    permutations: Tuple[tuple, ...] = ()
+    kernel: Optional[Callable[[str], str]] = None
+
+    def run(self, text: str) -> str:
+        if self.kind == "map":
+            return text.translate(self.table)
+        if self.kind == "permute":
+            indices = _fused_permutation(self.permutations, len(text))
+            return _gather(text, indices) if _np is not None else "".join(map(text.__getitem__, indices))
+        return self.kernel(text)
+
+def _stage(kind: str, steps: Tuple[str, ...], ops: list) -> PipelineStage:
+    if kind == "map":
+        return PipelineStage(kind, steps, table=_TranslationTable(reduce(_compose_rules, ops)))
+    if kind == "permute":
+        return PipelineStage(kind, steps, permutations=tuple(ops))
+    return PipelineStage(kind, steps, kernel=ops[0])
+
+def _fuse(ops: list) -> Tuple[PipelineStage, ...]:
+    """Merge runs of maps and runs of permutations; kernels stay one pass each"""
+    runs = []
+    for kind, slug, op in ops:
+        if runs and runs[-1][0] == kind and kind != "kernel":
+            runs[-1][1].append(slug)
+            runs[-1][2].append(op)
+        else:
+            runs.append((kind, [slug], [op]))
+    return tuple(_stage(kind, tuple(slugs), run_ops) for kind, slugs, run_ops in runs)
+
+def _commuted(ops: list) -> Optional[Tuple[PipelineStage, ...]]:
+    """Every map, then every permutation; None when a kernel pins the order"""
+    if any(kind == "kernel" for kind, _, _ in ops):
+        return None
+    stages = []
+    for kind in ("map", "permute"):
+        runs = [(slug, op) for op_kind, slug, op in ops if op_kind == kind]
+        if runs:
+            stages.append(_stage(kind, tuple(slug for slug, _ in runs), [op for _, op in runs]))
+    return tuple(stages)
+
+def _run_stages(stages, text: str) -> str:
+    for stage in stages:
+        text = stage.run(text)
+    return text
+
+@dataclass(frozen=True)
+class PipelinePass:
+    """One direction of a compiled pipeline"""
+    stages: Tuple[PipelineStage, ...]  # fused, in chain order
+    unfused: Tuple[PipelineStage, ...]  # one kernel per step
+    commuted: Optional[Tuple[PipelineStage, ...]] = None
+    ascii_exact: bool = False  # the commuted map turns each ASCII character into one
+
+    @classmethod
+    def from_ops(cls, ops: list, unfused: list) -> "PipelinePass":
+        commuted = _commuted(ops)
+        table = commuted[0].table if commuted and commuted[0].kind == "map" else {}
+        ascii_exact = commuted is not None and all(len(value) == 1 for value in table.values())
+        return cls(_fuse(ops), tuple(unfused), commuted, ascii_exact)
+
+    def _reshaped(self, text: str) -> bool:
+        """Whether the commuted map is known to turn a character of text into zero or several"""
+        table = self.commuted[0].table if self.commuted[0].kind == "map" else {}
+        return any(len(value) != 1 and chr(code) in text for code, value in list(table.items()))
+
+    def run(self, text: str) -> str:
+        if self.commuted is None:
+            return _run_stages(self.stages, text)
+        exact = self.ascii_exact and text.isascii()
+        if exact or not self._reshaped(text):
+            out = self.commuted[0].run(text)
+            # Characters first seen by this translate may be the first to reshape
+            if exact or self.commuted[0].kind != "map" or not self._reshaped(text):
+                return _run_stages(self.commuted[1:], out)
+        # Later positions shift; each step's own kernel (str.upper, then ASCII tables) is also the faster route
+        return _run_stages(self.unfused, text)
+
+    def describe(self) -> dict:
+        """Passes in chain order, and the two passes used when maps keep every character one long"""
+        def passes(stages):
+            return [{"kind": stage.kind, "steps": list(stage.steps)} for stage in stages]
+        return {
+            "passes": passes(self.stages),
+            "fused_passes": passes(self.commuted) if self.commuted is not None else None,
+        }
+
+def _lower_step(handle: CipherHandle, params: dict, decrypt: bool) -> list:
+    """(kind, slug, op) stages of one step: a rule for maps, a permutation key, or a kernel"""
+    kernel = handle.decrypt if decrypt else handle.encrypt
+    if handle.info.get("chunkwise"):
+        return [("map", handle.slug, lambda ch: kernel(ch, **params))]
+    permutation = handle.info.get("permutation")
+    if permutation:
+        ops = [("map", handle.slug, _upper_rule)] if handle.info.get("clean") else []
+        return ops + [("permute", handle.slug, (*permutation(**params), decrypt))]
+    return [("kernel", handle.slug, lambda text: kernel(text, **params))]
+
+def _kernel_stage(handle: CipherHandle, params: dict, decrypt: bool) -> PipelineStage:
+    """The whole step as one opaque pass"""
+    kernel = handle.decrypt if decrypt else handle.encrypt
+    return PipelineStage("kernel", (handle.slug,), kernel=lambda text: kernel(text, **params))
+
+@dataclass(frozen=True)
+class Pipeline:
+    """A compiled chain of (slug, params) steps; decrypt runs the inverses in reverse order"""
+    steps: Tuple[Tuple[str, Mapping[str, Any]], ...]
+    encrypt_pass: PipelinePass
+    decrypt_pass: Optional[PipelinePass]  # None when a step has no decrypt
+    irreversible: Tuple[str, ...] = ()
+
+    def encrypt(self, text: str) -> str:
+        return self.encrypt_pass.run(text)
+
+    def decrypt(self, text: str) -> str:
+        if self.decrypt_pass is None:
+            raise ValueError(f"Pipeline cannot be decrypted: no decrypt for {', '.join(self.irreversible)}.")
+        return self.decrypt_pass.run(text)
+
+    def describe(self) -> dict:
+        return {
+            "steps": [{"slug": slug, "params": dict(params)} for slug, params in self.steps],
+            "encrypt": self.encrypt_pass.describe(),
+            "decrypt": self.decrypt_pass.describe() if self.decrypt_pass is not None else None,
+        }
+
+def _decrypts(handle: CipherHandle, params: dict) -> bool:
+    """Whether a step can be inverted; kernels without a decrypt return a placeholder even for empty text"""
+    if handle.info.get("chunkwise") or handle.info.get("permutation"):
+        return True
+    return handle.decrypt("", **params) == ""
+
+def _pipeline_steps(steps) -> list:
+    """Validate steps given as a list (or its JSON) of {"slug", "params"} objects or [slug, params] pairs"""
+    if isinstance(steps, str):
+        try:
+            steps = json.loads(steps)
+        except json.JSONDecodeError:
+            raise ValueError("Steps must be a JSON list.")
+    if not isinstance(steps, (list, tuple)) or not steps:
+        raise ValueError("Steps must be a non-empty list.")
+    if len(steps) > PIPELINE_MAX_STEPS:
+        raise ValueError(f"A pipeline is limited to {PIPELINE_MAX_STEPS} steps.")
+    parsed = []
+    for step in steps:
+        if isinstance(step, dict):
+            slug, params = step.get("slug"), step.get("params") or {}
+        elif isinstance(step, (list, tuple)) and len(step) == 2:
+            slug, params = step
+        else:
+            raise ValueError('Each step must be {"slug", "params"} or [slug, params].')
+        if not isinstance(slug, str) or not isinstance(params, dict):
+            raise ValueError("Step slugs must be strings and params objects.")
+        if slug.strip() == "pipeline":
+            raise ValueError("Pipelines cannot be nested.")
+        parsed.append([slug.strip(), params])
+    return parsed
+
+@lru_cache(maxsize=256)
+def _compile_pipeline(key: str) -> Pipeline:
+    steps, irreversible = [], []
+    encrypt_ops, decrypt_ops = [], []
+    encrypt_kernels, decrypt_kernels = [], []
+    for index, (slug, params) in enumerate(json.loads(key), 1):
+        handle = _require_cipher(slug)
+        try:
+            handle.encrypt("A", **params)  # surface parameter errors at compile time; "" skips most checks
+            encrypt_ops += _lower_step(handle, params, decrypt=False)
+            encrypt_kernels.append(_kernel_stage(handle, params, decrypt=False))
+            if _decrypts(handle, params):
+                decrypt_ops[:0] = _lower_step(handle, params, decrypt=True)
+                decrypt_kernels.insert(0, _kernel_stage(handle, params, decrypt=True))
+            else:
+                irreversible.append(slug)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Step {index} ({slug}): {e}")
+        steps.append((slug, MappingProxyType(params)))
+    return Pipeline(
+        steps=tuple(steps),
+        encrypt_pass=PipelinePass.from_ops(encrypt_ops, encrypt_kernels),
+        decrypt_pass=None if irreversible else PipelinePass.from_ops(decrypt_ops, decrypt_kernels),
+        irreversible=tuple(irreversible),
+    )
+
+def compile_pipeline(steps) -> Pipeline:
+    """Compile a chain of cipher steps; equal chains share one compiled pipeline"""
+    return _compile_pipeline(json.dumps(_pipeline_steps(steps), sort_keys=True))
+
+def pipeline_encrypt(text: str, steps=None, **kw) -> str:
+    """Run every step's encrypt in order"""
+    return compile_pipeline(steps).encrypt(text)
+
+def pipeline_decrypt(text: str, steps=None, **kw) -> str:
+    """Run every step's decrypt in reverse order"""
+    return compile_pipeline(steps).decrypt(text)
@@ -0,0 +1,127 @@
+"""
+Cached identity layer for Flask-Login.
+The user loader returns an immutable Identity snapshot (account flags and
+cookie preferences) held in a short-TTL LRU, memoized per request in flask.g,
+so an ordinary page does not query users and cookie_preferences.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from flask import g
+from flask_login import UserMixin
+
+from models import db, User, CookiePreference
+
+@dataclass(frozen=True, eq=False)
+class Identity(UserMixin):
+    """What a request needs to know about the logged-in user"""
+    id: int
+    username: str
+    is_admin: bool
+    admin_level: str
+    last_seen_at: Optional[datetime]
+    cookie_prefs: Optional[Tuple[Tuple[str, Any], ...]]
+
+    @classmethod
+    def load(cls, user_id) -> Optional["Identity"]:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        pref = CookiePreference.query.filter_by(user_id=user.id).order_by(
+            CookiePreference.updated_at.desc()
+        ).first()
+        cookie_prefs = None
+        if pref:
+            cookie_prefs = (
+                ("choice", pref.choice),
+                ("essential", bool(pref.essential)),
+                ("functional", bool(pref.functional)),
+                ("analytics", bool(pref.analytics)),
+                ("marketing", bool(pref.marketing)),
+            )
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_admin=bool(user.is_admin),
+            admin_level=user.admin_level or "standard",
+            last_seen_at=user.last_seen_at,
+            cookie_prefs=cookie_prefs,
+        )
+
+    @property
+    def cookie_pref_payload(self):
+        return dict(self.cookie_prefs) if self.cookie_prefs else None
+
+class IdentityCache:
+    """
+    Flask extension: TTL + LRU cache of Identity snapshots. Invalidation is
+    per process, so other web workers may serve a changed account for up to
+    IDENTITY_CACHE_TTL seconds; keep the TTL short.
+    """
+
+    def __init__(self, app=None):
+        self.maxsize = 1024
+        self.ttl = 15.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("IDENTITY_CACHE_SIZE", 1024)
+        app.config.setdefault("IDENTITY_CACHE_TTL", 15)
+        self.maxsize = int(app.config["IDENTITY_CACHE_SIZE"])
+        self.ttl = float(app.config["IDENTITY_CACHE_TTL"])
+        app.extensions["identity_cache"] = self
+
+    def get(self, user_id) -> Optional[Identity]:
+        """Identity for user_id, from this request, the cache, or the database"""
+        memo = g.setdefault("_identities", {})
+        if user_id in memo:
+            return memo[user_id]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                memo[user_id] = entry[1]
+                return entry[1]
+            self.misses += 1
+        identity = Identity.load(user_id)
+        if identity is not None and self.maxsize > 0 and self.ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, identity)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        memo[user_id] = identity
+        return identity
+
+    def invalidate(self, user_id):
+        """Drop a user's snapshot after their account or preferences change"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+        g.pop("_identities", None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+identity_cache = IdentityCache()
@@ -0,0 +1,183 @@
+"""
+Buffered activity log writer.
+Requests enqueue ActivityLog rows on a bounded in-process queue; a background
+thread bulk-inserts them every ACTIVITY_LOG_BATCH_SIZE rows or
+ACTIVITY_LOG_FLUSH_MS milliseconds, so request latency does not depend on a
+database commit. Batch hooks (e.g. usage rollups) run in the same transaction.
+A batch that fails is retried row by row, so one bad row costs only itself.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from models import db, ActivityLog
+
+_COLUMNS = frozenset(ActivityLog.__table__.columns.keys())
+# String column sizes; submitted values are truncated to fit
+_LENGTHS = {column.name: column.type.length for column in ActivityLog.__table__.columns
+            if getattr(column.type, "length", None)}
+
+class ActivityLogWriter:
+    """Flask extension: buffered, batched ActivityLog inserts"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._thread_pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.async_enabled = True
+        self.batch_size = 500
+        self.flush_interval = 0.5
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._hooks = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("ACTIVITY_LOG_ASYNC", True)
+        app.config.setdefault("ACTIVITY_LOG_QUEUE_SIZE", 10000)
+        app.config.setdefault("ACTIVITY_LOG_BATCH_SIZE", 500)
+        app.config.setdefault("ACTIVITY_LOG_FLUSH_MS", 500)
+        self.app = app
+        self.async_enabled = app.config["ACTIVITY_LOG_ASYNC"]
+        self.batch_size = max(int(app.config["ACTIVITY_LOG_BATCH_SIZE"]), 1)
+        self.flush_interval = max(int(app.config["ACTIVITY_LOG_FLUSH_MS"]), 1) / 1000
+        self._queue = queue.Queue(maxsize=int(app.config["ACTIVITY_LOG_QUEUE_SIZE"]))
+        app.extensions["activity_log_writer"] = self
+        atexit.register(self.shutdown)
+
+    def add_batch_hook(self, hook):
+        """
+        Call hook(rows) inside each batch's transaction, before the commit.
+        Rows are the submitted dicts, including keys that are not ActivityLog
+        columns (such as latency_ms).
+        """
+        if hook not in self._hooks:
+            self._hooks.append(hook)
+
+    def submit(self, **row):
+        """
+        Queue one ActivityLog row (column name -> value, plus any extra keys
+        for batch hooks). Returns False when the queue is full and the row
+        was dropped.
+        """
+        row.setdefault("timestamp", datetime.utcnow())
+        for name, length in _LENGTHS.items():
+            if isinstance(row.get(name), str) and len(row[name]) > length:
+                row[name] = row[name][:length]
+        if not self.async_enabled:
+            self._write([row])
+            return True
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def _ensure_thread(self):
+        # Started lazily and per process, so forked web workers each get one.
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _collect(self):
+        """Block for the first row, then gather up to batch_size rows or until the interval ends"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, rows):
+        """Insert rows with a single executemany; if that fails, insert them one at a time"""
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(ActivityLog), [{k: v for k, v in row.items() if k in _COLUMNS} for row in rows])
+                for hook in self._hooks:
+                    hook(rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                if len(rows) > 1:
+                    for row in rows:
+                        self._write([row])
+                    return
+                with self._lock:
+                    self.failed += len(rows)
+                self.app.logger.exception("Failed to write an activity log row")
+                return
+        with self._lock:
+            self.flushed += len(rows)
+            self.batches += 1
+
+    def flush(self):
+        """Write everything queued so far from the calling thread"""
+        if self._queue is not None:
+            self._drain()
+
+    def shutdown(self, timeout=5.0):
+        """Stop the background thread and write whatever is still queued"""
+        self._stop.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def stats(self):
+        return {
+            "async": self.async_enabled,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+activity_log_writer = ActivityLogWriter()
@@ -23,10 +23,17 @@ class User(UserMixin, db.Model):
     last_login_at = db.Column(db.DateTime)
     last_login_ip = db.Column(db.String(80), default="")
     last_login_user_agent = db.Column(db.String(300), default="")
-    last_seen_at = db.Column(db.DateTime)
+    last_seen_at = db.Column(db.DateTime, index=True)  # online-users window
     last_seen_ip = db.Column(db.String(80), default="")
     last_seen_user_agent = db.Column(db.String(300), default="")
     
+    # (created_at, id) serves the admin user list's keyset pagination; (is_admin, ...) the admin roster
+    __table_args__ = (
+        db.Index("ix_users_created_at_id", "created_at", "id"),
+        db.Index("ix_users_is_admin_username", "is_admin", "username"),
+        db.Index("ix_users_is_admin_level", "is_admin", "admin_level"),
+    )
+    
     # Relationships
     custom_ciphers = db.relationship("CustomCipher", backref="creator", lazy=True, cascade="all, delete-orphan")
     activity_logs = db.relationship("ActivityLog", backref="user", lazy=True, cascade="all, delete-orphan")
@@ -57,6 +64,11 @@ class CipherDefinition(db.Model):
     default_params = db.Column(db.Text, default="")  # JSON params for alias ciphers
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index("ix_cipher_definitions_name_id", "name", "id"),
+        db.Index("ix_cipher_definitions_supported_name", "supported", "name"),
+    )
+    
     def __repr__(self):
         return f"<CipherDefinition {self.name}>"
 
@@ -94,6 +106,11 @@ class ActivityLog(db.Model):
     meta = db.Column(db.Text, default="")  # JSON string
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
+    __table_args__ = (
+        db.Index("ix_activity_logs_timestamp_id", "timestamp", "id"),
+        db.Index("ix_activity_logs_user_timestamp", "user_id", "timestamp"),
+    )
+    
     def __repr__(self):
         return f"<ActivityLog {self.action} by {self.user_id}>"
 
@@ -108,6 +125,8 @@ class AdminLog(db.Model):
     details = db.Column(db.Text, default="")
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
+    __table_args__ = (db.Index("ix_admin_logs_timestamp_id", "timestamp", "id"),)
+    
     def __repr__(self):
         return f"<AdminLog {self.action}>"
 
@@ -117,7 +136,7 @@ class CookiePreference(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
-    anon_id = db.Column(db.String(64), default="", index=True)
+    anon_id = db.Column(db.String(64), default="")  # indexed by ix_cookie_preferences_anon_updated
     choice = db.Column(db.String(20), default="custom")  # accepted, custom
     essential = db.Column(db.Boolean, default=True)
     functional = db.Column(db.Boolean, default=False)
@@ -127,3 +146,42 @@ class CookiePreference(db.Model):
     user_agent = db.Column(db.String(300), default="")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index("ix_cookie_preferences_updated_at_id", "updated_at", "id"),
+        db.Index("ix_cookie_preferences_user_updated", "user_id", "updated_at"),
+        db.Index("ix_cookie_preferences_anon_updated", "anon_id", "updated_at"),
+    )
+
+class UsageRollup(db.Model):
+    """Hourly activity counters per cipher and action, maintained as logs are written"""
+    __tablename__ = "usage_rollups"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)  # UTC, truncated to the hour
+    cipher_name = db.Column(db.String(80), nullable=False)
+    action = db.Column(db.String(30), nullable=False)
+    success_count = db.Column(db.Integer, default=0, nullable=False)
+    failure_count = db.Column(db.Integer, default=0, nullable=False)
+    input_length_sum = db.Column(db.BigInteger, default=0, nullable=False)  # sum of ActivityLog.input_length
+    latency_ms_sum = db.Column(db.Float, default=0.0, nullable=False)
+    latency_count = db.Column(db.Integer, default=0, nullable=False)  # events that carried a latency
+    
+    __table_args__ = (
+        db.UniqueConstraint("hour", "cipher_name", "action", name="uq_usage_rollup_bucket"),
+        db.Index("ix_usage_rollups_cipher_hour", "cipher_name", "hour"),
+    )
+    
+    def __repr__(self):
+        return f"<UsageRollup {self.cipher_name} {self.action} {self.hour}>"
+
+class AppMeta(db.Model):
+    """Key/value facts about the database itself (e.g. the seeded catalog fingerprint)"""
+    __tablename__ = "app_meta"
+    
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Text, default="")
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<AppMeta {self.key}>"
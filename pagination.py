@@ -0,0 +1,80 @@
+"""
+Keyset (seek) pagination.
+A page is fetched with `WHERE (k1, k2) < (last k1, last k2) ORDER BY k1 DESC,
+k2 DESC LIMIT n`, which an index on (k1, k2) serves directly, so deep pages
+cost the same as the first one (unlike OFFSET). The position of the last row
+travels to the client as an opaque cursor. NULLs in a nullable key column
+sort after every value, in either direction.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was tampered with or belongs to another listing"""
+
+def encode_cursor(values) -> str:
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, columns=None) -> list:
+    """Cursor values, converted to the columns' Python types when columns are given"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor.")
+    if not isinstance(values, list) or (columns is not None and len(values) != len(columns)):
+        raise InvalidCursor("Invalid cursor.")
+    if columns is not None:
+        values = [_cursor_value(column, v) for column, v in zip(columns, values)]
+    return values
+
+def _cursor_value(column, value):
+    if value is None:
+        if column.nullable:
+            return None
+        raise InvalidCursor("Invalid cursor.")
+    python_type = column.type.python_type
+    if python_type is datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise InvalidCursor("Invalid cursor.")
+    if not isinstance(value, python_type) or isinstance(value, bool) and python_type is not bool:
+        raise InvalidCursor("Invalid cursor.")
+    return value
+
+def after(columns, values, descending=True):
+    """Rows strictly after `values` in keyset_order(columns) order, written without row-value syntax"""
+    clauses = []
+    for i, column in enumerate(columns):
+        if values[i] is None:
+            continue  # NULLs sort last, so no row is past one in this column
+        prefix = [columns[j].is_(None) if values[j] is None else columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        if column.nullable:
+            step = or_(step, column.is_(None))
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+def keyset_order(columns, descending=True):
+    """ORDER BY terms matching after(): nullable columns put their NULLs last"""
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return [term.nulls_last() if column.nullable else term for column, term in zip(columns, order)]
+
+def seek(query, columns, key, cursor=None, limit=50, descending=True):
+    """
+    One keyset page of `query` ordered by `columns` (the last one must be
+    unique, e.g. the primary key). `key(row)` returns a row's values for
+    those columns. Returns (rows, next cursor or None).
+    """
+    if cursor:
+        query = query.filter(after(columns, decode_cursor(cursor, columns), descending))
+    rows = query.order_by(*keyset_order(columns, descending)).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,188 @@
+"""
+Write-behind presence tracking.
+Each authenticated request updates an in-memory last-seen map; a background
+thread writes the changed entries back to the users table every
+PRESENCE_FLUSH_SECONDS with a single executemany UPDATE. The UPDATE is a
+Core statement, so a user deleted in the meantime matches no row instead of
+failing the whole batch.
+"""
+
+import atexit
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, update
+
+from models import db, User
+
+# Entries not seen for this long are dropped from the in-memory map
+_RETAIN = timedelta(days=1)
+
+_users = User.__table__
+_WRITE_PRESENCE = update(_users).where(_users.c.id == bindparam("user_id")).values(
+    last_seen_at=bindparam("seen_at"),
+    last_seen_ip=bindparam("ip"),
+    last_seen_user_agent=bindparam("user_agent"),
+)
+
+@dataclass(frozen=True)
+class Presence:
+    seen_at: datetime
+    ip: str
+    user_agent: str
+
+class PresenceTracker:
+    """Flask extension: in-memory last-seen map with periodic write-behind"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._seen = {}
+        self._written = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._snapshot = None
+        self._snapshot_at = None
+        self.async_enabled = True
+        self.flush_interval = 60.0
+        self.flushed = 0
+        self.failed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PRESENCE_ASYNC", True)
+        app.config.setdefault("PRESENCE_FLUSH_SECONDS", 60)
+        self.app = app
+        self.async_enabled = app.config["PRESENCE_ASYNC"]
+        self.flush_interval = max(float(app.config["PRESENCE_FLUSH_SECONDS"]), 1.0)
+        app.extensions["presence_tracker"] = self
+        atexit.register(self.shutdown)
+
+    def touch(self, user_id, ip="", user_agent="", persisted_at=None):
+        """
+        Record that a user was just seen. persisted_at is the last_seen_at
+        already stored on the row; when it is recent the row is not rewritten.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            self._seen[user_id] = Presence(now, ip, user_agent)
+            if user_id in self._dirty:
+                return
+            last_write = self._written.get(user_id, persisted_at)
+            if last_write and (now - last_write).total_seconds() < self.flush_interval:
+                return
+            self._dirty.add(user_id)
+        if self.async_enabled:
+            self._ensure_thread()
+        else:
+            self.flush()
+
+    def _ensure_thread(self):
+        # Started lazily and per process, so forked web workers each get one.
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="presence-flusher", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write every changed entry back to the users table; on failure the entries stay pending"""
+        with self._lock:
+            rows, previous = [], {}
+            for user_id in self._dirty:
+                presence = self._seen[user_id]
+                previous[user_id] = self._written.get(user_id)
+                self._written[user_id] = presence.seen_at
+                rows.append({
+                    "user_id": user_id,
+                    "seen_at": presence.seen_at,
+                    "ip": presence.ip,
+                    "user_agent": presence.user_agent,
+                })
+            self._dirty.clear()
+            self._prune(datetime.utcnow() - _RETAIN)
+        if not rows:
+            return
+        with self.app.app_context():
+            try:
+                # A list of parameter sets makes this one executemany UPDATE.
+                db.session.execute(_WRITE_PRESENCE, rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                with self._lock:
+                    self.failed += len(rows)
+                    for user_id, written in previous.items():
+                        if user_id not in self._seen:
+                            continue  # forgotten meanwhile
+                        if written is None:
+                            self._written.pop(user_id, None)
+                        else:
+                            self._written[user_id] = written
+                        self._dirty.add(user_id)
+                self.app.logger.exception("Failed to write presence for %d users", len(rows))
+                return
+        with self._lock:
+            self.flushed += len(rows)
+
+    def forget(self, user_id):
+        """Drop a user, e.g. one whose account was deleted"""
+        with self._lock:
+            self._seen.pop(user_id, None)
+            self._written.pop(user_id, None)
+            self._dirty.discard(user_id)
+
+    def _prune(self, cutoff):
+        for user_id in [uid for uid, presence in self._seen.items() if presence.seen_at < cutoff]:
+            del self._seen[user_id]
+            self._written.pop(user_id, None)
+
+    def online(self, since):
+        """
+        (user_id, last seen) pairs seen after `since`, newest first. This
+        process's own map is merged over a users-table snapshot refreshed at
+        most once per flush interval, which covers the other web workers.
+        """
+        now = datetime.utcnow()
+        if self._snapshot is None or now - self._snapshot_at >= timedelta(seconds=self.flush_interval):
+            self._snapshot = dict(
+                db.session.query(User.id, User.last_seen_at).filter(User.last_seen_at >= since).all()
+            )
+            self._snapshot_at = now
+        seen = {user_id: at for user_id, at in self._snapshot.items() if at >= since}
+        with self._lock:
+            for user_id, presence in self._seen.items():
+                if presence.seen_at >= since and presence.seen_at > seen.get(user_id, since):
+                    seen[user_id] = presence.seen_at
+        return sorted(seen.items(), key=lambda item: item[1], reverse=True)
+
+    def shutdown(self, timeout=5.0):
+        """Stop the flusher and write whatever is still pending"""
+        self._stop.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def stats(self):
+        return {
+            "async": self.async_enabled,
+            "tracked": len(self._seen),
+            "pending": len(self._dirty),
+            "flushed": self.flushed,
+            "failed": self.failed,
+        }
+
+presence_tracker = PresenceTracker()
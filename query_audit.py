@@ -0,0 +1,160 @@
+"""
+Query plan audit.
+AUDIT_QUERIES mirrors the hot ORM queries behind each route. `audit()` runs
+EXPLAIN for every one of them against the configured database (SQLite, or
+a Postgres stand-in via DATABASE_URL) and flags plan steps that read a
+whole table: table scans, unbounded index walks and sorts. A missing
+index therefore shows up before the table is large enough to hurt.
+`flask --app app db audit` exits non-zero when a query has a flagged step
+it does not expect.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from sqlalchemy import func, select
+
+from models import db, User, CipherDefinition, CustomCipher, ActivityLog, AdminLog, CookiePreference, UsageRollup
+from pagination import after, keyset_order
+
+@dataclass(frozen=True)
+class AuditQuery:
+    route: str
+    name: str
+    build: Callable
+    # Keyset pages walk an index in order and stop at LIMIT, which is fine
+    walk: bool = False
+    # Why whole-table steps are inherent to this query (e.g. an unanchored LIKE)
+    expected: str = ""
+
+def _recent():
+    return datetime.utcnow() - timedelta(minutes=15)
+
+def _keyset(columns):
+    return after(columns, [datetime.utcnow(), 1])
+
+def _keyset_page(query, columns):
+    """query as seek() runs it for a page after a cursor"""
+    return query.where(_keyset(columns)).order_by(*keyset_order(columns)).limit(51)
+
+AUDIT_QUERIES = (
+    AuditQuery("login", "user by username", lambda: select(User).where(User.username == "alice").limit(1)),
+    AuditQuery("register", "user by email", lambda: select(User).where(User.email == "a@x.io").limit(1)),
+    AuditQuery("oauth_callback", "user by provider id", lambda: select(User).where(
+        User.oauth_provider == "github", User.oauth_id == "1").limit(1)),
+    AuditQuery("dashboard", "custom ciphers", lambda: select(CustomCipher).where(CustomCipher.user_id == 1)),
+    AuditQuery("dashboard", "supported ciphers", lambda: select(CipherDefinition).where(
+        CipherDefinition.supported == True).order_by(CipherDefinition.name)),  # noqa: E712
+    AuditQuery("dashboard", "recent activity", lambda: select(ActivityLog).where(
+        ActivityLog.user_id == 1).order_by(ActivityLog.timestamp.desc()).limit(10)),
+    AuditQuery("api_encrypt", "custom cipher", lambda: select(CustomCipher).where(
+        CustomCipher.id == 1, CustomCipher.user_id == 1).limit(1)),
+    AuditQuery("api_encrypt", "cipher by slug", lambda: select(CipherDefinition).where(
+        CipherDefinition.slug == "caesar").limit(1)),
+    AuditQuery("cookie_consent", "latest preference (user)", lambda: select(CookiePreference).where(
+        CookiePreference.user_id == 1).order_by(CookiePreference.updated_at.desc()).limit(1)),
+    AuditQuery("cookie_consent", "latest preference (anonymous)", lambda: select(CookiePreference).where(
+        CookiePreference.anon_id == "0" * 32).order_by(CookiePreference.updated_at.desc()).limit(1)),
+    AuditQuery("admin_dashboard", "user count", lambda: select(func.count(User.id)),
+               expected="counts every row"),
+    AuditQuery("admin_dashboard", "admin users", lambda: select(User).where(
+        User.is_admin == True).order_by(User.username)),  # noqa: E712
+    AuditQuery("admin_dashboard", "standard admin count", lambda: select(func.count(User.id)).where(
+        User.is_admin == True, User.admin_level == "standard")),  # noqa: E712
+    AuditQuery("admin_dashboard", "online users", lambda: select(User.id, User.last_seen_at).where(
+        User.last_seen_at >= _recent())),
+    AuditQuery("admin_dashboard", "usage by cipher", lambda: select(
+        UsageRollup.cipher_name, func.sum(UsageRollup.success_count)).group_by(UsageRollup.cipher_name),
+               expected="all-time totals read every rollup row"),
+    AuditQuery("admin_api_users", "users page", lambda: _keyset_page(select(User), (User.created_at, User.id)), walk=True),
+    AuditQuery("admin_api_users", "users search", lambda: select(User).where(
+        User.username.ilike("%al%") | User.email.ilike("%al%")).order_by(*keyset_order((User.created_at, User.id))).limit(51),
+               expected="substring search cannot use a b-tree index"),
+    AuditQuery("admin_api_users", "page preferences", lambda: select(CookiePreference).where(
+        CookiePreference.user_id.in_([1, 2, 3])).order_by(CookiePreference.updated_at.desc()),
+               expected="sorts only the preferences of one page of users"),
+    AuditQuery("admin_api_activity", "activity page", lambda: _keyset_page(select(ActivityLog, User.username).join(
+        User, User.id == ActivityLog.user_id), (ActivityLog.timestamp, ActivityLog.id)), walk=True),
+    AuditQuery("admin_api_admin_logs", "admin log page", lambda: _keyset_page(select(AdminLog), (AdminLog.timestamp, AdminLog.id)), walk=True),
+    AuditQuery("admin_api_cookie_prefs", "preference page", lambda: _keyset_page(select(CookiePreference), (CookiePreference.updated_at, CookiePreference.id)), walk=True),
+    AuditQuery("admin_api_catalog", "persisted ciphers page", lambda: select(CipherDefinition).where(
+        after((CipherDefinition.name, CipherDefinition.id), ["m", 1], descending=False)).order_by(
+        CipherDefinition.name, CipherDefinition.id).limit(51), walk=True),
+    AuditQuery("admin_api_usage", "usage window", lambda: select(
+        UsageRollup.cipher_name, func.sum(UsageRollup.success_count)).where(
+        UsageRollup.hour >= _recent()).group_by(UsageRollup.cipher_name),
+               expected="SQLite walks (cipher_name, hour) until ANALYZE has statistics, then skip-scans on hour"),
+    AuditQuery("admin_api_usage", "usage for one cipher", lambda: select(
+        UsageRollup.hour, func.sum(UsageRollup.success_count)).where(
+        UsageRollup.cipher_name == "caesar", UsageRollup.hour >= _recent()).group_by(UsageRollup.hour)),
+    AuditQuery("admin_user_detail", "user activity", lambda: select(ActivityLog).where(
+        ActivityLog.user_id == 1).order_by(ActivityLog.timestamp.desc()).limit(100)),
+    AuditQuery("admin_user_detail", "user preference", lambda: select(CookiePreference).where(
+        CookiePreference.user_id == 1).order_by(CookiePreference.updated_at.desc()).limit(1)),
+    AuditQuery("logs archive", "oldest activity log", lambda: select(func.min(ActivityLog.timestamp))),
+    AuditQuery("logs archive", "activity month", lambda: select(ActivityLog).where(
+        ActivityLog.timestamp >= _recent(), ActivityLog.timestamp < datetime.utcnow()).order_by(
+        ActivityLog.timestamp, ActivityLog.id).limit(2000)),
+)
+
+def explain(stmt) -> List[str]:
+    """The database's plan for stmt, one line per plan step"""
+    compiled = stmt.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup) if compiled.positional else compiled.params
+    connection = db.session.connection()
+    if db.engine.dialect.name == "postgresql":
+        # Make the planner prefer any usable index even on tiny tables; a Seq Scan then means none fits.
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), params).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return list(_postgres_nodes(plan[0]["Plan"]))
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    return [row[-1] for row in rows]
+
+def _postgres_nodes(node, depth=0):
+    relation = f" on {node['Relation Name']}" if "Relation Name" in node else ""
+    index = f" using {node['Index Name']}" if "Index Name" in node else ""
+    bounded = " [bounded]" if "Index Cond" in node else ""
+    yield f"{'  ' * depth}{node['Node Type']}{relation}{index}{bounded}"
+    for child in node.get("Plans", ()):
+        yield from _postgres_nodes(child, depth + 1)
+
+def flagged_steps(plan: List[str]) -> List[tuple]:
+    """(kind, step) for each step that reads a whole table: a table scan, an index walk or a sort"""
+    flagged = []
+    for step in plan:
+        text = step.strip()
+        if text.startswith("Seq Scan") or (
+            text.startswith("SCAN ") and " INDEX " not in f"{text} " and "VIRTUAL TABLE" not in text
+            and not text.startswith("SCAN CONSTANT ROW")
+        ):
+            flagged.append(("table scan", text))
+        elif text.startswith("SCAN ") or (text.startswith(("Index Scan", "Index Only Scan")) and "[bounded]" not in text):
+            flagged.append(("index walk", text))
+        elif text.startswith("USE TEMP B-TREE") or text.startswith(("Sort", "Incremental Sort")):
+            flagged.append(("sort", text))
+    return flagged
+
+def audit(queries=AUDIT_QUERIES) -> List[dict]:
+    """EXPLAIN every audit query; "ok" is False when it has a whole-table step it does not expect"""
+    results = []
+    try:
+        for query in queries:
+            plan = explain(query.build())
+            flagged = flagged_steps(plan)
+            unexpected = [] if query.expected else [
+                step for kind, step in flagged if not (query.walk and kind == "index walk")
+            ]
+            results.append({
+                "route": query.route,
+                "name": query.name,
+                "plan": plan,
+                "flagged": flagged,
+                "ok": not unexpected,
+                "expected": query.expected,
+            })
+    finally:
+        db.session.rollback()
+    return results
@@ -0,0 +1,209 @@
+"""
+Log retention and archival.
+ActivityLog and AdminLog rows are bucketed by calendar month (UTC). Once a
+whole month is older than its table's retention window, it is streamed in
+(timestamp, id) order to gzip-compressed JSONL under
+LOG_ARCHIVE_DIR/<table>/<YYYY-MM>.<part>.jsonl.gz and then deleted in
+bounded batches, so the live tables and their indexes only hold recent
+months. Archived months stay queryable by streaming the files.
+"""
+
+import glob
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from models import db, ActivityLog, AdminLog
+from pagination import after
+
+# table name -> (model, retention config key)
+POLICIES = {
+    "activity_logs": (ActivityLog, "ACTIVITY_LOG_RETENTION_DAYS"),
+    "admin_logs": (AdminLog, "ADMIN_LOG_RETENTION_DAYS"),
+}
+
+def _month_start(ts):
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+def _encode(row):
+    return json.dumps(
+        {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()},
+        separators=(",", ":"),
+    )
+
+class LogRetention:
+    """Flask extension: archive expired log months to compressed files and prune them"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.archive_dir = None
+        self.batch_size = 2000
+        self.last_run = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("ACTIVITY_LOG_RETENTION_DAYS", 90)
+        app.config.setdefault("ADMIN_LOG_RETENTION_DAYS", 365)
+        app.config.setdefault("LOG_ARCHIVE_DIR", os.path.join(app.instance_path, "log_archive"))
+        app.config.setdefault("LOG_RETENTION_BATCH_SIZE", 2000)
+        self.app = app
+        self.archive_dir = app.config["LOG_ARCHIVE_DIR"]
+        self.batch_size = max(int(app.config["LOG_RETENTION_BATCH_SIZE"]), 1)
+        app.extensions["log_retention"] = self
+
+    def cutoff(self, table, now=None):
+        """Rows older than this have expired (None when the table is kept forever)"""
+        days = int(self.app.config[POLICIES[table][1]])
+        if days <= 0:
+            return None
+        return (now or datetime.utcnow()) - timedelta(days=days)
+
+    def expired_months(self, table, now=None):
+        """Start of every month that ends before the cutoff and still has live rows"""
+        model = POLICIES[table][0]
+        cutoff = self.cutoff(table, now)
+        oldest = db.session.execute(select(func.min(model.timestamp))).scalar()
+        if cutoff is None or oldest is None:
+            return []
+        months = []
+        month = _month_start(oldest)
+        while _next_month(month) <= cutoff:
+            has_rows = db.session.execute(
+                select(model.id).where(model.timestamp >= month, model.timestamp < _next_month(month)).limit(1)
+            ).first()
+            if has_rows:
+                months.append(month)
+            month = _next_month(month)
+        return months
+
+    # ---- archiving ----
+
+    def _part_path(self, table, month):
+        directory = os.path.join(self.archive_dir, table)
+        os.makedirs(directory, exist_ok=True)
+        # A month archived again (late rows, or a run interrupted mid-delete) gets a new part.
+        part = len(glob.glob(os.path.join(directory, f"{month:%Y-%m}.*.jsonl.gz")))
+        return os.path.join(directory, f"{month:%Y-%m}.{part}.jsonl.gz")
+
+    def archive_month(self, table, month):
+        """
+        Stream one month to a new archive part, then delete exactly the rows
+        written there in batches of LOG_RETENTION_BATCH_SIZE, committing each.
+        Returns {"archived", "deleted", "path"}.
+        """
+        model = POLICIES[table][0]
+        keys = (model.timestamp, model.id)
+        in_month = (model.timestamp >= month) & (model.timestamp < _next_month(month))
+        path = self._part_path(table, month)
+        partial = path + ".part"
+        archived, last = 0, None
+        with gzip.open(partial, "wt", encoding="utf-8") as fh:
+            while True:
+                query = select(*model.__table__.columns).where(in_month)
+                if last is not None:
+                    query = query.where(after(keys, last, descending=False))
+                rows = db.session.execute(query.order_by(*keys).limit(self.batch_size)).mappings().all()
+                if not rows:
+                    break
+                fh.writelines(_encode(row) + "\n" for row in rows)
+                archived += len(rows)
+                last = (rows[-1]["timestamp"], rows[-1]["id"])
+            fh.flush()
+            os.fsync(fh.fileno())
+        db.session.rollback()
+        if not archived:
+            os.remove(partial)
+            return {"archived": 0, "deleted": 0, "path": None}
+        os.replace(partial, path)
+
+        # Rows that arrived after the copy (keys past `last`) stay for the next run.
+        deleted = 0
+        while True:
+            ids = db.session.execute(
+                select(model.id).where(in_month, ~after(keys, last, descending=False))
+                .order_by(*keys).limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(delete(model).where(model.id.in_(ids)))
+            db.session.commit()
+            deleted += len(ids)
+        return {"archived": archived, "deleted": deleted, "path": path}
+
+    def run(self, now=None, dry_run=False):
+        """Archive and prune every expired month of every log table"""
+        results = []
+        for table in POLICIES:
+            for month in self.expired_months(table, now):
+                result = {"table": table, "month": f"{month:%Y-%m}"}
+                if not dry_run:
+                    result.update(self.archive_month(table, month))
+                results.append(result)
+        if not dry_run:
+            self.last_run = {"at": datetime.utcnow().isoformat(), "months": len(results)}
+        return results
+
+    # ---- archive queries ----
+
+    def archived_months(self, table):
+        """{"YYYY-MM": [part paths]} for a table, oldest month first"""
+        months = {}
+        for path in sorted(glob.glob(os.path.join(self.archive_dir, table, "*.jsonl.gz"))):
+            month, part = os.path.basename(path).split(".")[:2]
+            months.setdefault(month, []).append((int(part), path))
+        return {month: [path for _, path in sorted(parts)] for month, parts in sorted(months.items())}
+
+    def query_archive(self, table, since=None, until=None, limit=None, **filters):
+        """
+        Yield archived rows (dicts, timestamps as ISO strings) of one table in
+        [since, until), oldest first, whose columns equal `filters`. Only the
+        month files overlapping the window are opened.
+        """
+        if table not in POLICIES:
+            raise KeyError(table)
+        first = f"{_month_start(since):%Y-%m}" if since else None
+        last = f"{until:%Y-%m}" if until else None
+        count = 0
+        for month, paths in self.archived_months(table).items():
+            if (first and month < first) or (last and month > last):
+                continue
+            seen = set()
+            for path in paths:
+                with gzip.open(path, "rt", encoding="utf-8") as fh:
+                    for line in fh:
+                        row = json.loads(line)
+                        # Parts of one month can overlap after an interrupted run.
+                        if row["id"] in seen:
+                            continue
+                        seen.add(row["id"])
+                        ts = datetime.fromisoformat(row["timestamp"]) if row["timestamp"] else None
+                        if (since and (ts is None or ts < since)) or (until and (ts is None or ts >= until)):
+                            continue
+                        if any(row.get(key) != value for key, value in filters.items()):
+                            continue
+                        yield row
+                        count += 1
+                        if limit is not None and count >= limit:
+                            return
+
+    def stats(self):
+        archived = {
+            table: {month: sum(os.path.getsize(path) for path in paths)
+                    for month, paths in self.archived_months(table).items()}
+            for table in POLICIES
+        }
+        return {
+            "archive_dir": self.archive_dir,
+            "retention_days": {table: int(self.app.config[key]) for table, (_, key) in POLICIES.items()},
+            "archived_bytes": archived,
+            "last_run": self.last_run,
+        }
+
+log_retention = LogRetention()
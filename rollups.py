@@ -0,0 +1,223 @@
+"""
+Hourly usage rollups.
+Every activity log batch is folded into usage_rollups (one row per hour,
+cipher and action) with an upsert in the same transaction, so usage stats
+read a few hundred counter rows instead of aggregating activity_logs.
+`flask --app app rollups backfill` rebuilds the counters for older history.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from models import db, ActivityLog, UsageRollup, AppMeta
+
+# app_meta key: first hour counted by the incremental path (backfill stops there)
+LIVE_SINCE_KEY = "usage_rollups_live_since"
+
+# Longest `hours` lookback parse_window honours; larger values are capped (negative ones count as 0)
+MAX_WINDOW_HOURS = 100 * 366 * 24
+
+_COUNTERS = ("success_count", "failure_count", "input_length_sum", "latency_ms_sum", "latency_count")
+
+def _hour(ts):
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+def first_hour(since):
+    """The first hourly bucket that starts at or after since: the effective start of a usage window"""
+    hour = _hour(since)
+    return hour if hour == since else hour + timedelta(hours=1)
+
+def _fold(buckets, hour, cipher_name, action, success, input_length, latency_ms=None):
+    bucket = buckets.setdefault((hour, cipher_name, action), dict.fromkeys(_COUNTERS, 0))
+    bucket["success_count" if success else "failure_count"] += 1
+    bucket["input_length_sum"] += input_length or 0
+    if latency_ms is not None:
+        bucket["latency_ms_sum"] += latency_ms
+        bucket["latency_count"] += 1
+
+def _params(buckets):
+    return [
+        {"hour": hour, "cipher_name": cipher_name, "action": action, **counters}
+        for (hour, cipher_name, action), counters in buckets.items()
+    ]
+
+class UsageRollups:
+    """Flask extension: incremental per-hour counters fed by the activity log writer"""
+
+    def __init__(self, app=None, writer=None):
+        self.enabled = True
+        self.events = 0
+        if app is not None:
+            self.init_app(app, writer)
+
+    def init_app(self, app, writer=None):
+        app.config.setdefault("USAGE_ROLLUPS_ENABLED", True)
+        self.enabled = app.config["USAGE_ROLLUPS_ENABLED"]
+        if self.enabled and writer is not None:
+            writer.add_batch_hook(self.record)
+        app.extensions["usage_rollups"] = self
+
+    def record(self, rows):
+        """Fold a batch of activity rows into the hourly counters (caller commits)"""
+        buckets = {}
+        for row in rows:
+            _fold(
+                buckets,
+                _hour(row["timestamp"]),
+                row["cipher_name"],
+                row["action"],
+                row.get("success", True),
+                row.get("input_length", 0),
+                row.get("latency_ms"),
+            )
+        if buckets:
+            self._upsert(_params(buckets))
+            self.events += len(rows)
+
+    def mark_live(self):
+        """Record the current hour as the start of incremental counting, if not already set"""
+        if not self.enabled or db.session.get(AppMeta, LIVE_SINCE_KEY) is not None:
+            return
+        try:
+            db.session.add(AppMeta(key=LIVE_SINCE_KEY, value=_hour(datetime.utcnow()).isoformat()))
+            db.session.commit()
+        except IntegrityError:
+            # Another worker recorded it first.
+            db.session.rollback()
+
+    def live_since(self):
+        value = db.session.execute(select(AppMeta.value).where(AppMeta.key == LIVE_SINCE_KEY)).scalar()
+        return datetime.fromisoformat(value) if value else None
+
+    def _upsert(self, params):
+        dialect = db.engine.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = dialect_insert(UsageRollup)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["hour", "cipher_name", "action"],
+                set_={name: getattr(UsageRollup, name) + getattr(stmt.excluded, name) for name in _COUNTERS},
+            )
+            db.session.execute(stmt, params)
+            return
+        # Other databases: increment existing buckets, insert the rest.
+        for bucket in params:
+            key = (UsageRollup.hour == bucket["hour"]) & (UsageRollup.cipher_name == bucket["cipher_name"]) & (
+                UsageRollup.action == bucket["action"]
+            )
+            result = db.session.execute(
+                update(UsageRollup).where(key).values(
+                    {name: getattr(UsageRollup, name) + bucket[name] for name in _COUNTERS}
+                )
+            )
+            if result.rowcount == 0:
+                db.session.execute(insert(UsageRollup), [bucket])
+
+    def backfill(self, since=None, until=None, batch_size=5000):
+        """
+        Recompute the counters for [since, until) from activity_logs,
+        replacing whatever rollups exist there, so it can be re-run safely.
+        Both bounds are truncated to the hour and `since` never reaches past
+        the oldest remaining log; `until` defaults to the first hour the
+        incremental path counted (or the current hour), so live counters are
+        never double counted. Historical logs carry no latency, so backfilled
+        rows have latency_count 0.
+        """
+        until = _hour(until or self.live_since() or datetime.utcnow())
+        # Hours before the oldest remaining log (e.g. archived months) keep their counters.
+        oldest = db.session.execute(select(func.min(ActivityLog.timestamp))).scalar()
+        if oldest is None:
+            return {"since": since, "until": until, "buckets": 0, "events": 0}
+        since = max(since, oldest) if since else oldest
+        query = select(
+            ActivityLog.timestamp, ActivityLog.cipher_name, ActivityLog.action,
+            ActivityLog.success, ActivityLog.input_length,
+        ).where(ActivityLog.timestamp < until)
+        wipe = delete(UsageRollup).where(UsageRollup.hour < until)
+        since = _hour(since)
+        query = query.where(ActivityLog.timestamp >= since)
+        wipe = wipe.where(UsageRollup.hour >= since)
+
+        buckets = {}
+        for ts, cipher_name, action, success, input_length in db.session.execute(
+            query.execution_options(yield_per=batch_size)
+        ):
+            _fold(buckets, _hour(ts), cipher_name, action, success, input_length)
+        db.session.execute(wipe)
+        params = _params(buckets)
+        for i in range(0, len(params), batch_size):
+            db.session.execute(insert(UsageRollup), params[i:i + batch_size])
+        db.session.commit()
+        return {"since": since, "until": until, "buckets": len(params), "events": sum(
+            b["success_count"] + b["failure_count"] for b in params
+        )}
+
+    def usage(self, since=None, until=None, cipher_name=None, action=None, by="cipher"):
+        """
+        Counters summed over the hourly buckets starting in [first_hour(since),
+        until), grouped by "cipher", "cipher_action" or "hour". Each group
+        reports uses, successes, failures, input length and average latency.
+        """
+        groups = {
+            "cipher": (UsageRollup.cipher_name,),
+            "cipher_action": (UsageRollup.cipher_name, UsageRollup.action),
+            "hour": (UsageRollup.hour,),
+        }[by]
+        success = func.sum(UsageRollup.success_count)
+        failure = func.sum(UsageRollup.failure_count)
+        query = select(
+            *groups,
+            success.label("success"),
+            failure.label("failure"),
+            func.sum(UsageRollup.input_length_sum).label("input_length"),
+            func.sum(UsageRollup.latency_ms_sum).label("latency_ms_sum"),
+            func.sum(UsageRollup.latency_count).label("latency_count"),
+        ).group_by(*groups)
+        if since is not None:
+            query = query.where(UsageRollup.hour >= first_hour(since))
+        if until is not None:
+            query = query.where(UsageRollup.hour < until)
+        if cipher_name:
+            query = query.where(UsageRollup.cipher_name == cipher_name)
+        if action:
+            query = query.where(UsageRollup.action == action)
+        query = query.order_by(UsageRollup.hour) if by == "hour" else query.order_by((success + failure).desc())
+
+        results = []
+        for row in db.session.execute(query):
+            item = {column.key: getattr(row, column.key) for column in groups}
+            item.update(
+                uses=int(row.success + row.failure),
+                success=int(row.success),
+                failure=int(row.failure),
+                input_length=int(row.input_length or 0),
+                avg_latency_ms=round(row.latency_ms_sum / row.latency_count, 3) if row.latency_count else None,
+            )
+            results.append(item)
+        return results
+
+    def stats(self):
+        return {"enabled": self.enabled, "events": self.events}
+
+usage_rollups = UsageRollups()
+
+def _naive_utc(value: str) -> datetime:
+    """Parse an ISO timestamp; one with an offset is converted to naive UTC like the stored timestamps"""
+    ts = datetime.fromisoformat(value)
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+def parse_window(hours=None, since=None, until=None):
+    """(since, until) naive UTC datetimes from an `hours` lookback or ISO timestamps"""
+    until = _naive_utc(until) if until else None
+    if since:
+        return _naive_utc(since), until
+    if hours:
+        lookback = timedelta(hours=min(max(float(hours), 0.0), MAX_WINDOW_HOURS))
+        try:
+            return (until or datetime.utcnow()) - lookback, until
+        except OverflowError:  # reaches back past year 1
+            return datetime.min, until
+    return None, until
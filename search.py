@@ -0,0 +1,294 @@
+"""
+Cipher search index.
+An in-memory n-gram index (every 1-3 character gram of slug and name) over the
+persisted cipher_definitions rows and the virtual variant families answers
+substring queries by posting-list intersection instead of `ilike '%q%'`
+scans, ranks the hits, and keeps an LRU of recent queries. With
+SEARCH_BACKEND = "database" the persisted rows are searched through SQLite
+FTS5 (trigram tokenizer) or a Postgres pg_trgm GIN index instead.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db, CipherDefinition, AppMeta
+
+# Bumped in app_meta whenever persisted ciphers change, so every worker rebuilds
+REVISION_KEY = "catalog_revision"
+_GRAM = 3
+
+def bump_catalog_revision():
+    """Record a catalog change and return the new revision; the caller commits"""
+    revision = uuid.uuid4().hex
+    db.session.merge(AppMeta(key=REVISION_KEY, value=revision))
+    return revision
+
+def current_catalog_revision():
+    return db.session.execute(select(AppMeta.value).where(AppMeta.key == REVISION_KEY)).scalar()
+
+def _grams(value: str) -> Set[str]:
+    return {value[i:i + n] for n in range(1, _GRAM + 1) for i in range(len(value) - n + 1)}
+
+@dataclass(frozen=True)
+class SearchDoc:
+    """One searchable catalog entry: a persisted row (row_id) or a family member"""
+    slug: str
+    name: str
+    category: str
+    supported: bool
+    row_id: Optional[int] = None
+    family: Optional[int] = None
+    member: Optional[int] = None
+
+    def order(self, q: str) -> Tuple:
+        """Sort key: exact, then prefix, then word-start, then plain substring matches"""
+        slug, name = self.slug.lower(), self.name.lower()
+        if q == slug or q == name:
+            tier = 0
+        elif slug.startswith(q) or name.startswith(q):
+            tier = 1
+        elif f"-{q}" in slug or f" {q}" in name:
+            tier = 2
+        else:
+            tier = 3
+        # Within a tier, keep the catalog's own order: persisted rows by name, then families.
+        if self.family is None:
+            return (tier, 0, name, slug)
+        return (tier, self.family + 1, self.member, "")
+
+class NgramIndex:
+    """Posting lists from 1-3 character grams to document numbers"""
+
+    def __init__(self):
+        self.docs: List[Optional[SearchDoc]] = []
+        self.postings: Dict[str, Set[int]] = {}
+        self.by_row: Dict[int, int] = {}
+
+    def add(self, doc: SearchDoc):
+        docno = len(self.docs)
+        self.docs.append(doc)
+        for gram in _grams(doc.slug.lower()) | _grams(doc.name.lower()):
+            self.postings.setdefault(gram, set()).add(docno)
+        if doc.row_id is not None:
+            self.by_row[doc.row_id] = docno
+
+    def remove(self, row_id: int):
+        docno = self.by_row.pop(row_id, None)
+        if docno is None:
+            return
+        doc = self.docs[docno]
+        self.docs[docno] = None
+        for gram in _grams(doc.slug.lower()) | _grams(doc.name.lower()):
+            self.postings.get(gram, set()).discard(docno)
+
+    def lookup(self, q: str) -> List[SearchDoc]:
+        """Documents whose slug or name contains q (already lowercased)"""
+        if len(q) <= _GRAM:
+            # A gram this short is indexed as-is, so its posting list is exact.
+            return [self.docs[docno] for docno in self.postings.get(q, ())]
+        lists = sorted((self.postings.get(q[i:i + _GRAM], set()) for i in range(len(q) - _GRAM + 1)), key=len)
+        candidates = set.intersection(*lists) if lists[0] else set()
+        docs = (self.docs[docno] for docno in candidates)
+        return [doc for doc in docs if q in doc.slug.lower() or q in doc.name.lower()]
+
+class CipherSearch:
+    """Flask extension: ranked cipher search with an LRU of recent queries"""
+
+    def __init__(self, app=None, families=()):
+        self.app = None
+        self.families = tuple(families)
+        self.backend = "memory"
+        self.cache_size = 256
+        self.refresh_interval = 30.0
+        self._index = None
+        self._revision = None
+        self._checked_at = 0.0
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        if app is not None:
+            self.init_app(app, families)
+
+    def init_app(self, app, families=()):
+        app.config.setdefault("SEARCH_BACKEND", "memory")
+        app.config.setdefault("SEARCH_CACHE_SIZE", 256)
+        app.config.setdefault("SEARCH_REFRESH_SECONDS", 30)
+        self.app = app
+        self.families = tuple(families) or self.families
+        self.backend = app.config["SEARCH_BACKEND"]
+        self.cache_size = int(app.config["SEARCH_CACHE_SIZE"])
+        self.refresh_interval = float(app.config["SEARCH_REFRESH_SECONDS"])
+        app.extensions["cipher_search"] = self
+
+    # ---- persistent backend ----
+
+    def setup_backend(self):
+        """Create the FTS5 table or pg_trgm indexes; falls back to memory on failure"""
+        if self.backend != "database":
+            return
+        dialect = db.engine.dialect.name
+        try:
+            if dialect == "sqlite":
+                exists = db.session.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cipher_search'")
+                ).first()
+                for statement in _SQLITE_FTS:
+                    db.session.execute(text(statement))
+                if not exists:
+                    db.session.execute(text("INSERT INTO cipher_search(cipher_search) VALUES ('rebuild')"))
+            elif dialect == "postgresql":
+                for statement in _POSTGRES_TRGM:
+                    db.session.execute(text(statement))
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            self.backend = "memory"
+            self.app.logger.exception("Search backend unavailable on %s; using the in-memory index", dialect)
+
+    def _database_docs(self, q: str) -> List[SearchDoc]:
+        columns = (CipherDefinition.id, CipherDefinition.slug, CipherDefinition.name,
+                   CipherDefinition.category, CipherDefinition.supported)
+        if db.engine.dialect.name == "sqlite" and len(q) >= _GRAM:
+            phrase = '"' + q.replace('"', '""') + '"'
+            rows = db.session.execute(
+                select(*columns).where(CipherDefinition.id.in_(
+                    select(text("rowid")).select_from(text("cipher_search")).where(text("cipher_search MATCH :q"))
+                )),
+                {"q": phrase},
+            )
+        else:
+            # Postgres serves this from the gin_trgm_ops indexes; short queries scan anyway.
+            like = f"%{q}%"
+            rows = db.session.execute(
+                select(*columns).where(CipherDefinition.name.ilike(like) | CipherDefinition.slug.ilike(like))
+            )
+        return [SearchDoc(row.slug, row.name, row.category or "", bool(row.supported), row_id=row.id) for row in rows]
+
+    # ---- in-memory index ----
+
+    def _build(self) -> NgramIndex:
+        index = NgramIndex()
+        if self.backend != "database":
+            rows = db.session.execute(select(
+                CipherDefinition.id, CipherDefinition.slug, CipherDefinition.name,
+                CipherDefinition.category, CipherDefinition.supported,
+            ))
+            for row in rows:
+                index.add(SearchDoc(row.slug, row.name, row.category or "", bool(row.supported), row_id=row.id))
+        for f, family in enumerate(self.families):
+            for i in range(family.count):
+                entry = family.entry(i)
+                index.add(SearchDoc(entry.slug, entry.name, entry.category, entry.supported, family=f, member=i))
+        return index
+
+    def _ensure_index(self) -> NgramIndex:
+        now = time.monotonic()
+        with self._lock:
+            if self._index is not None and now - self._checked_at < self.refresh_interval:
+                return self._index
+            revision = current_catalog_revision()
+            self._checked_at = now
+            if self._index is None or revision != self._revision:
+                # Another worker (or seeding) changed the catalog since the last build.
+                self._index = self._build()
+                self._revision = revision
+                self._cache.clear()
+                self.rebuilds += 1
+            return self._index
+
+    def search(self, q, category="all", supported_only=False) -> Tuple[SearchDoc, ...]:
+        """Ranked matches for q, optionally restricted to a category or to supported ciphers"""
+        q = q.strip().lower()
+        if not q:
+            return ()
+        index = self._ensure_index()
+        key = (q, category or "all", bool(supported_only))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            docs = index.lookup(q)
+        if self.backend == "database":
+            docs = docs + self._database_docs(q)
+        if category and category != "all":
+            docs = [doc for doc in docs if doc.category == category]
+        if supported_only:
+            docs = [doc for doc in docs if doc.supported]
+        result = tuple(sorted(docs, key=lambda doc: doc.order(q)))
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    # ---- incremental updates ----
+
+    def _changed(self, previous, revision, apply):
+        # The edit only brings the index to `revision` if it was built at the
+        # revision the edit replaced; otherwise it missed some other change
+        # and is dropped, so the next search rebuilds it.
+        with self._lock:
+            if self._index is not None and self._revision == previous:
+                apply(self._index)
+                self._revision = revision
+            else:
+                self._index = None
+            self._cache.clear()
+
+    def add(self, cipher: CipherDefinition, previous, revision):
+        """Index a CipherDefinition committed under `revision`, which replaced `previous`"""
+        if self.backend == "database":
+            self._changed(previous, revision, lambda index: None)
+            return
+        doc = SearchDoc(cipher.slug, cipher.name, cipher.category or "", bool(cipher.supported), row_id=cipher.id)
+        self._changed(previous, revision, lambda index: index.add(doc))
+
+    def remove(self, row_id: int, previous, revision):
+        """Drop a CipherDefinition deleted under `revision`, which replaced `previous`"""
+        self._changed(previous, revision, lambda index: index.remove(row_id))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        index = self._index
+        return {
+            "backend": self.backend,
+            "documents": sum(doc is not None for doc in index.docs) if index else 0,
+            "grams": len(index.postings) if index else 0,
+            "cached_queries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "rebuilds": self.rebuilds,
+        }
+
+# External-content FTS5 table over cipher_definitions, kept in sync by triggers
+_SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS cipher_search USING fts5("
+    "slug, name, content='cipher_definitions', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS cipher_search_ai AFTER INSERT ON cipher_definitions BEGIN "
+    "INSERT INTO cipher_search(rowid, slug, name) VALUES (new.id, new.slug, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS cipher_search_ad AFTER DELETE ON cipher_definitions BEGIN "
+    "INSERT INTO cipher_search(cipher_search, rowid, slug, name) VALUES ('delete', old.id, old.slug, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS cipher_search_au AFTER UPDATE ON cipher_definitions BEGIN "
+    "INSERT INTO cipher_search(cipher_search, rowid, slug, name) VALUES ('delete', old.id, old.slug, old.name); "
+    "INSERT INTO cipher_search(rowid, slug, name) VALUES (new.id, new.slug, new.name); END",
+)
+
+_POSTGRES_TRGM = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_cipher_definitions_name_trgm ON cipher_definitions USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_cipher_definitions_slug_trgm ON cipher_definitions USING gin (slug gin_trgm_ops)",
+)
+
+cipher_search = CipherSearch()
@@ -0,0 +1,123 @@
+"""
+Versioned, idempotent seeding of the built-in cipher catalog and admin account.
+The catalog (and the admin credentials it implies) is summarized as a
+fingerprint stored in app_meta; startup compares it with one query and only
+reseeds when it differs. `flask --app app seed` runs the step explicitly.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+import crypto_core as cc
+from catalog import catalog, VARIANT_CATEGORY
+from models import db, User, CipherDefinition, AppMeta
+from search import bump_catalog_revision
+
+# Bump when the seeding logic changes in a way the catalog itself does not show
+SEED_VERSION = 2
+FINGERPRINT_KEY = "catalog_fingerprint"
+ADMIN_USERNAME = "The X King"
+ADMIN_EMAIL = "thexking@cipher-labs.vercel.app"
+
+def catalog_entries():
+    """Every built-in CipherDefinition row as (slug, name, description, category)"""
+    return [
+        (slug, info.get("name", slug.replace("-", " ").title()), info.get("description", "Cipher entry."), "classic")
+        for slug, info in cc.CLASSIC_CIPHERS.items()
+    ]
+
+def seed_fingerprint(entries, admin_password, secret_key):
+    """
+    Digest of everything seeding would write. The admin password enters only
+    as an HMAC under SECRET_KEY, so changing ADMIN_PASSWORD triggers a reseed
+    without the password being recoverable from the database.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{SEED_VERSION}\n{ADMIN_USERNAME}\n".encode())
+    digest.update(hmac.new(secret_key.encode(), admin_password.encode(), hashlib.sha256).digest())
+    digest.update(json.dumps(entries, separators=(",", ":")).encode())
+    return digest.hexdigest()
+
+def _stored_fingerprint():
+    return db.session.execute(select(AppMeta.value).where(AppMeta.key == FINGERPRINT_KEY)).scalar()
+
+def _seed_catalog(entries):
+    existing = {
+        row.slug: row
+        for row in db.session.execute(
+            select(CipherDefinition.id, CipherDefinition.slug, CipherDefinition.name,
+                   CipherDefinition.description, CipherDefinition.category, CipherDefinition.supported)
+        )
+    }
+    inserts, updates = [], []
+    for slug, name, desc, category in entries:
+        row = existing.get(slug)
+        if row is None:
+            inserts.append({"slug": slug, "name": name, "description": desc, "category": category, "supported": True})
+        elif (row.name, row.description, row.supported) != (name, desc, True) or not row.category:
+            updates.append({"id": row.id, "name": name, "description": desc,
+                            "category": row.category or category, "supported": True})
+    # Both are single executemany statements rather than one ORM object per row.
+    if inserts:
+        db.session.execute(insert(CipherDefinition), inserts)
+    if updates:
+        db.session.execute(update(CipherDefinition), updates)
+    # Affine variants were dropped; only the base affine cipher is kept
+    db.session.execute(delete(CipherDefinition).where(CipherDefinition.slug.like("affine-a%-b%")))
+    # Variant rows seeded by earlier versions are now served by the virtual catalog
+    stale = [
+        row.id for row in existing.values()
+        if row.category == VARIANT_CATEGORY and catalog.virtual(row.slug) is not None
+    ]
+    for i in range(0, len(stale), 500):
+        db.session.execute(delete(CipherDefinition).where(CipherDefinition.id.in_(stale[i:i + 500])))
+    return len(inserts), len(updates)
+
+def _seed_admin(admin_password):
+    admin = User.query.filter_by(username=ADMIN_USERNAME).first()
+    legacy_admin = User.query.filter_by(username="admin").first()
+    if legacy_admin and not admin:
+        legacy_admin.username = ADMIN_USERNAME
+        legacy_admin.email = ADMIN_EMAIL
+        admin = legacy_admin
+    elif not admin:
+        admin = User(username=ADMIN_USERNAME, email=ADMIN_EMAIL)
+        db.session.add(admin)
+
+    admin.set_password(admin_password)
+    admin.is_admin = True
+    admin.admin_level = "high"
+    admin.email = admin.email or ADMIN_EMAIL
+
+    if legacy_admin and legacy_admin.id != admin.id:
+        legacy_admin.is_admin = False
+        legacy_admin.admin_level = "standard"
+
+def seed_defaults(app, force=False):
+    """
+    Seed the cipher catalog and admin account unless the stored fingerprint
+    already matches. Returns a summary dict; "seeded" is False when skipped.
+    """
+    admin_password = os.environ.get("ADMIN_PASSWORD", "admin123")
+    entries = catalog_entries()
+    fingerprint = seed_fingerprint(entries, admin_password, app.config["SECRET_KEY"])
+    if not force and _stored_fingerprint() == fingerprint:
+        return {"seeded": False, "fingerprint": fingerprint}
+
+    try:
+        inserted, updated = _seed_catalog(entries)
+        _seed_admin(admin_password)
+        db.session.merge(AppMeta(key=FINGERPRINT_KEY, value=fingerprint))
+        bump_catalog_revision()
+        db.session.commit()
+    except IntegrityError:
+        # Another worker seeded the same rows concurrently; its commit wins.
+        db.session.rollback()
+        app.logger.info("Catalog seeding raced with another process; skipped")
+        return {"seeded": False, "fingerprint": fingerprint}
+    return {"seeded": True, "fingerprint": fingerprint, "inserted": inserted, "updated": updated}
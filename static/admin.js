@@ -0,0 +1,194 @@
+// ============ ADMIN PANELS (lazy, keyset-paginated) ============
+// Each [data-lazy-panel] fetches its first page from data-endpoint when it
+// scrolls into view and appends further pages with "Load more", following
+// the opaque "next" cursor returned by /admin/api/*.
+
+const adminConfig = window.cipherlabAdmin || { high: false };
+
+function el(tag, attrs = {}, children = []) {
+    const node = document.createElement(tag);
+    Object.entries(attrs).forEach(([key, value]) => {
+        if (key === "text") node.textContent = value;
+        else node.setAttribute(key, value);
+    });
+    children.forEach((child) => node.appendChild(typeof child === "string" ? document.createTextNode(child) : child));
+    return node;
+}
+
+function formatTime(value) {
+    return value ? value.slice(0, 16).replace("T", " ") : "-";
+}
+
+function flagChips(flags) {
+    return ["functional", "analytics", "marketing"].map((name) =>
+        el("span", { class: `chip ${flags[name] ? "success" : "warning"}`, text: name[0].toUpperCase() })
+    );
+}
+
+function postForm(action, children, extra = {}) {
+    return el("form", { method: "post", action, ...extra }, children);
+}
+
+function roleChip(user) {
+    if (user.admin_level === "high") return el("span", { class: "chip primary", text: "High Admin" });
+    if (user.is_admin) return el("span", { class: "chip secondary", text: "Admin" });
+    return el("span", { class: "chip", text: "User" });
+}
+
+function userActions(user) {
+    if (user.admin_level === "high") return el("span", { class: "text-muted", text: "Protected" });
+    const forms = [];
+    if (!user.is_admin) {
+        forms.push(postForm(`/admin/users/promote/${user.id}`, [
+            el("input", { type: "password", name: "high_admin_key", class: "input", placeholder: "High admin key", required: "" }),
+            el("button", { class: "btn success", type: "submit", text: "Promote" }),
+        ]));
+    } else {
+        forms.push(postForm(`/admin/users/demote/${user.id}`, [
+            el("button", { class: "btn warning", type: "submit", text: "Demote" }),
+        ]));
+    }
+    forms.push(postForm(`/admin/users/delete/${user.id}`, [
+        el("button", { class: "btn danger", type: "submit", text: "Delete" }),
+    ]));
+    return el("div", { class: "btn-group" }, forms);
+}
+
+const adminRenderers = {
+    users(user) {
+        const cells = [
+            el("td", {}, [el("strong", { text: user.username })]),
+            el("td", { text: user.email }),
+            el("td", { class: "mono", text: user.provider }),
+            el("td", {}, [roleChip(user)]),
+        ];
+        if (adminConfig.high) {
+            cells.push(
+                el("td", { class: "text-muted", text: formatTime(user.last_login_at) }),
+                el("td", { class: "text-muted", text: formatTime(user.last_seen_at) }),
+                el("td", { class: "mono", text: user.last_login_ip || "-" }),
+                el("td", {}, user.cookies ? flagChips(user.cookies) : [el("span", { class: "text-muted", text: "-" })]),
+                el("td", {}, [userActions(user)])
+            );
+        }
+        return el("tr", {}, cells);
+    },
+
+    "cookie-prefs"(pref) {
+        const who = pref.user_id
+            ? el("a", { href: `/admin/users/${pref.user_id}`, text: `User ${pref.user_id}` })
+            : el("span", { class: "text-muted", text: "Anonymous" });
+        return el("tr", {}, [
+            el("td", {}, [who]),
+            el("td", { class: "mono", text: pref.anon_id || "-" }),
+            el("td", { text: pref.choice }),
+            el("td", {}, flagChips(pref)),
+            el("td", { class: "mono", text: pref.ip_address || "-" }),
+            el("td", { class: "text-muted", text: formatTime(pref.updated_at) }),
+        ]);
+    },
+
+    activity(log) {
+        return el("tr", {}, [
+            el("td", {}, [el("strong", { text: log.username })]),
+            el("td", { text: log.action }),
+            el("td", { class: "mono", text: log.cipher_name }),
+            el("td", { class: "mono", text: log.ip_address || "-" }),
+            el("td", { class: "text-muted", text: formatTime(log.timestamp) }),
+        ]);
+    },
+
+    "admin-logs"(log) {
+        const details = log.details.length > 60 ? `${log.details.slice(0, 60)}...` : log.details;
+        return el("tr", {}, [
+            el("td", {}, [el("span", { class: "chip primary", text: log.action })]),
+            el("td", { class: "mono", text: log.target }),
+            el("td", { class: "text-secondary", text: details }),
+            el("td", { class: "text-muted", text: formatTime(log.timestamp) }),
+        ]);
+    },
+
+    catalog(cipher) {
+        const action = cipher.id
+            ? postForm(`/admin/ciphers/delete/${cipher.id}`, [
+                el("button", { type: "submit", class: "btn danger", style: "padding: 6px 12px;", text: "Delete" }),
+            ], { onsubmit: "return confirm('Delete cipher?')" })
+            : el("span", { class: "chip", text: "Generated" });
+        return el("div", { class: `card ${cipher.supported ? "" : "card-muted"}` }, [
+            el("div", { class: "card-head" }, [
+                el("h4", { text: cipher.name }),
+                cipher.supported
+                    ? el("span", { class: "chip success", text: "Supported" })
+                    : el("span", { class: "chip warning", text: "Catalog" }),
+            ]),
+            el("p", { class: "text-secondary", text: cipher.description }),
+            el("div", { class: "flex-between", style: "gap: 1rem;" }, [
+                el("span", { class: "chip subtle", text: cipher.slug }),
+                action,
+            ]),
+        ]);
+    },
+};
+
+function initLazyPanel(panel) {
+    const render = adminRenderers[panel.dataset.lazyPanel];
+    const body = panel.querySelector("[data-lazy-body]");
+    const more = panel.querySelector("[data-lazy-more]");
+    const empty = panel.querySelector("[data-lazy-empty]");
+    const search = panel.querySelector("[data-lazy-search]");
+    let cursor = null;
+    let query = search ? search.querySelector("input").value.trim() : "";
+    let loading = false;
+
+    async function load(reset = false) {
+        if (loading) return;
+        loading = true;
+        more.disabled = true;
+        if (reset) {
+            cursor = null;
+            body.replaceChildren();
+        }
+        const params = new URLSearchParams();
+        if (cursor) params.set("cursor", cursor);
+        if (query) params.set("q", query);
+        try {
+            const response = await fetch(`${panel.dataset.endpoint}?${params}`);
+            const data = await response.json();
+            if (!data.ok) throw new Error(data.error || "Request failed");
+            data.items.forEach((item) => body.appendChild(render(item)));
+            cursor = data.next;
+            more.hidden = !cursor;
+            if (empty) empty.hidden = body.children.length > 0;
+        } catch (error) {
+            showStatus(error.message || "Failed to load panel", "error");
+        } finally {
+            loading = false;
+            more.disabled = false;
+        }
+    }
+
+    more.addEventListener("click", () => load());
+    if (search) {
+        search.addEventListener("submit", (event) => {
+            event.preventDefault();
+            query = search.querySelector("input").value.trim();
+            load(true);
+        });
+    }
+
+    if ("IntersectionObserver" in window) {
+        const observer = new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) {
+                observer.disconnect();
+                load(true);
+            }
+        }, { rootMargin: "200px" });
+        observer.observe(panel);
+    } else {
+        load(true);
+    }
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("[data-lazy-panel]").forEach(initLazyPanel);
+});
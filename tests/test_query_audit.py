@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope="module")
+def app():
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "audit.sqlite")
+    import app as app_module
+    return app_module.app
+
+def test_audit_queries_use_indexes(app):
+    from query_audit import audit
+    with app.app_context():
+        results = audit()
+    failures = [f"{r['route']} / {r['name']}: {r['plan']}" for r in results if not r["ok"]]
+    assert results and not failures, "\n".join(failures)